@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched performance metrics against per-run calculate_metrics().
+
+Usage:
+    python benchmarks/bench_batch_metrics.py [--runs 10000] [--min-trades 100] [--max-trades 1000]
+
+Each run is a random trade sequence with entry/exit times and an equity
+curve sampled after every trade (a typical optimization sweep's output).
+The per-run loop is timed on a sample of runs and extrapolated; its
+metrics are compared with the batched ones for that sample.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from backtest.batch_metrics import batch_metrics, pack_ragged, pad_equity
+from backtest.performance_analyzer import PerformanceAnalyzer
+
+
+def synthetic_runs(n_runs: int, min_trades: int, max_trades: int, seed: int = 0):
+    """Random per-run PnL, durations and equity curves."""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(min_trades, max_trades + 1, n_runs)
+    pnl = [np.round(rng.normal(rng.normal(0.5, 1), 20, n), 2) for n in counts]
+    entry = [np.sort(rng.integers(0, 30 * 86400, n)) * 10**9 for n in counts]
+    hold = [rng.integers(60, 7200, n) * 10**9 for n in counts]
+    equity = [10000 + np.r_[0, np.cumsum(p)] for p in pnl]
+    return pnl, entry, hold, equity
+
+
+def main() -> None:
+    """Time batched vs per-run metrics and check that they agree."""
+    parser = argparse.ArgumentParser(description='Benchmark batched performance metrics')
+    parser.add_argument('--runs', type=int, default=10000, help='Runs to score')
+    parser.add_argument('--min-trades', type=int, default=100, help='Fewest trades per run')
+    parser.add_argument('--max-trades', type=int, default=1000, help='Most trades per run')
+    parser.add_argument('--sample', type=int, default=100, help='Runs scored one by one for comparison')
+    args = parser.parse_args()
+
+    pnl, entry, hold, equity = synthetic_runs(args.runs, args.min_trades, args.max_trades)
+    flat_pnl, offsets = pack_ragged(pnl)
+    durations, _ = pack_ragged(hold, dtype=np.int64)
+    equity_matrix = pad_equity(equity)
+
+    print("\n" + "=" * 60)
+    print("BATCH METRICS BENCHMARK")
+    print("=" * 60)
+    print(f"Runs: {args.runs:,}  trades: {len(flat_pnl):,}  equity matrix: {equity_matrix.shape}")
+
+    start = time.perf_counter()
+    batch = batch_metrics(flat_pnl, offsets, equity_matrix, durations.view('timedelta64[ns]'))
+    batch_time = time.perf_counter() - start
+
+    sample = range(min(args.sample, args.runs))
+    frames = [pd.DataFrame({'PnL': pnl[i], 'EntryTime': pd.to_datetime(entry[i]),
+                            'ExitTime': pd.to_datetime(entry[i] + hold[i])}) for i in sample]
+    start = time.perf_counter()
+    single = [PerformanceAnalyzer(frame, pd.Series(equity[i])).calculate_metrics()
+              for i, frame in zip(sample, frames)]
+    loop_time = (time.perf_counter() - start) / len(frames) * args.runs
+
+    numeric = [key for key in batch.columns if not key.endswith('duration')]
+    expected = pd.DataFrame(single)[numeric].astype(float).to_numpy()
+    matches = np.allclose(batch[numeric].iloc[:len(frames)].astype(float).to_numpy(), expected,
+                          rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    print(f"Batched:               {batch_time:.2f}s")
+    print(f"calculate_metrics():   {loop_time:.1f}s (extrapolated from {len(frames)} runs)")
+    print(f"Speedup:               {loop_time / batch_time:.0f}x")
+    print(f"Metrics match on sample: {matches}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
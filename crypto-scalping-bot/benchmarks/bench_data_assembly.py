@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark backtest data assembly: dict-mapped rows vs the columnar as-of join.
+
+Usage:
+    python benchmarks/bench_data_assembly.py [--bars 525600] [--extra-columns 20]
+
+Writes a synthetic processed_data.csv (OHLCV, the indicators the backtest
+uses plus unused feature columns, as preprocess.py does) and predictions.csv
+(predicted/actual plus one horizon, a few bars missing) to a temporary
+directory, then times:
+
+    legacy:   the former backtest_runner.main path (full read_csv, Timestamp
+              dicts mapped over every row, filter + copy, prepare_data_for_backtest)
+    columnar: load_backtest_data() (needed columns only, int64 as-of join,
+              one allocation)
+
+and checks that both produce the same frame.
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src and benchmarks to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backtest.data_assembly import PROCESSED_COLUMNS, assemble_backtest_frame, load_backtest_data, read_columns
+from synthetic_data import synthetic_backtest_data
+
+
+def write_inputs(data_dir: Path, n_bars: int, extra_columns: int, seed: int = 42) -> None:
+    """Write processed_data.csv and predictions.csv in the pipeline's layout."""
+    rng = np.random.default_rng(seed)
+    data = synthetic_backtest_data(n_bars, seed=seed)
+    n = len(data)
+
+    processed = pd.DataFrame({'datetime': data.index})
+    for target, source in PROCESSED_COLUMNS:
+        processed[source] = data[target].to_numpy() if target in data else rng.uniform(1, 100, n)
+    for i in range(extra_columns):
+        processed[f'feature_{i}'] = rng.normal(size=n)
+    # Indicator warm-up NaNs
+    processed.loc[:30, 'adx_14'] = np.nan
+    processed.to_csv(data_dir / 'processed_data.csv', index=False)
+
+    # Predictions for the test period only, with a few bars missing
+    rows = np.sort(rng.choice(np.arange(n // 5, n), size=int(0.79 * n), replace=False))
+    pd.DataFrame({
+        'actual': data['Actual_Norm'].to_numpy()[rows],
+        'predicted': data['Predicted_Change'].to_numpy()[rows],
+        'datetime': data.index[rows],
+        'actual_h5': data['Actual_Norm'].to_numpy()[rows],
+        'predicted_h5': data['Predicted_Change_H5'].to_numpy()[rows],
+    }).to_csv(data_dir / 'predictions.csv', index=False)
+
+
+def legacy_assembly(data_dir: Path) -> pd.DataFrame:
+    """The assembly backtest_runner.main performed before data_assembly."""
+    df = pd.read_csv(data_dir / 'processed_data.csv')
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    predictions_df = pd.read_csv(data_dir / 'predictions.csv')
+
+    pred_dates = pd.to_datetime(predictions_df['datetime'])
+    df['predicted_normalized'] = df['datetime'].map(dict(zip(pred_dates, predictions_df['predicted'].values)))
+    df['actual_normalized'] = df['datetime'].map(dict(zip(pred_dates, predictions_df['actual'].values)))
+    horizon_columns = {int(col[len('predicted_h'):]): col
+                       for col in predictions_df.columns if col.startswith('predicted_h')}
+    for horizon, col in horizon_columns.items():
+        df[col] = df['datetime'].map(dict(zip(pred_dates, predictions_df[col].values)))
+    df = df[df['predicted_normalized'].notna()].copy()
+
+    # prepare_data_for_backtest()
+    bt_data = pd.DataFrame({target: df[source].values for target, source in PROCESSED_COLUMNS[:5]},
+                           index=pd.to_datetime(df['datetime']))
+    for target, source in PROCESSED_COLUMNS[5:]:
+        bt_data[target] = df[source].values
+    bt_data['Predicted_Change'] = df['predicted_normalized'].values
+    bt_data['Actual_Norm'] = df['actual_normalized'].values
+    for horizon, col in horizon_columns.items():
+        bt_data[f'Predicted_Change_H{horizon}'] = df[col].values
+    return bt_data.dropna()
+
+
+def timed(fn, *args, repeats: int = 3):
+    """Best-of-n wall time and the last result."""
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    """Time both assembly paths on the same files and verify they agree."""
+    parser = argparse.ArgumentParser(description='Benchmark backtest data assembly')
+    parser.add_argument('--bars', type=int, default=525600, help='1m bars (525,600 = one year)')
+    parser.add_argument('--extra-columns', type=int, default=20, help='Unused feature columns in processed_data.csv')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing repeats (best is reported)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        print(f"Writing {args.bars:,} bars of synthetic processed_data.csv / predictions.csv...")
+        write_inputs(data_dir, args.bars, args.extra_columns)
+
+        legacy_time, legacy = timed(legacy_assembly, data_dir, repeats=args.repeats)
+        columnar_time, columnar = timed(load_backtest_data, data_dir, repeats=args.repeats)
+
+        processed = read_columns(data_dir / 'processed_data.csv', [source for _, source in PROCESSED_COLUMNS])
+        predictions = read_columns(data_dir / 'predictions.csv')
+        join_time, _ = timed(assemble_backtest_frame, processed, predictions, repeats=args.repeats)
+
+    print("\n" + "=" * 60)
+    print("DATA ASSEMBLY BENCHMARK")
+    print("=" * 60)
+    print(f"Bars: {args.bars:,}  ->  backtest frame: {len(columnar):,} rows x {columnar.shape[1]} columns")
+    print(f"Legacy (dict map + copies):   {legacy_time:.2f}s")
+    print(f"Columnar (read + as-of join): {columnar_time:.2f}s  ({legacy_time / columnar_time:.1f}x)")
+    print(f"  of which join + assembly:   {join_time * 1000:.1f}ms")
+    pd.testing.assert_frame_equal(legacy, columnar, check_index_type=False, check_freq=False)
+    same_index = (legacy.index.as_unit('ns') == columnar.index).all()
+    print(f"Identical frames: {same_index}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
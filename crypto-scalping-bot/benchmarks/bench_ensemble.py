@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-graph ensemble inference against sequential member predict() calls.
+
+Usage:
+    python benchmarks/bench_ensemble.py [--members 5] [--samples 20000] [--repeats 3]
+
+Members are freshly built (untrained) models with different lookbacks, so the
+timings reflect framework overhead and compute, not model quality.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from models.lstm_model import LSTMPricePredictor
+from models.ensemble import LSTMEnsemble
+
+
+def _best_time(fn, repeats: int) -> float:
+    """Return the best wall time of `repeats` calls (after one warm-up call)."""
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Build members, verify outputs match, and report sequential vs merged timings."""
+    parser = argparse.ArgumentParser(description='Benchmark LSTMEnsemble vs sequential predict()')
+    parser.add_argument('--members', type=int, default=5, help='Number of ensemble members')
+    parser.add_argument('--samples', type=int, default=20000, help='Number of input sequences')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed repetitions')
+    parser.add_argument('--config', default='config/config.yaml', help='Config with model architecture')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    base = LSTMPricePredictor(args.config)
+    n_features = len(base.config['model']['features'])
+    max_lookback = base.config['model']['lookback_periods']
+
+    # Spread lookbacks between half and full lookback (different horizons of context)
+    lookbacks = np.linspace(max_lookback // 2, max_lookback, args.members).astype(int)
+    members = []
+    for lookback in lookbacks:
+        member = LSTMPricePredictor(args.config)
+        member.build_model((int(lookback), n_features))
+        member.bias_corrector.bias = rng.normal(0, 1e-4)
+        member.bias_corrector.scale = rng.uniform(0.5, 1.5)
+        members.append(member)
+
+    ensemble = LSTMEnsemble(members)
+    X = rng.random((args.samples, ensemble.lookback, n_features), dtype=np.float32)
+
+    merged = ensemble.predict(X)
+    sequential = ensemble.predict_sequential(X)
+    max_diff = np.abs(merged['members'] - sequential['members']).max()
+
+    t_sequential = _best_time(lambda: ensemble.predict_sequential(X), args.repeats)
+    t_merged = _best_time(lambda: ensemble.predict(X), args.repeats)
+
+    print("\n" + "=" * 60)
+    print("ENSEMBLE INFERENCE BENCHMARK")
+    print("=" * 60)
+    print(f"Members:             {args.members} (lookbacks {lookbacks.tolist()})")
+    print(f"Samples:             {args.samples}")
+    print(f"Max member diff:     {max_diff:.2e}")
+    print(f"Sequential predict:  {t_sequential:.3f}s")
+    print(f"Single graph:        {t_merged:.3f}s")
+    print(f"Speedup:             {t_sequential / t_merged:.2f}x")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
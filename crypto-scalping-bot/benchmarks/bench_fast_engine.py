@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fast backtest engine against Backtesting.py.
+
+Usage:
+    python benchmarks/bench_fast_engine.py [--bars 20000] [--repeats 3]
+
+Both engines run every strategy variant on the same synthetic data; trades are
+cross-checked one by one before timings are reported. The batched mode (all
+variants in one pass) is timed against running the variants one by one. Install numba for the
+JIT-compiled bar loop (the plain Python fallback is much slower).
+"""
+
+import io
+import sys
+import time
+import argparse
+import warnings
+import contextlib
+from pathlib import Path
+
+# Add src and benchmarks to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backtesting.lib import FractionalBacktest
+
+from backtest import fast_engine
+from backtest.fast_engine import compare_with_backtesting, run_fast_backtest, run_fast_backtest_batch
+from strategies.lstm_strategy import LSTMScalpingStrategy, AggressiveLSTMStrategy, ConservativeLSTMStrategy
+from synthetic_data import synthetic_backtest_data
+
+
+def _best_time(fn, repeats: int) -> float:
+    """Return the best wall time of `repeats` calls (after one warm-up call)."""
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _quiet(fn):
+    """Wrap fn so strategy init diagnostics and warnings are not printed."""
+    def wrapper():
+        with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+            warnings.simplefilter('ignore')
+            return fn()
+    return wrapper
+
+
+def main() -> None:
+    """Cross-check both engines and report per-strategy timings."""
+    parser = argparse.ArgumentParser(description='Benchmark fast engine vs Backtesting.py')
+    parser.add_argument('--bars', type=int, default=20000, help='Number of 1m bars (20000 ~ two weeks)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed repetitions')
+    parser.add_argument('--commission', type=float, default=0.0004, help='Relative commission')
+    args = parser.parse_args()
+
+    data = synthetic_backtest_data(args.bars)
+    strategies = [LSTMScalpingStrategy, AggressiveLSTMStrategy, ConservativeLSTMStrategy]
+
+    print("\n" + "=" * 60)
+    print("FAST ENGINE BENCHMARK")
+    print("=" * 60)
+    print(f"Bars:                {len(data)}")
+    print(f"JIT (numba):         {'yes' if fast_engine.compiled(fast_engine._simulate) is not None else 'no (plain Python loop)'}")
+
+    for strategy_class in strategies:
+        mismatches = _quiet(lambda: compare_with_backtesting(data, strategy_class, commission=args.commission))()
+        if not mismatches.empty:
+            print(mismatches.head(20).to_string(index=False))
+            raise SystemExit(f"{strategy_class.__name__}: engines disagree on {len(mismatches)} fields")
+
+        bt = FractionalBacktest(data, strategy_class, cash=10000, commission=args.commission,
+                                exclusive_orders=True, trade_on_close=False)
+        t_reference = _best_time(_quiet(bt.run), args.repeats)
+        t_fast = _best_time(_quiet(lambda: run_fast_backtest(data, strategy_class, commission=args.commission)),
+                            args.repeats)
+        n_trades = run_fast_backtest(data, strategy_class, commission=args.commission)['# Trades']
+
+        print(f"\n{strategy_class.__name__}: {n_trades} trades, identical to Backtesting.py")
+        print(f"  Backtesting.py:    {t_reference:.3f}s")
+        print(f"  Fast engine:       {t_fast:.4f}s")
+        print(f"  Speedup:           {t_reference / t_fast:.1f}x")
+
+    t_sequential = _best_time(_quiet(lambda: [run_fast_backtest(data, strategy_class, commission=args.commission)
+                                              for strategy_class in strategies]), args.repeats)
+    t_batch = _best_time(_quiet(lambda: run_fast_backtest_batch(data, strategies, commission=args.commission)),
+                         args.repeats)
+    print(f"\nAll {len(strategies)} variants, fast engine:")
+    print(f"  One by one:        {t_sequential:.4f}s")
+    print(f"  Batched (1 pass):  {t_batch:.4f}s")
+
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and guard) the import time of the backtest entry points.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeats 3] [--max-seconds 0.75]
+
+Each module is imported in a fresh interpreter. Reports the best wall time
+and fails (exit code 1) if a module pulls in a heavy dependency that a
+backtest-only run does not need (TensorFlow, matplotlib, sklearn, ta, ccxt,
+Backtesting.py/bokeh, numba before the first JIT call, ...) or takes longer
+than --max-seconds.
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+
+# Modules a backtest-only run must be able to import cheaply
+ENTRY_POINTS = [
+    'backtest',
+    'backtest.backtest_runner',
+    'backtest.fast_engine',
+    'backtest.optimizer',
+    'backtest.portfolio',
+    'backtest.incremental',
+    'backtest.data_assembly',
+    'backtest.report_builder',
+    'data',
+    'data.intrabar_store',
+    'models',
+    'strategies.signals',
+]
+
+# Loaded only by training, preprocessing, fetching and static plots, by
+# Backtesting.py runs (which pull in bokeh) and by the first JIT-compiled call
+HEAVY_MODULES = ['tensorflow', 'keras', 'matplotlib', 'seaborn', 'sklearn', 'ta', 'ccxt', 'scipy.stats',
+                 'backtesting', 'bokeh', 'numba']
+
+_PROBE = """
+import sys, time, json
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))
+"""
+
+
+def probe(module: str) -> dict:
+    """Import `module` in a fresh interpreter; return its import time and heavy modules loaded."""
+    code = _PROBE.format(src=str(SRC_DIR), module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Import every entry point in a fresh interpreter and check time and dependencies."""
+    parser = argparse.ArgumentParser(description='Benchmark backtest import time')
+    parser.add_argument('--repeats', type=int, default=3, help='Fresh-interpreter imports per module (best is reported)')
+    parser.add_argument('--max-seconds', type=float, default=0.75, help='Fail above this import time')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("IMPORT TIME BENCHMARK")
+    print("=" * 60)
+
+    failures = []
+    for module in ENTRY_POINTS:
+        runs = [probe(module) for _ in range(args.repeats)]
+        seconds = min(run['seconds'] for run in runs)
+        heavy = runs[0]['heavy']
+        status = 'ok'
+        if heavy:
+            status = f"loads {', '.join(heavy)}"
+            failures.append(module)
+        elif seconds > args.max_seconds:
+            status = f"slower than {args.max_seconds}s"
+            failures.append(module)
+        print(f"  {module:<28} {seconds:6.3f}s  {status}")
+
+    print("=" * 60)
+    if failures:
+        print(f"FAILED: {', '.join(failures)}")
+        sys.exit(1)
+    print("All entry points import without heavy dependencies")
+
+
+if __name__ == '__main__':
+    main()
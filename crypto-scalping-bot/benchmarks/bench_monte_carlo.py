@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark Monte Carlo trade-sequence resampling.
+
+Usage:
+    python benchmarks/bench_monte_carlo.py [--paths 10000] [--trades 100 400 2000]
+
+Trades come from a fast-engine backtest on synthetic data, repeated (with
+noise) to reach each requested trade count.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add src and benchmarks to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backtest.fast_engine import run_fast_backtest
+from backtest.monte_carlo import METHODS, run_monte_carlo
+from strategies.lstm_strategy import AggressiveLSTMStrategy
+from synthetic_data import synthetic_backtest_data
+
+
+def main() -> None:
+    """Time every resampling method for each trade count."""
+    parser = argparse.ArgumentParser(description='Benchmark Monte Carlo trade resampling')
+    parser.add_argument('--paths', type=int, default=10000, help='Resampled paths')
+    parser.add_argument('--trades', type=int, nargs='+', default=[100, 400, 2000], help='Trade counts')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed repetitions')
+    args = parser.parse_args()
+
+    pnl = run_fast_backtest(synthetic_backtest_data(20000), AggressiveLSTMStrategy)['_trades']['PnL'].to_numpy()
+    rng = np.random.default_rng(0)
+
+    print("\n" + "=" * 60)
+    print("MONTE CARLO BENCHMARK")
+    print("=" * 60)
+    print(f"Paths: {args.paths}  (source backtest: {len(pnl)} trades)")
+
+    for n_trades in args.trades:
+        sample = rng.choice(pnl, n_trades) * rng.normal(1, 0.1, n_trades)
+        print(f"\n{n_trades} trades:")
+        for method in METHODS:
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                mc = run_monte_carlo(sample, n_paths=args.paths, method=method)
+                timings.append(time.perf_counter() - start)
+            dd = mc['intervals'].loc['max_drawdown_pct']
+            print(f"  {method:<10} {min(timings):.3f}s   max DD 95% CI [{dd['lower']:.2f}%, {dd['upper']:.2f}%]")
+
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark leaderboard queries on a results database of many runs.
+
+Usage:
+    python benchmarks/bench_results_store.py [--runs 100000] [--strategies 20] [--repeats 20]
+
+Fills a temporary ResultsStore with random runs (Backtesting.py-style
+statistics, a few strategies and data hashes), then times the leaderboard
+queries the indexed columns are for.
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from backtest.results_store import ResultsStore
+
+
+def synthetic_runs(n_runs: int, n_strategies: int, seed: int = 0):
+    """Random run records for record_many()."""
+    rng = np.random.default_rng(seed)
+    data_hashes = [f'{i:064x}' for i in range(5)]
+    for i in range(n_runs):
+        stats = {'Return [%]': rng.normal(2, 10), 'Sharpe Ratio': rng.normal(0, 1),
+                 'Sortino Ratio': rng.normal(0, 1.5), 'Calmar Ratio': rng.normal(0, 1),
+                 'Max. Drawdown [%]': -abs(rng.normal(5, 3)), 'Win Rate [%]': rng.uniform(30, 70),
+                 '# Trades': int(rng.integers(0, 2000)), 'Profit Factor': rng.uniform(0.5, 2)}
+        params = {'stop_loss_pct': float(rng.choice([0.003, 0.005, 0.01])),
+                  'take_profit_pct': float(rng.choice([0.006, 0.01, 0.02])),
+                  'prediction_threshold': float(rng.uniform(0.0002, 0.002))}
+        yield {'stats': stats, 'strategy': f'Strategy{i % n_strategies}', 'params': params,
+               'source': 'optimizer', 'data_hash': data_hashes[i % len(data_hashes)],
+               'engine': 'fast', 'run_key': f'{i:064x}'}
+
+
+def timed(function, repeats: int) -> float:
+    """Best wall time of `repeats` calls, in milliseconds."""
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    """Fill a database with --runs runs and time leaderboard queries."""
+    parser = argparse.ArgumentParser(description='Benchmark results database queries')
+    parser.add_argument('--runs', type=int, default=100_000, help='Runs to store')
+    parser.add_argument('--strategies', type=int, default=20, help='Distinct strategy names')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed repeats per query (best is reported)')
+    args = parser.parse_args()
+
+    db_dir = Path(tempfile.mkdtemp(prefix='bench_results_'))
+    try:
+        with ResultsStore(str(db_dir / 'results.db')) as store:
+            start = time.perf_counter()
+            store.record_many(synthetic_runs(args.runs, args.strategies))
+            insert_time = time.perf_counter() - start
+            size_mb = (db_dir / 'results.db').stat().st_size / 1e6
+
+            queries = {
+                'top 20 by Sharpe': lambda: store.leaderboard('sharpe_ratio', n=20),
+                'top 20 by return, one strategy': lambda: store.leaderboard('return_pct', n=20, strategy='Strategy3'),
+                'top 20 by Sharpe, one data hash': lambda: store.leaderboard('sharpe_ratio', n=20,
+                                                                             data_hash=f'{2:064x}'),
+                'top 20 by Calmar, >= 100 trades': lambda: store.leaderboard('calmar_ratio', n=20, min_trades=100),
+                'best Sharpe per strategy (SQL)': lambda: store.query(
+                    'SELECT strategy, MAX(sharpe_ratio) AS best FROM runs GROUP BY strategy'),
+            }
+            timings = {name: timed(query, args.repeats) for name, query in queries.items()}
+
+            # Re-recording the same runs adds nothing
+            store.record_many(synthetic_runs(1000, args.strategies))
+            stored = len(store)
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print("RESULTS STORE BENCHMARK")
+    print("=" * 60)
+    print(f"Runs: {args.runs:,}  database: {size_mb:.0f} MB  insert: {insert_time:.1f}s "
+          f"({args.runs / insert_time:,.0f} runs/s)")
+    for name, ms in timings.items():
+        print(f"  {name:<36} {ms:8.2f} ms")
+    print(f"Rows after re-recording 1,000 known runs: {stored:,}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark saving and reopening a backtest run's trades and equity curve.
+
+Usage:
+    python benchmarks/bench_trade_log.py [--bars 500000]
+
+Runs the fast engine once, then compares the columnar trade log
+(save_trade_log / memory-mapped load_trade_log) with CSV files of the same
+frames: write time, size on disk, time to reopen and time until
+PerformanceAnalyzer metrics are available.
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_data import synthetic_backtest_data
+from backtest.fast_engine import run_fast_backtest
+from backtest.trade_log import save_trade_log, load_trade_log
+from backtest.performance_analyzer import PerformanceAnalyzer
+
+
+def dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def main() -> None:
+    """Compare the columnar trade log with CSV for one run."""
+    parser = argparse.ArgumentParser(description='Benchmark trade log persistence')
+    parser.add_argument('--bars', type=int, default=500_000, help='Bars in the backtest')
+    args = parser.parse_args()
+
+    stats = run_fast_backtest(synthetic_backtest_data(args.bars))
+    trades, equity = stats['_trades'], stats['_equity_curve']
+    work_dir = Path(tempfile.mkdtemp(prefix='bench_trade_log_'))
+    try:
+        start = time.perf_counter()
+        save_trade_log(stats, work_dir / 'trade_log')
+        log_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        trades.to_csv(work_dir / 'trades.csv')
+        equity.to_csv(work_dir / 'equity.csv')
+        csv_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run = load_trade_log(work_dir / 'trade_log')
+        log_open = time.perf_counter() - start
+        metrics = PerformanceAnalyzer(run['_trades'], run['_equity_curve']['Equity']).calculate_metrics()
+        log_total = time.perf_counter() - start
+
+        start = time.perf_counter()
+        csv_trades = pd.read_csv(work_dir / 'trades.csv', index_col=0,
+                                 parse_dates=['EntryTime', 'ExitTime'])
+        csv_equity = pd.read_csv(work_dir / 'equity.csv', index_col=0, parse_dates=True)
+        csv_open = time.perf_counter() - start
+        PerformanceAnalyzer(csv_trades, csv_equity['Equity']).calculate_metrics()
+        csv_total = time.perf_counter() - start
+
+        expected = PerformanceAnalyzer(trades, equity['Equity']).calculate_metrics()
+        log_size = dir_size(work_dir / 'trade_log')
+        csv_size = (work_dir / 'trades.csv').stat().st_size + (work_dir / 'equity.csv').stat().st_size
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print("TRADE LOG BENCHMARK")
+    print("=" * 60)
+    print(f"Bars: {args.bars:,}  trades: {len(trades):,}")
+    print(f"{'':<14}{'write':>9}{'open':>9}{'+metrics':>10}{'size':>10}")
+    print(f"{'trade log':<14}{log_write:8.2f}s{log_open:8.3f}s{log_total:9.2f}s{log_size / 1e6:8.1f}MB")
+    print(f"{'CSV':<14}{csv_write:8.2f}s{csv_open:8.3f}s{csv_total:9.2f}s{csv_size / 1e6:8.1f}MB")
+    print(f"Metrics from the trade log match the in-memory run: {metrics == expected}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
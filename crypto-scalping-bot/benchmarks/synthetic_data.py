@@ -0,0 +1,54 @@
+"""
+Synthetic backtest inputs for benchmarks.
+
+Builds a frame with the columns BacktestRunner.prepare_data_for_backtest()
+produces (OHLCV, RSI, MACD, MACD_Signal, Predicted_Change, ...) from a random
+walk, without needing processed_data.csv, predictions.csv or the `ta` package.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_backtest_data(n_bars: int = 20000, seed: int = 42, horizons=(5,),
+                            start: str = '2024-03-16') -> pd.DataFrame:
+    """
+    Generate 1m bars with indicators and noisy-but-informative predictions.
+
+    Args:
+        n_bars: Number of 1-minute bars
+        seed: Random seed
+        horizons: Extra Predicted_Change_H{n} columns to add
+        start: First bar timestamp
+
+    Returns:
+        pd.DataFrame indexed by datetime, ready for run_backtest()
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.0015, n_bars)
+    close = 40000 * np.exp(np.cumsum(returns))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, n_bars)))
+
+    data = pd.DataFrame({
+        'Open': open_, 'High': high, 'Low': low, 'Close': close,
+        'Volume': rng.uniform(10, 100, n_bars),
+    }, index=pd.date_range(start, periods=n_bars, freq='1min'))
+
+    # Wilder RSI and MACD(12, 26, 9) - close enough to `ta` for benchmarking
+    delta = data['Close'].diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    data['RSI'] = 100 - 100 / (1 + gain / loss.replace(0, np.nan))
+    data['MACD'] = data['Close'].ewm(span=12, adjust=False).mean() - data['Close'].ewm(span=26, adjust=False).mean()
+    data['MACD_Signal'] = data['MACD'].ewm(span=9, adjust=False).mean()
+
+    # Predictions correlated with the next bar's return
+    next_return = np.r_[returns[1:], 0.0]
+    data['Predicted_Change'] = 0.5 * next_return + rng.normal(0, 0.001, n_bars)
+    data['Actual_Norm'] = returns
+    for horizon in horizons:
+        data[f'Predicted_Change_H{horizon}'] = data['Predicted_Change'] * np.sqrt(horizon) + rng.normal(0, 0.001, n_bars)
+
+    return data.dropna()
@@ -2,37 +2,54 @@
 """
 Complete pipeline to run the crypto scalping bot from start to finish.
 
+Stages (src/pipeline/stages.py) declare their input files, config keys and
+outputs; a stage runs only if one of those changed since its last successful
+run (recorded in results/pipeline_state.json). Changing a strategy parameter
+therefore reruns the backtest without refetching or retraining.
+
 Usage:
-    python run_pipeline.py [--skip-fetch] [--skip-train]
+    python run_pipeline.py [--skip-fetch] [--skip-train] [--force [STAGE ...]]
+                           [--workers N] [--dry-run]
 
 Options:
     --skip-fetch    Skip data fetching step (use existing data)
     --skip-train    Skip model training (use existing model)
+    --force         Rerun the given stages (all if none given) even if up to date
+    --workers       Run independent stages (preprocess, train) in parallel processes
+    --dry-run       Show which stages are out of date without running them
 """
 
 import sys
 import argparse
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
+
+import yaml
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 
-def run_pipeline(skip_fetch: bool = False, skip_train: bool = False) -> bool:
+def run_pipeline(skip_fetch: bool = False, skip_train: bool = False, force: Optional[Sequence[str]] = None,
+                 workers: int = 1, dry_run: bool = False,
+                 state_path: str = 'results/pipeline_state.json') -> bool:
     """
-    Execute complete end-to-end pipeline: fetch, preprocess, train, backtest.
+    Execute the end-to-end pipeline: fetch, preprocess, train, backtest, report.
 
-    Pipeline steps:
-        1. Fetch OHLCV data from OKX (if not skipped)
+    Pipeline steps (each skipped when its inputs are unchanged):
+        1. Fetch OHLCV data from OKX
         2. Add technical indicators and create sequences
-        3. Train LSTM model (if not skipped)
+        3. Train LSTM model (alongside step 2 when workers > 1)
         4. Run backtest with trained model and strategy
         5. Generate performance reports and visualizations
 
     Args:
         skip_fetch: Use existing data files instead of fetching new data
         skip_train: Use existing trained model instead of retraining
+        force: Stage names to rerun regardless of the cache ([] = all stages)
+        workers: Processes for stages that can run at the same time
+        dry_run: Only print which stages would run
+        state_path: Where stage keys are recorded
 
     Returns:
         True if pipeline completed successfully, False if any step failed
@@ -42,61 +59,41 @@ def run_pipeline(skip_fetch: bool = False, skip_train: bool = False) -> bool:
         >>> if success:
         ...     print("Check results/ directory for backtest output")
     """
+    from pipeline import PipelineState, run_dag
+    from pipeline.stages import STAGES
+
     print("=" * 70)
     print("CRYPTO SCALPING BOT - COMPLETE PIPELINE")
     print("=" * 70)
 
-    # Step 1: Fetch data
-    if not skip_fetch:
-        print("\n" + "=" * 70)
-        print("STEP 1: FETCHING HISTORICAL DATA")
-        print("=" * 70)
-        try:
-            from data.fetch_data import main as fetch_main
-            fetch_main()
-        except Exception as e:
-            print(f"Error fetching data: {e}")
-            print("You can skip this step with --skip-fetch if you already have data")
-            return False
-    else:
-        print("\nSkipping data fetch (using existing data)")
-
-    # Step 2: Preprocess data
-    print("\n" + "=" * 70)
-    print("STEP 2: PREPROCESSING DATA AND ADDING INDICATORS")
-    print("=" * 70)
-    try:
-        from data.preprocess import main as preprocess_main
-        preprocess_main()
-    except Exception as e:
-        print(f"Error preprocessing data: {e}")
+    with open('config/config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+
+    if force is not None and not force:
+        force = [stage.name for stage in STAGES]
+    unknown = set(force or ()) - {stage.name for stage in STAGES}
+    if unknown:
+        print(f"Unknown stages: {sorted(unknown)} (stages: {[stage.name for stage in STAGES]})")
         return False
 
-    # Step 3: Train LSTM model
-    if not skip_train:
-        print("\n" + "=" * 70)
-        print("STEP 3: TRAINING LSTM MODEL")
-        print("=" * 70)
-        try:
-            from models.lstm_model import main as train_main
-            train_main()
-        except Exception as e:
-            print(f"Error training model: {e}")
-            print("You can skip this step with --skip-train if you already have a trained model")
-            return False
-    else:
-        print("\nSkipping model training (using existing model)")
-
-    # Step 4: Run backtest
+    skip = [name for name, flag in (('fetch', skip_fetch), ('train', skip_train)) if flag]
+    status = run_dag(STAGES, config, state=PipelineState(state_path), workers=workers,
+                     force=force or (), skip=skip, dry_run=dry_run)
+
     print("\n" + "=" * 70)
-    print("STEP 4: RUNNING BACKTEST")
+    print("PIPELINE SUMMARY")
     print("=" * 70)
-    try:
-        from backtest.backtest_runner import main as backtest_main
-        backtest_main()
-    except Exception as e:
-        print(f"Error running backtest: {e}")
+    for stage in STAGES:
+        print(f"  {stage.name:<12} {status.get(stage.name, 'not run')}")
+
+    if any(s in ('failed', 'blocked') for s in status.values()):
+        if status.get('fetch') == 'failed':
+            print("\nYou can skip data fetching with --skip-fetch if you already have data")
+        if status.get('train') == 'failed':
+            print("\nYou can skip training with --skip-train if you already have a trained model")
         return False
+    if dry_run:
+        return True
 
     print("\n" + "=" * 70)
     print("PIPELINE COMPLETE!")
@@ -105,6 +102,7 @@ def run_pipeline(skip_fetch: bool = False, skip_train: bool = False) -> bool:
     print("  - backtest_plot.html: Interactive backtest visualization")
     print("  - backtest_results.csv: Detailed backtest metrics")
     print("  - strategy_comparison.csv: Comparison of different strategies")
+    print("  - performance_report.json: Performance metrics of the saved run")
     print("  - equity_curve.png: Equity and drawdown charts")
     print("\nNext steps:")
     print("  1. Review the backtest results")
@@ -125,6 +123,8 @@ def main() -> None:
         python run_pipeline.py --skip-fetch       # Use existing data
         python run_pipeline.py --skip-train       # Use existing model
         python run_pipeline.py --skip-fetch --skip-train  # Only backtest
+        python run_pipeline.py --force backtest   # Rerun the backtest even if cached
+        python run_pipeline.py --workers 2        # Preprocess and train in parallel
     """
     parser = argparse.ArgumentParser(
         description='Run the complete crypto scalping bot pipeline'
@@ -140,11 +140,32 @@ def main() -> None:
         help='Skip model training (use existing model)'
     )
 
+    parser.add_argument(
+        '--force',
+        nargs='*',
+        metavar='STAGE',
+        help='Rerun these stages (all if none given) even if their inputs are unchanged'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Processes for stages that can run concurrently (default: 1)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only show which stages are out of date'
+    )
+
     args = parser.parse_args()
 
     success = run_pipeline(
         skip_fetch=args.skip_fetch,
-        skip_train=args.skip_train
+        skip_train=args.skip_train,
+        force=args.force,
+        workers=args.workers,
+        dry_run=args.dry_run
     )
 
     sys.exit(0 if success else 1)
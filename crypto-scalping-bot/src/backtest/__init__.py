@@ -1,6 +1,15 @@
 """Backtesting and simulation modules."""
 
-from .backtest_runner import BacktestRunner
-from .performance_analyzer import PerformanceAnalyzer
-
 __all__ = ['BacktestRunner', 'PerformanceAnalyzer']
+
+
+def __getattr__(name):
+    # Import lazily so `import backtest.fast_engine` (optimizer workers, the
+    # portfolio backtester) does not load the runner's and analyzer's dependencies
+    if name == 'BacktestRunner':
+        from .backtest_runner import BacktestRunner
+        return BacktestRunner
+    if name == 'PerformanceAnalyzer':
+        from .performance_analyzer import PerformanceAnalyzer
+        return PerformanceAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
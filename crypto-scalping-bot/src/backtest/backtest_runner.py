@@ -4,22 +4,36 @@ Run backtests with the LSTM trading strategy.
 
 import pandas as pd
 import numpy as np
-from backtesting import Backtest
-from backtesting.lib import crossover
-try:
-    from backtesting.lib import FractionalBacktest
-except ImportError:
-    # Fallback if FractionalBacktest not available
-    FractionalBacktest = None
 from pathlib import Path
 import yaml
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from strategies.lstm_strategy import LSTMScalpingStrategy, AggressiveLSTMStrategy, ConservativeLSTMStrategy
-from models.lstm_model import LSTMPricePredictor
-from data.preprocess import DataPreprocessor
+from strategies.signals import resolve_strategy
+from backtest.fast_engine import run_fast_backtest, run_fast_backtest_batch, DEFAULT_FRACTIONAL_UNIT
+from backtest.optimizer import ParallelOptimizer, DEFAULT_PARAM_GRID
+from backtest.result_cache import ResultCache, result_key, hash_frame, _strategy_fingerprint
+from backtest.results_store import ResultsStore
+from backtest.trade_log import save_trade_log
+from backtest.data_assembly import PROCESSED_COLUMNS, assemble_backtest_frame, read_columns
+from backtest.plotting import plot_backtest
+from data.intrabar_store import IntrabarStore
+
+
+def _fractional_backtest():
+    """
+    backtesting.lib.FractionalBacktest, or None if this Backtesting.py lacks it.
+
+    Backtesting.py (and bokeh with it) is imported here rather than at module
+    level, so fast-engine runs and the optimizer don't pay for it on import.
+    """
+    try:
+        from backtesting.lib import FractionalBacktest
+    except ImportError:
+        # Fallback if FractionalBacktest not available
+        return None
+    return FractionalBacktest
 
 
 class BacktestRunner:
@@ -32,8 +46,18 @@ class BacktestRunner:
 
         self.results = None
         self.bt = None
-
-    def prepare_data_for_backtest(self, df, predictions_norm, actuals_norm):
+        self.data = None
+        self.optimization_results = None
+        self.optimization_trades = {}
+
+        # Content-addressed result cache (backtesting.cache in config)
+        backtest_config = self.config['backtesting']
+        self.cache = ResultCache(backtest_config.get('cache_dir', 'results/cache')) \
+            if backtest_config.get('cache', False) else None
+        # Run history database (backtesting.results_db in config)
+        self.store = ResultsStore(backtest_config['results_db']) if backtest_config.get('results_db') else None
+
+    def prepare_data_for_backtest(self, df, predictions_norm, actuals_norm, horizon_predictions=None):
         """
         Prepare data in the format required by backtesting.py.
 
@@ -41,6 +65,8 @@ class BacktestRunner:
             df (pd.DataFrame): OHLCV data with technical indicators
             predictions_norm (np.array): LSTM predictions (normalized)
             actuals_norm (np.array): Actual values (normalized)
+            horizon_predictions (dict): Optional {horizon: predictions} from a
+                multi-horizon model, added as Predicted_Change_H{horizon}
 
         Returns:
             pd.DataFrame: Data formatted for backtesting.py
@@ -71,25 +97,75 @@ class BacktestRunner:
         bt_data['Predicted_Change'] = predictions_norm  # These are % changes now
         bt_data['Actual_Norm'] = actuals_norm  # Keep for reference
 
+        # Multi-horizon model outputs (cumulative change over the next n bars)
+        for horizon, values in (horizon_predictions or {}).items():
+            bt_data[f'Predicted_Change_H{horizon}'] = values
+
         # Drop rows with NaN
         bt_data = bt_data.dropna()
 
         return bt_data
 
-    def run_backtest(self, data, strategy_class=LSTMScalpingStrategy, cash=10000, commission=0.0004):
+    def run_backtest(self, data, strategy_class=None, cash=10000, commission=0.0004, engine=None):
         """
         Run a backtest with the specified strategy.
 
         Args:
             data (pd.DataFrame): Prepared data for backtesting
-            strategy_class: Strategy class to use
+            strategy_class: Strategy class to use (default: LSTMScalpingStrategy)
             cash (float): Initial capital
             commission (float): Trading commission (0.0004 = 0.04%)
+            engine (str): 'backtesting' (Backtesting.py) or 'fast' (array engine,
+                LSTMScalpingStrategy and its parameter variants only).
+                Default: config backtesting.engine
 
         Returns:
             pd.Series: Backtest results
         """
+        engine = engine or self.config['backtesting'].get('engine', 'backtesting')
+        if engine not in ('backtesting', 'fast'):
+            raise ValueError(f"Unknown backtest engine '{engine}' (use 'backtesting' or 'fast')")
+        self.data = data  # For plot_results()
+        strategy_class = resolve_strategy(strategy_class)
+
+        # Same units as FractionalBacktest (or whole units without it)
+        FractionalBacktest = _fractional_backtest()
+        fractional_unit = None if FractionalBacktest is None else DEFAULT_FRACTIONAL_UNIT
+
+        # Lower-timeframe data for bars where both SL and TP are in range (fast engine only)
+        intrabar = self._intrabar_store(engine)
+
+        key = self._run_key(data, strategy_class, cash, commission, engine, fractional_unit,
+                              extra={'intrabar': intrabar.fingerprint()} if intrabar else None)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            print(f"\nUsing cached {engine} backtest of {strategy_class.__name__} "
+                  f"({data.index[0]} to {data.index[-1]}, key {key[:12]})")
+            self.bt = None  # Nothing to plot without a fresh Backtesting.py run
+            self.results = cached
+            self._record(self.results, data, strategy_class, engine, key)
+            return self.results
+
+        if engine == 'fast':
+            print(f"\nRunning fast backtest with {strategy_class.__name__}...")
+            print(f"Data period: {data.index[0]} to {data.index[-1]}")
+            print(f"Total bars: {len(data)}")
+
+            self.bt = None  # No Backtest instance to plot
+            self.results = run_fast_backtest(data, strategy_class, cash=cash, commission=commission,
+                                             fractional_unit=fractional_unit, intrabar=intrabar)
+            if intrabar is not None:
+                counters = intrabar.counters
+                print(f"Intrabar SL/TP resolution: {counters['ambiguous']} ambiguous bars, "
+                      f"{counters['tp_first']} TP first, {counters['sl_first']} SL first, "
+                      f"{counters['unresolved']} unresolved (SL assumed)")
+            if self.cache is not None:
+                self.cache.put(key, self.results)
+            self._record(self.results, data, strategy_class, engine, key)
+            return self.results
+
         # Use FractionalBacktest if available for trading expensive assets like BTC
+        from backtesting import Backtest
         backtest_class = Backtest if FractionalBacktest is None else FractionalBacktest
         
         self.bt = backtest_class(
@@ -108,9 +184,148 @@ class BacktestRunner:
         print(f"Total bars: {len(data)}")
 
         self.results = self.bt.run()
+        if self.cache is not None:
+            self.cache.put(key, self.results)
+        self._record(self.results, data, strategy_class, engine, key)
 
         return self.results
 
+    def _run_key(self, data, strategy_class, cash, commission, engine, fractional_unit, params=None,
+                 extra=None):
+        """Result cache / results database key of a run, or None when both are disabled."""
+        if self.cache is None and self.store is None:
+            return None
+        return result_key(self._data_digest(data), strategy_class, params, cash=cash,
+                          commission=commission, engine=engine, fractional_unit=fractional_unit, extra=extra)
+
+    def _data_digest(self, data):
+        """hash_frame(data) of the frame's current contents (frames may be edited between runs)."""
+        return hash_frame(data)
+
+    def _record(self, results, data, strategy_class, engine, key=None, params=None, source='backtest',
+                label=None):
+        """Append a run to the results database (no-op when backtesting.results_db is unset)."""
+        if self.store is None:
+            return
+        fingerprint = _strategy_fingerprint(strategy_class)['params']
+        fingerprint.update(params or {})
+        self.store.record(results, strategy_class.__name__, fingerprint, source=source, label=label,
+                          data_hash=self._data_digest(data), engine=engine, run_key=key)
+
+    def _record_sweep(self, data, ranked, param_grid, cash, commission, engine):
+        """Append every evaluated parameter set of an optimization to the results database."""
+        data_hash = self._data_digest(data)
+        strategy_class = resolve_strategy()
+        fingerprint = _strategy_fingerprint(strategy_class)['params']
+        runs = []
+        for row in ranked.to_dict('records'):
+            # Sweep tables hold parameters as floats; restore the grid's types
+            params = {name: type(values[0])(row[name]) for name, values in param_grid.items()}
+            stats = {name: value for name, value in row.items() if name not in param_grid}
+            runs.append({'stats': stats, 'strategy': strategy_class.__name__,
+                         'params': {**fingerprint, **params}, 'source': 'optimizer', 'data_hash': data_hash,
+                         'engine': engine,
+                         'run_key': result_key(data_hash, strategy_class, params, cash=cash,
+                                               commission=commission, engine=engine,
+                                               fractional_unit=DEFAULT_FRACTIONAL_UNIT)})
+        self.store.record_many(runs)
+        print(f"Stored {len(runs)} runs in {self.store.path}")
+
+    def _intrabar_store(self, engine):
+        """IntrabarStore from backtesting.intrabar_store, or None if unset/unusable."""
+        store_dir = self.config['backtesting'].get('intrabar_store')
+        if not store_dir:
+            return None
+        if engine != 'fast':
+            print("Note: backtesting.intrabar_store is only used by the fast engine "
+                  "(Backtesting.py assumes SL before TP)")
+            return None
+        try:
+            return IntrabarStore(store_dir)
+        except FileNotFoundError as e:
+            print(f"Warning: {e}; ambiguous bars assume SL before TP")
+            return None
+
+    def compare_strategies(self, data, strategies, cash=10000, commission=0.0004, engine=None):
+        """
+        Backtest several strategy variants and tabulate their key statistics.
+
+        With the fast engine all variants are simulated in a single pass over
+        the bars (fast_engine.run_fast_backtest_batch); with Backtesting.py
+        they run one after another. When backtesting.intrabar_store is set,
+        fast-engine variants run one by one with the store (the batched bar
+        loop cannot look up ambiguous bars), so the table agrees with
+        run_backtest().
+
+        Args:
+            data (pd.DataFrame): Prepared data for backtesting
+            strategies (list): (name, variant) pairs; a variant is a strategy
+                class or, for the fast engine, a dict of LSTMScalpingStrategy
+                parameter overrides
+            cash (float): Initial capital
+            commission (float): Trading commission
+            engine (str): 'backtesting' or 'fast' (default: config backtesting.engine)
+
+        Returns:
+            pd.DataFrame: One row per strategy (Return, Sharpe, Max Drawdown, Win Rate, # Trades)
+        """
+        engine = engine or self.config['backtesting'].get('engine', 'backtesting')
+        if engine == 'fast':
+            fractional_unit = None if _fractional_backtest() is None else DEFAULT_FRACTIONAL_UNIT
+            intrabar = self._intrabar_store(engine)
+            extra = {'intrabar': intrabar.fingerprint()} if intrabar else None
+            keys = []
+            for _, variant in strategies:
+                strategy_class, params = (variant, None) if isinstance(variant, type) else (resolve_strategy(), variant)
+                keys.append(self._run_key(data, strategy_class, cash, commission, engine, fractional_unit, params,
+                                          extra=extra))
+            all_results = [self.cache.get(key) if self.cache is not None else None for key in keys]
+            missing = [i for i, results in enumerate(all_results) if results is None]
+            variants = [strategies[i][1] for i in missing]
+            if intrabar is None:
+                print(f"\nRunning {len(missing)} of {len(strategies)} strategy variants in one pass "
+                      f"(fast engine, {len(strategies) - len(missing)} cached)...")
+                batch = run_fast_backtest_batch(data, variants, cash=cash, commission=commission,
+                                                fractional_unit=fractional_unit) if missing else []
+            else:
+                print(f"\nRunning {len(missing)} of {len(strategies)} strategy variants with intrabar "
+                      f"SL/TP resolution (fast engine, {len(strategies) - len(missing)} cached)...")
+                batch = [run_fast_backtest(data, variant if isinstance(variant, type) else None, cash=cash,
+                                           commission=commission, fractional_unit=fractional_unit,
+                                           intrabar=intrabar, **({} if isinstance(variant, type) else variant))
+                         for variant in variants]
+            for i, results in zip(missing, batch):
+                all_results[i] = results
+                if self.cache is not None:
+                    self.cache.put(keys[i], results)
+            for (name, variant), key, results in zip(strategies, keys, all_results):
+                strategy_class, params = (variant, None) if isinstance(variant, type) else (resolve_strategy(), variant)
+                self._record(results, data, strategy_class, engine, key, params, source='comparison', label=name)
+        else:
+            all_results = []
+            fractional_unit = None if _fractional_backtest() is None else DEFAULT_FRACTIONAL_UNIT
+            for name, strategy_class in strategies:
+                print(f"\nTesting {name} strategy...")
+                results = self.run_backtest(data, strategy_class=strategy_class, cash=cash,
+                                            commission=commission, engine=engine)
+                all_results.append(results)
+                # Already stored by run_backtest; this adds the variant name
+                self._record(results, data, strategy_class, engine, label=name, source='comparison',
+                             key=self._run_key(data, strategy_class, cash, commission, engine, fractional_unit))
+
+        comparison_results = []
+        for (name, _), results in zip(strategies, all_results):
+            comparison_results.append({
+                'Strategy': name,
+                'Return [%]': results['Return [%]'],
+                'Sharpe Ratio': results['Sharpe Ratio'],
+                'Max Drawdown [%]': results['Max. Drawdown [%]'],
+                'Win Rate [%]': results['Win Rate [%]'],
+                '# Trades': results['# Trades']
+            })
+
+        return pd.DataFrame(comparison_results)
+
     def print_results(self):
         """Print backtest results in a formatted way."""
         if self.results is None:
@@ -142,59 +357,100 @@ class BacktestRunner:
 
         print("\n" + "=" * 60)
 
-    def plot_results(self, save_path='results/backtest_plot.html'):
-        """Generate interactive plot of backtest results."""
-        if self.bt is None:
+    def plot_results(self, save_path='results/backtest_plot.html', max_points=None):
+        """
+        Generate interactive plot of backtest results.
+
+        Args:
+            save_path (str): Output HTML file
+            max_points (int): Downsample price and equity to this many points
+                (trades are always drawn in full). Default: config
+                backtesting.plot_max_points; None there = Backtest.plot() of every bar
+        """
+        if self.results is None:
             print("No backtest available. Run a backtest first.")
             return
 
+        if max_points is None:
+            max_points = self.config['backtesting'].get('plot_max_points')
+        if max_points:
+            # Works for fast-engine and cached results too
+            plot_backtest(self.results, self.data, save_path, max_points=max_points)
+            print(f"\nBacktest plot saved to {save_path} (at most {max_points:,} points per series)")
+            return
+
+        if self.bt is None:
+            # Fast engine or cache hit (same inputs as the run that wrote save_path)
+            print("No Backtesting.py run to plot (fast engine or cached result); "
+                  "set backtesting.plot_max_points for a downsampled plot.")
+            return
+
         Path(save_path).parent.mkdir(exist_ok=True)
         self.bt.plot(filename=save_path, open_browser=False)
         print(f"\nBacktest plot saved to {save_path}")
 
-    def optimize_strategy(self, data, cash=10000, commission=0.0004):
+    def optimize_strategy(self, data, cash=10000, commission=0.0004, param_grid=None, method='grid',
+                          maximize='Sharpe Ratio', n_iter=100, workers=None, engine='fast', on_result=None,
+                          keep_trades=0):
         """
-        Optimize strategy parameters using grid search.
+        Optimize strategy parameters across a process pool.
+
+        The data is placed in shared memory once and parameter sets are
+        evaluated in parallel (see backtest.optimizer.ParallelOptimizer).
 
         Args:
             data (pd.DataFrame): Prepared data for backtesting
             cash (float): Initial capital
             commission (float): Trading commission
+            param_grid (dict): {param: [values]} or {param: (low, high)} for random
+                search (default: the 4x4x4x4 grid below)
+            method (str): 'grid', 'random' or 'halving' (successive halving)
+            maximize (str): Statistic to maximize
+            n_iter (int): Samples for 'random' / 'halving'
+            workers (int): Worker processes (default: CPU count)
+            engine (str): 'fast' or 'backtesting' simulator per evaluation
+            on_result (callable): Called with each result as it finishes
+            keep_trades (int): Keep the trade logs of this many best parameter
+                sets in self.optimization_trades (by rank, 0 = best); all other
+                runs keep scalar statistics only
 
         Returns:
-            pd.DataFrame: Optimization results
+            pd.Series: Parameters and statistics of the best parameter set
+            (the full ranked table is kept in self.optimization_results)
         """
         print("\nOptimizing strategy parameters...")
-        print("This may take several minutes...")
 
-        backtest_class = Backtest if FractionalBacktest is None else FractionalBacktest
-        
-        bt = backtest_class(
-            data,
-            LSTMScalpingStrategy,
-            cash=cash,
-            commission=commission,
-            exclusive_orders=True
+        optimizer = ParallelOptimizer(data, resolve_strategy(), cash=cash, commission=commission,
+                                      engine=engine, workers=workers, cache=self.cache)
+        self.optimization_results = optimizer.optimize(
+            param_grid=param_grid,
+            method=method,
+            maximize=maximize,
+            n_iter=n_iter,
+            constraint=lambda p: p.get('take_profit_pct', np.inf) > p.get('stop_loss_pct', 0),
+            on_result=on_result,
+            keep_trades=keep_trades
         )
+        self.optimization_trades = optimizer.top_trades
 
-        # Parameter grid
-        optimization_results = bt.optimize(
-            prediction_threshold=[0.001, 0.002, 0.003, 0.004],
-            stop_loss_pct=[0.003, 0.005, 0.007, 0.01],
-            take_profit_pct=[0.006, 0.01, 0.015, 0.02],
-            position_size=[0.5, 0.7, 0.9, 0.95],
-            maximize='Sharpe Ratio',
-            constraint=lambda p: p.take_profit_pct > p.stop_loss_pct
-        )
+        param_names = list(param_grid or DEFAULT_PARAM_GRID)
+        if self.store is not None:
+            self._record_sweep(data, self.optimization_results, param_grid or DEFAULT_PARAM_GRID,
+                               cash, commission, engine)
+        best_params = self.optimization_results.iloc[0][param_names].to_dict()
+        optimization_results = pd.Series(self.optimization_results.iloc[0])
 
         print("\nOptimal parameters found:")
-        print(optimization_results)
+        for name, value in best_params.items():
+            print(f"  {name}: {value}")
+        print(f"  {maximize}: {optimization_results[maximize]:.4f}")
 
         return optimization_results
 
-
 def main():
     """Run the full backtest pipeline."""
+    from strategies.lstm_strategy import LSTMScalpingStrategy, AggressiveLSTMStrategy, ConservativeLSTMStrategy
+
     print("=" * 60)
     print("CRYPTO SCALPING BOT - BACKTEST")
     print("=" * 60)
@@ -209,8 +465,8 @@ def main():
         print("Processed data not found. Run preprocess.py first.")
         sys.exit(1)
 
-    df = pd.read_csv(processed_data_path)
-    df['datetime'] = pd.to_datetime(df['datetime'])
+    # Only the columns the backtest uses, timestamps as int64
+    processed = read_columns(processed_data_path, [source for _, source in PROCESSED_COLUMNS])
 
     # Load predictions
     predictions_path = data_dir / 'predictions.csv'
@@ -218,15 +474,15 @@ def main():
         print("Predictions not found. Train the LSTM model first.")
         sys.exit(1)
 
-    predictions_df = pd.read_csv(predictions_path)
+    predictions = read_columns(predictions_path)
 
     # 2. Prepare predictions (use normalized values directly)
     print("\n2. Preparing predictions...")
     
     # Use NORMALIZED predictions and actuals directly
     # Percentage changes in normalized space ≈ percentage changes in real price space
-    predictions_normalized = predictions_df['predicted'].values
-    actuals_normalized = predictions_df['actual'].values
+    predictions_normalized = predictions['predicted']
+    actuals_normalized = predictions['actual']
     
     print(f"\n{'='*60}")
     print("PREDICTION ANALYSIS (Normalized Space)")
@@ -243,29 +499,13 @@ def main():
     print(f"  Max: {pct_diffs.max():.4f}%")
     print(f"{'='*60}\n")
 
-    # Align predictions with processed data by datetime
-    pred_dates = pd.to_datetime(predictions_df['datetime'])
-    
-    # Create dictionaries for both predictions and actuals (normalized)
-    pred_dict = dict(zip(pred_dates, predictions_normalized))
-    actual_dict = dict(zip(pred_dates, actuals_normalized))
-
-    # Add NORMALIZED predictions and actuals to dataframe
-    df['predicted_normalized'] = df['datetime'].map(pred_dict)
-    df['actual_normalized'] = df['datetime'].map(actual_dict)
-
     # 3. Prepare data for backtesting
     print("\n3. Preparing data for backtesting...")
     runner = BacktestRunner()
-    
-    # Filter to rows where we have predictions
-    df_with_preds = df[df['predicted_normalized'].notna()].copy()
-    
-    bt_data = runner.prepare_data_for_backtest(
-        df_with_preds,
-        df_with_preds['predicted_normalized'].values,
-        df_with_preds['actual_normalized'].values
-    )
+
+    # Join predictions (incl. predicted_h{n} multi-horizon columns) onto the
+    # bars by timestamp; bars without a prediction or with NaN are dropped
+    bt_data = assemble_backtest_frame(processed, predictions)
 
     print(f"Backtest data ready: {len(bt_data)} bars")
 
@@ -288,6 +528,10 @@ def main():
     results.to_csv(results_path)
     print(f"\nResults saved to {results_path}")
 
+    # Trades and equity curve as typed columns, for performance_analyzer.py
+    trade_log_path = save_trade_log(results, results_dir / 'trade_log')
+    print(f"Trade log saved to {trade_log_path}")
+
     # 6. Plot results
     runner.plot_results()
 
@@ -301,28 +545,13 @@ def main():
         ('Conservative', ConservativeLSTMStrategy),
     ]
 
-    comparison_results = []
-
-    for name, strategy_class in strategies:
-        print(f"\nTesting {name} strategy...")
-        results = runner.run_backtest(
-            bt_data,
-            strategy_class=strategy_class,
-            cash=runner.config['trading']['initial_capital'],
-            commission=runner.config['backtesting']['commission']
-        )
+    comparison_df = runner.compare_strategies(
+        bt_data,
+        strategies,
+        cash=runner.config['trading']['initial_capital'],
+        commission=runner.config['backtesting']['commission']
+    )
 
-        comparison_results.append({
-            'Strategy': name,
-            'Return [%]': results['Return [%]'],
-            'Sharpe Ratio': results['Sharpe Ratio'],
-            'Max Drawdown [%]': results['Max. Drawdown [%]'],
-            'Win Rate [%]': results['Win Rate [%]'],
-            '# Trades': results['# Trades']
-        })
-
-    # Create comparison DataFrame
-    comparison_df = pd.DataFrame(comparison_results)
     print("\n" + "=" * 60)
     print("STRATEGY COMPARISON")
     print("=" * 60)
@@ -0,0 +1,198 @@
+"""
+Vectorized performance metrics for many backtest runs at once.
+
+PerformanceAnalyzer.calculate_metrics() scores one trades DataFrame with a
+dozen pandas filters, a groupby for streaks and an expanding max for the
+drawdown. Scoring thousands of optimization runs that way is dominated by
+pandas overhead. batch_metrics() computes the same metrics for all runs in
+one pass of NumPy reductions over ragged arrays:
+
+    pnl      = [run 0 trades..., run 1 trades..., ...]   flat, trade order
+    offsets  = [0, n0, n0 + n1, ...]                      run boundaries
+    equity   = 2D (n_runs, n_points), NaN-padded at the end
+
+Per-run sums and counts are np.bincount over run ids, extremes are
+reduceat over non-empty runs, streaks are a cumulative-count trick that
+resets at every run boundary, and drawdowns are an accumulate over the
+rows of the equity matrix (in row chunks to bound memory).
+"""
+
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Equity cells processed per chunk (rows x points)
+_MAX_CHUNK_ELEMENTS = 4_000_000
+
+
+def pack_ragged(arrays: Sequence[np.ndarray], dtype=float) -> tuple:
+    """Concatenate per-run arrays into (flat values, offsets)."""
+    counts = np.fromiter((len(a) for a in arrays), dtype=np.int64, count=len(arrays))
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    flat = np.concatenate([np.asarray(a, dtype=dtype) for a in arrays]) if len(arrays) else np.empty(0, dtype)
+    return flat, offsets
+
+
+def pad_equity(curves: Sequence[np.ndarray]) -> np.ndarray:
+    """Stack equity curves of different lengths into a NaN-padded matrix."""
+    width = max((len(c) for c in curves), default=0)
+    matrix = np.full((len(curves), width), np.nan)
+    for row, curve in enumerate(curves):
+        matrix[row, :len(curve)] = curve
+    return matrix
+
+
+def _segment_reduce(ufunc: np.ufunc, values: np.ndarray, offsets: np.ndarray, empty: float) -> np.ndarray:
+    """ufunc.reduceat per run, `empty` for runs without elements."""
+    counts = np.diff(offsets)
+    result = np.full(len(counts), empty, dtype=float)
+    nonempty = counts > 0
+    if nonempty.any():
+        result[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return result
+
+
+def _longest_runs(mask: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Longest run of True within each segment of a flat boolean array."""
+    if len(mask) == 0:
+        return np.zeros(len(offsets) - 1, dtype=np.int64)
+    count = np.cumsum(mask, dtype=np.int64)
+    # Count at the last False before each position, carried forward; a run
+    # boundary acts like a False just before the segment's first element
+    reset = np.where(mask, 0, count)
+    starts = offsets[:-1][np.diff(offsets) > 0]
+    before = np.where(starts > 0, count[starts - 1], 0)
+    reset[starts] = np.maximum(reset[starts], before)
+    np.maximum.accumulate(reset, out=reset)
+    return _segment_reduce(np.maximum, count - reset, offsets, 0).astype(np.int64)
+
+
+def _drawdowns(equity: np.ndarray) -> tuple:
+    """Max and average drawdown (%) of each equity row (NaN padding ignored)."""
+    n_runs = len(equity)
+    max_dd = np.zeros(n_runs)
+    avg_dd = np.zeros(n_runs)
+    if equity.size == 0:
+        return max_dd, avg_dd
+    chunk = max(1, _MAX_CHUNK_ELEMENTS // equity.shape[1])
+    for start in range(0, n_runs, chunk):
+        rows = np.asarray(equity[start:start + chunk], dtype=float)
+        # NaN padding sits at the end, so the running max of the valid part is unaffected
+        peak = np.fmax.accumulate(rows, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = (rows - peak) / peak * 100
+        lowest = np.where(np.isnan(drawdown), np.inf, drawdown).min(axis=1)
+        max_dd[start:start + chunk] = np.where(np.isfinite(lowest), lowest, 0)
+        underwater = drawdown < 0
+        n_under = underwater.sum(axis=1)
+        avg_dd[start:start + chunk] = np.where(underwater, drawdown, 0).sum(axis=1) / np.maximum(n_under, 1)
+    return max_dd, avg_dd
+
+
+def batch_metrics(pnl: np.ndarray, offsets: np.ndarray, equity: Optional[np.ndarray] = None,
+                  durations: Optional[np.ndarray] = None, initial_capital: float = 10000) -> pd.DataFrame:
+    """
+    PerformanceAnalyzer.calculate_metrics() for many runs at once.
+
+    Args:
+        pnl: Trade PnL of all runs, concatenated in trade order
+        offsets: Run boundaries into pnl, shape (n_runs + 1,); run i is
+            pnl[offsets[i]:offsets[i + 1]]
+        equity: Equity curves, shape (n_runs, n_points), NaN-padded at the
+            end (optional; drawdowns are 0 without it, as in calculate_metrics)
+        durations: Trade durations aligned with pnl (timedelta64 or int64 ns), optional
+        initial_capital: Starting capital for returns
+
+    Returns:
+        pd.DataFrame with one row per run and the calculate_metrics() keys as
+        columns (durations as timedelta64 columns instead of strings)
+    """
+    pnl = np.asarray(pnl, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_runs = len(offsets) - 1
+    counts = np.diff(offsets)
+    run = np.repeat(np.arange(n_runs), counts)
+
+    def per_run_sum(weights):
+        return np.bincount(run, weights=weights, minlength=n_runs)
+
+    wins = pnl > 0
+    losses = pnl < 0
+    n_wins = np.bincount(run[wins], minlength=n_runs)
+    n_losses = np.bincount(run[losses], minlength=n_runs)
+    total_pnl = per_run_sum(pnl)
+    gross_profit = per_run_sum(np.where(wins, pnl, 0))
+    gross_loss = per_run_sum(np.where(losses, pnl, 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = np.where(counts > 0, n_wins / counts * 100, 0)
+        avg_win = np.where(n_wins > 0, gross_profit / n_wins, 0)
+        avg_loss = np.where(n_losses > 0, gross_loss / n_losses, 0)
+        profit_factor = np.where((n_losses > 0) & (avg_loss != 0), np.abs(gross_profit / gross_loss), np.inf)
+
+        # Per-trade returns: mean and sample std (two-pass for accuracy)
+        returns = pnl / initial_capital
+        mean_return = per_run_sum(returns) / counts
+        squared = per_run_sum((returns - mean_return[run]) ** 2)
+        std_return = np.where(counts > 1, np.sqrt(squared / (counts - 1)), np.nan)
+        sharpe = np.where(std_return > 0, mean_return / std_return * np.sqrt(252), 0)
+
+    if equity is not None:
+        max_dd, avg_dd = _drawdowns(equity)
+    else:
+        max_dd = avg_dd = np.zeros(n_runs)
+
+    metrics = pd.DataFrame({
+        'total_trades': counts,
+        'winning_trades': n_wins,
+        'losing_trades': n_losses,
+        'win_rate_pct': win_rate,
+        'total_pnl': total_pnl,
+        'total_return_pct': total_pnl / initial_capital * 100,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'largest_win': _segment_reduce(np.maximum, pnl, offsets, 0),
+        'largest_loss': _segment_reduce(np.minimum, pnl, offsets, 0),
+        'profit_factor': profit_factor,
+        'avg_return_pct': mean_return * 100,
+        'std_return_pct': std_return * 100,
+        'sharpe_ratio': sharpe,
+        'max_drawdown_pct': max_dd,
+        'avg_drawdown_pct': avg_dd,
+        'max_consecutive_wins': _longest_runs(wins, offsets),
+        'max_consecutive_losses': _longest_runs(~wins, offsets),
+    })
+
+    if durations is not None:
+        ns = np.asarray(durations).astype('timedelta64[ns]').view(np.int64).astype(float)
+        with np.errstate(invalid='ignore'):
+            avg = per_run_sum(ns) / counts
+        for name, values in (('avg_trade_duration', avg),
+                             ('max_trade_duration', _segment_reduce(np.maximum, ns, offsets, np.nan)),
+                             ('min_trade_duration', _segment_reduce(np.minimum, ns, offsets, np.nan))):
+            metrics[name] = pd.to_timedelta(values, unit='ns')
+    return metrics
+
+
+def batch_metrics_from_trades(trades: List[pd.DataFrame],
+                              equity_curves: Optional[Union[np.ndarray, Sequence]] = None,
+                              initial_capital: float = 10000) -> pd.DataFrame:
+    """
+    batch_metrics() for a list of trades DataFrames (Backtesting.py _trades layout).
+
+    Args:
+        trades: One trades DataFrame per run (PnL, optional EntryTime/ExitTime)
+        equity_curves: (n_runs, n_points) matrix or a sequence of per-run curves
+        initial_capital: Starting capital for returns
+    """
+    pnl, offsets = pack_ragged([t['PnL'].to_numpy(dtype=float) for t in trades])
+    durations = None
+    if trades and all('EntryTime' in t.columns and 'ExitTime' in t.columns for t in trades):
+        durations = np.concatenate([
+            (pd.to_datetime(t['ExitTime']) - pd.to_datetime(t['EntryTime'])).to_numpy(dtype='timedelta64[ns]')
+            for t in trades])
+    if equity_curves is not None and not isinstance(equity_curves, np.ndarray):
+        equity_curves = pad_equity([np.asarray(c, dtype=float) for c in equity_curves])
+    return batch_metrics(pnl, offsets, equity_curves, durations, initial_capital)
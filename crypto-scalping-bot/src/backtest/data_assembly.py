@@ -0,0 +1,163 @@
+"""
+Columnar assembly of the backtest frame.
+
+BacktestRunner.main used to read processed_data.csv and predictions.csv in
+full, build {Timestamp: value} dicts, map them over every row, filter, copy,
+and copy every column once more in prepare_data_for_backtest(). This module
+produces the same frame with:
+
+    - only the needed columns read, timestamps converted to int64 ns
+    - one sorted as-of join (np.searchsorted) of prediction times onto bar times
+    - the NaN filter evaluated on the source columns before any copy
+    - a single gather into one preallocated float64 block, which becomes the
+      DataFrame without another copy
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Backtest column <- processed_data.csv column (same as prepare_data_for_backtest)
+PROCESSED_COLUMNS: List[Tuple[str, str]] = [
+    ('Open', 'open'),
+    ('High', 'high'),
+    ('Low', 'low'),
+    ('Close', 'close'),
+    ('Volume', 'volume'),
+    ('RSI', 'rsi_14'),
+    ('MACD', 'macd'),
+    ('MACD_Signal', 'macd_signal'),
+    ('BB_Upper', 'bb_upper'),
+    ('BB_Lower', 'bb_lower'),
+    ('ADX', 'adx_14'),
+    ('ATR', 'atr_14'),
+    ('ATR_SMA', 'atr_sma_20'),
+    ('Volume_SMA', 'volume_sma_20'),
+]
+
+# Backtest column <- predictions.csv column (multi-horizon columns are added per file)
+PREDICTION_COLUMNS: List[Tuple[str, str]] = [
+    ('Predicted_Change', 'predicted'),
+    ('Actual_Norm', 'actual'),
+]
+
+TIME_COLUMN = 'datetime'
+
+Columns = Dict[str, np.ndarray]
+
+
+def read_columns(path: Union[str, Path], columns: Optional[Sequence[str]] = None,
+                 time_column: str = TIME_COLUMN) -> Columns:
+    """
+    Read selected columns of a CSV or Parquet file as NumPy arrays.
+
+    Args:
+        path: .csv or .parquet file
+        columns: Columns to read besides time_column (None = all)
+        time_column: Datetime column, returned as int64 ns (UTC if tz-aware)
+
+    Returns:
+        {column: array}; numeric columns as float64
+    """
+    path = Path(path)
+    usecols = None if columns is None else [time_column, *[c for c in columns if c != time_column]]
+    if path.suffix == '.parquet':
+        df = pd.read_parquet(path, columns=usecols)
+    else:
+        df = pd.read_csv(path, usecols=usecols, engine='c')
+
+    times = pd.to_datetime(df.pop(time_column), format='ISO8601')
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+    arrays = {time_column: times.to_numpy(dtype='datetime64[ns]').view(np.int64)}
+    for column in df.columns:
+        arrays[column] = df[column].to_numpy(dtype=float)
+    return arrays
+
+
+def asof_indices(left_times: np.ndarray, right_times: np.ndarray, tolerance_ns: int = 0) -> np.ndarray:
+    """
+    For each left timestamp, the position of the latest right timestamp at or
+    before it, within tolerance_ns (-1 if none). Both inputs sorted ascending.
+
+    tolerance_ns=0 is an exact-match join.
+    """
+    positions = np.searchsorted(right_times, left_times, side='right') - 1
+    valid = positions >= 0
+    valid[valid] = left_times[valid] - right_times[positions[valid]] <= tolerance_ns
+    positions[~valid] = -1
+    return positions
+
+
+def _sorted(columns: Columns, time_column: str) -> Columns:
+    """Columns sorted by time (no copy if already sorted)."""
+    times = columns[time_column]
+    if len(times) < 2 or np.all(times[1:] >= times[:-1]):
+        return columns
+    order = np.argsort(times, kind='stable')
+    return {name: values[order] for name, values in columns.items()}
+
+
+def assemble_backtest_frame(processed: Columns, predictions: Columns, tolerance_ns: int = 0,
+                            time_column: str = TIME_COLUMN) -> pd.DataFrame:
+    """
+    Build the backtest frame (prepare_data_for_backtest() layout) from
+    columnar processed data and model predictions.
+
+    Args:
+        processed: read_columns() of processed_data.csv (needs the PROCESSED_COLUMNS sources)
+        predictions: read_columns() of predictions.csv: predicted, actual and
+            optional predicted_h{n} columns
+        tolerance_ns: Max age of a prediction joined onto a bar (0 = same timestamp only)
+        time_column: Datetime column of both inputs
+
+    Returns:
+        pd.DataFrame indexed by datetime, bars without a prediction or with
+        any NaN dropped, backed by a single float64 block
+    """
+    processed = _sorted(processed, time_column)
+    predictions = _sorted(predictions, time_column)
+
+    horizons = sorted(int(name[len('predicted_h'):]) for name in predictions if name.startswith('predicted_h'))
+    sources = ([(target, processed[source], None) for target, source in PROCESSED_COLUMNS] +
+               [(target, predictions[source], True) for target, source in PREDICTION_COLUMNS] +
+               [(f'Predicted_Change_H{h}', predictions[f'predicted_h{h}'], True) for h in horizons])
+
+    bar_times = processed[time_column]
+    prediction_rows = asof_indices(bar_times, predictions[time_column], tolerance_ns)
+
+    # Row filter on the source columns: a prediction exists and no value is NaN
+    keep = prediction_rows >= 0
+    for _, values, from_predictions in sources:
+        if from_predictions:
+            keep[keep] &= ~np.isnan(values[prediction_rows[keep]])
+        else:
+            keep &= ~np.isnan(values)
+    rows = np.flatnonzero(keep)
+    prediction_rows = prediction_rows[rows]
+
+    # One allocation, column-major so every column is a contiguous view
+    block = np.empty((len(rows), len(sources)), dtype=float, order='F')
+    for j, (_, values, from_predictions) in enumerate(sources):
+        np.take(values, prediction_rows if from_predictions else rows, out=block[:, j])
+
+    index = pd.DatetimeIndex(bar_times[rows].view('datetime64[ns]'), name=time_column)
+    return pd.DataFrame(block, index=index, columns=[target for target, _, _ in sources], copy=False)
+
+
+def load_backtest_data(data_dir: Union[str, Path] = 'data', tolerance_ns: int = 0) -> pd.DataFrame:
+    """
+    Assemble the backtest frame from data_dir/processed_data.csv and
+    data_dir/predictions.csv (Parquet files of the same name are preferred).
+    """
+    data_dir = Path(data_dir)
+
+    def _path(stem):
+        parquet = data_dir / f'{stem}.parquet'
+        return parquet if parquet.exists() else data_dir / f'{stem}.csv'
+
+    processed = read_columns(_path('processed_data'), [source for _, source in PROCESSED_COLUMNS])
+    predictions = read_columns(_path('predictions'))
+    return assemble_backtest_frame(processed, predictions, tolerance_ns)
@@ -0,0 +1,903 @@
+"""
+Fast array-based backtest engine for LSTMScalpingStrategy.
+
+Backtesting.py calls Strategy.next() once per bar in Python. The strategy's
+rules only depend on columns that are known up front, so this engine evaluates
+them for every bar at once (compute_signal_masks) and runs the order/position
+bookkeeping in a tight bar loop over NumPy arrays, JIT-compiled with numba
+when it is installed (on first use, see jit.py). Strategy parameters come
+from strategies.signals, so importing this module does not load
+Backtesting.py.
+
+The simulation reproduces the Backtesting.py broker as used by BacktestRunner
+(exclusive_orders=True, trade_on_close=False, FractionalBacktest units):
+    - Entry/exit market orders fill at the next bar's open
+    - Relative position sizing: int(equity * size // (price * (1 + commission)))
+    - Commission charged on entry and on exit
+    - position.close() orders fill before SL/TP; SL is checked before TP
+      (unless an intrabar store says which level the price reached first)
+    - SL/TP can trigger on the entry bar; gaps fill at the open
+    - Trades still open at the end are not closed (finalize_trades=False)
+
+Use compare_with_backtesting() to cross-check trades against Backtesting.py.
+"""
+
+import sys
+import weakref
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from strategies.signals import DEFAULT_PARAMS, STRATEGY_PARAMS, compute_signal_masks, resolve_strategy
+from backtest.jit import compiled
+
+# Bump when simulation semantics change (invalidates cached results)
+ENGINE_VERSION = 1
+
+# FractionalBacktest default: trade whole satoshis
+DEFAULT_FRACTIONAL_UNIT = 1 / 100e6
+
+# Column layout of the trade record array returned by the bar loop
+_T_SIZE, _T_ENTRY_BAR, _T_EXIT_BAR, _T_ENTRY_PRICE, _T_EXIT_PRICE, _T_SL, _T_TP = range(7)
+_TRADE_FIELDS = 7
+
+# Layout of the state vector _simulate() resumes from and writes back
+(_S_CASH, _S_SIZE, _S_ENTRY_PRICE, _S_ENTRY_BAR, _S_SL, _S_TP,
+ _S_PENDING, _S_PENDING_SL, _S_PENDING_TP, _S_BANKRUPT) = range(10)
+_STATE_FIELDS = 10
+
+
+def initial_state(cash: float) -> np.ndarray:
+    """Simulation state before the first bar: flat, no pending order."""
+    state = np.zeros(_STATE_FIELDS)
+    state[_S_CASH] = cash
+    return state
+
+
+def _simulate(open_, high, low, close, long_entry, short_entry, exit_long, exit_short,
+              stop_loss_pct, take_profit_pct, position_size, commission,
+              equity, trades, state, start, offset, tp_first, ambiguous, stop_on_ambiguous):
+    """
+    Bar loop replicating Backtesting.py's _Broker for the LSTM strategy.
+
+    Processes bars start..n-1, continuing from `state` (see _S_* fields; the
+    broker/strategy state after the previous bar) and writing it back at the
+    end, so a run can be resumed on appended bars. Fills `equity` (one value
+    per bar) and `trades` (one row per closed trade, bar numbers shifted by
+    `offset`) in place and returns the number of closed trades.
+
+    A bar where both SL and TP are in range exits at the SL unless
+    tp_first[i] == 1. With stop_on_ambiguous, a bar with tp_first[i] == -1
+    (not looked up yet) stops the loop instead: `state` is left as it was
+    before that bar and `ambiguous` holds (bar, side, sl, tp), so the caller
+    can resolve it and resume from the same bar.
+    """
+    n = len(open_)
+    n_trades = 0
+
+    cash = state[_S_CASH]
+    size = state[_S_SIZE]              # Open trade size in units (negative = short), 0 = flat
+    entry_price = state[_S_ENTRY_PRICE]
+    entry_bar = int(state[_S_ENTRY_BAR])
+    sl = state[_S_SL]
+    tp = state[_S_TP]
+
+    pending = int(state[_S_PENDING])   # Order placed by the strategy: 1 buy, -1 sell, 2 close
+    pending_sl = state[_S_PENDING_SL]
+    pending_tp = state[_S_PENDING_TP]
+
+    if state[_S_BANKRUPT]:
+        for j in range(start, n):
+            equity[j] = 0.0
+        return 0
+
+    for i in range(start, n):
+        o = open_[i]
+        h = high[i]
+        low_i = low[i]
+
+        # State before this bar, to hand back if the bar has to be resolved first
+        pre_cash, pre_size, pre_entry_price, pre_entry_bar = cash, size, entry_price, entry_bar
+        pre_sl, pre_tp, pre_pending, pre_pending_sl, pre_pending_tp = sl, tp, pending, pending_sl, pending_tp
+
+        # --- Broker: process orders queued on the previous bar ---
+        exit_price = 0.0
+        closed = False
+
+        if pending == 2:
+            # position.close() is queued ahead of the SL/TP orders
+            exit_price = o
+            closed = True
+        elif pending != 0:
+            # Relative-size market entry at this bar's open
+            units = int((cash * 1.0 * position_size) // (o + (position_size * o * commission) / position_size))
+            if units > 0 and units * (o + (position_size * o * commission) / position_size) <= cash:
+                size = float(units) if pending == 1 else -float(units)
+                entry_price = o
+                entry_bar = offset + i
+                sl = pending_sl
+                tp = pending_tp
+                cash -= units * o * commission
+        pending = 0
+
+        # --- Bracket orders (also on the entry bar) ---
+        if size != 0.0 and not closed:
+            if size > 0:
+                hit_sl = low_i <= sl
+                hit_tp = h >= tp
+            else:
+                hit_sl = h >= sl
+                hit_tp = low_i <= tp
+
+            if stop_on_ambiguous and hit_sl and hit_tp and tp_first[i] == -1:
+                ambiguous[0] = i
+                ambiguous[1] = 1.0 if size > 0 else -1.0
+                ambiguous[2] = sl
+                ambiguous[3] = tp
+                cash, size, entry_price, entry_bar = pre_cash, pre_size, pre_entry_price, pre_entry_bar
+                sl, tp, pending, pending_sl, pending_tp = pre_sl, pre_tp, pre_pending, pre_pending_sl, pre_pending_tp
+                break
+
+            if hit_sl and not (hit_tp and tp_first[i] == 1):
+                exit_price = min(o, sl) if size > 0 else max(o, sl)
+                closed = True
+            elif hit_tp:
+                exit_price = max(o, tp) if size > 0 else min(o, tp)
+                closed = True
+
+        if closed:
+            exit_commission = abs(size) * exit_price * commission
+            cash += size * (exit_price - entry_price) - exit_commission
+            trades[n_trades, _T_SIZE] = size
+            trades[n_trades, _T_ENTRY_BAR] = entry_bar
+            trades[n_trades, _T_EXIT_BAR] = offset + i
+            trades[n_trades, _T_ENTRY_PRICE] = entry_price
+            trades[n_trades, _T_EXIT_PRICE] = exit_price
+            trades[n_trades, _T_SL] = sl
+            trades[n_trades, _T_TP] = tp
+            n_trades += 1
+            size = 0.0
+
+        equity[i] = cash + size * (close[i] - entry_price)
+
+        if equity[i] <= 0:
+            # Out of money: Backtesting.py liquidates at the close and stops
+            if size != 0.0:
+                trades[n_trades, _T_SIZE] = size
+                trades[n_trades, _T_ENTRY_BAR] = entry_bar
+                trades[n_trades, _T_EXIT_BAR] = offset + i
+                trades[n_trades, _T_ENTRY_PRICE] = entry_price
+                trades[n_trades, _T_EXIT_PRICE] = close[i]
+                trades[n_trades, _T_SL] = sl
+                trades[n_trades, _T_TP] = tp
+                n_trades += 1
+                size = 0.0
+            for j in range(i, n):
+                equity[j] = 0.0
+            state[_S_BANKRUPT] = 1.0
+            break
+
+        # --- Strategy: decide on this bar's close ---
+        if size > 0:
+            if exit_long[i]:
+                pending = 2
+        elif size < 0:
+            if exit_short[i]:
+                pending = 2
+        elif long_entry[i]:
+            pending = 1
+            pending_sl = close[i] * (1 - stop_loss_pct)
+            pending_tp = close[i] * (1 + take_profit_pct)
+        elif short_entry[i]:
+            pending = -1
+            pending_sl = close[i] * (1 + stop_loss_pct)
+            pending_tp = close[i] * (1 - take_profit_pct)
+
+    state[_S_CASH] = cash
+    state[_S_SIZE] = size
+    state[_S_ENTRY_PRICE] = entry_price
+    state[_S_ENTRY_BAR] = entry_bar
+    state[_S_SL] = sl
+    state[_S_TP] = tp
+    state[_S_PENDING] = pending
+    state[_S_PENDING_SL] = pending_sl
+    state[_S_PENDING_TP] = pending_tp
+    return n_trades
+
+
+def _simulate_batch(open_, high, low, close, long_entry, short_entry, exit_long, exit_short,
+                    stop_loss_pct, take_profit_pct, position_size, cash, commission,
+                    equity, trades, n_trades):
+    """
+    _simulate() for many parameter variants in one pass over the bars.
+
+    Signal masks and `equity` are (n_bars, n_variants), so each bar's prices
+    are read once and every variant's state is updated from them. Variant v's
+    closed trades go to trades[v, :n_trades[v]].
+    """
+    n, n_variants = long_entry.shape
+
+    # One state vector per variant (same meaning as the scalars in _simulate)
+    size = np.zeros(n_variants)
+    entry_price = np.zeros(n_variants)
+    entry_bar = np.zeros(n_variants, dtype=np.int64)
+    sl = np.zeros(n_variants)
+    tp = np.zeros(n_variants)
+    pending = np.zeros(n_variants, dtype=np.int64)
+    pending_sl = np.zeros(n_variants)
+    pending_tp = np.zeros(n_variants)
+    balance = np.full(n_variants, cash)
+    bankrupt = np.zeros(n_variants, dtype=np.bool_)
+
+    equity[0, :] = cash
+    for i in range(1, n):
+        o = open_[i]
+        h = high[i]
+        low_i = low[i]
+        c = close[i]
+
+        for v in range(n_variants):
+            if bankrupt[v]:
+                equity[i, v] = 0.0
+                continue
+
+            # --- Broker: process orders queued on the previous bar ---
+            exit_price = 0.0
+            closed = False
+
+            if pending[v] == 2:
+                exit_price = o
+                closed = True
+            elif pending[v] != 0:
+                ps = position_size[v]
+                units = int((balance[v] * 1.0 * ps) // (o + (ps * o * commission) / ps))
+                if units > 0 and units * (o + (ps * o * commission) / ps) <= balance[v]:
+                    size[v] = float(units) if pending[v] == 1 else -float(units)
+                    entry_price[v] = o
+                    entry_bar[v] = i
+                    sl[v] = pending_sl[v]
+                    tp[v] = pending_tp[v]
+                    balance[v] -= units * o * commission
+            pending[v] = 0
+
+            # --- Bracket orders (also on the entry bar) ---
+            if size[v] != 0.0 and not closed:
+                if size[v] > 0:
+                    if low_i <= sl[v]:
+                        exit_price = min(o, sl[v])
+                        closed = True
+                    elif h >= tp[v]:
+                        exit_price = max(o, tp[v])
+                        closed = True
+                else:
+                    if h >= sl[v]:
+                        exit_price = max(o, sl[v])
+                        closed = True
+                    elif low_i <= tp[v]:
+                        exit_price = min(o, tp[v])
+                        closed = True
+
+            if closed:
+                exit_commission = abs(size[v]) * exit_price * commission
+                balance[v] += size[v] * (exit_price - entry_price[v]) - exit_commission
+                k = n_trades[v]
+                trades[v, k, _T_SIZE] = size[v]
+                trades[v, k, _T_ENTRY_BAR] = entry_bar[v]
+                trades[v, k, _T_EXIT_BAR] = i
+                trades[v, k, _T_ENTRY_PRICE] = entry_price[v]
+                trades[v, k, _T_EXIT_PRICE] = exit_price
+                trades[v, k, _T_SL] = sl[v]
+                trades[v, k, _T_TP] = tp[v]
+                n_trades[v] = k + 1
+                size[v] = 0.0
+
+            equity[i, v] = balance[v] + size[v] * (c - entry_price[v])
+
+            if equity[i, v] <= 0:
+                # Out of money: liquidate at the close, variant stops trading
+                if size[v] != 0.0:
+                    k = n_trades[v]
+                    trades[v, k, _T_SIZE] = size[v]
+                    trades[v, k, _T_ENTRY_BAR] = entry_bar[v]
+                    trades[v, k, _T_EXIT_BAR] = i
+                    trades[v, k, _T_ENTRY_PRICE] = entry_price[v]
+                    trades[v, k, _T_EXIT_PRICE] = c
+                    trades[v, k, _T_SL] = sl[v]
+                    trades[v, k, _T_TP] = tp[v]
+                    n_trades[v] = k + 1
+                equity[i, v] = 0.0
+                bankrupt[v] = True
+                continue
+
+            # --- Strategy: decide on this bar's close ---
+            if size[v] > 0:
+                if exit_long[i, v]:
+                    pending[v] = 2
+            elif size[v] < 0:
+                if exit_short[i, v]:
+                    pending[v] = 2
+            elif long_entry[i, v]:
+                pending[v] = 1
+                pending_sl[v] = c * (1 - stop_loss_pct[v])
+                pending_tp[v] = c * (1 + take_profit_pct[v])
+            elif short_entry[i, v]:
+                pending[v] = -1
+                pending_sl[v] = c * (1 + stop_loss_pct[v])
+                pending_tp[v] = c * (1 - take_profit_pct[v])
+
+
+def strategy_params(strategy_class: Optional[Type] = None, **overrides) -> Dict[str, Any]:
+    """
+    Collect a strategy's parameters (class attributes), with optional overrides.
+
+    strategy_class=None stands for LSTMScalpingStrategy (signals.DEFAULT_PARAMS),
+    which avoids importing Backtesting.py for the default strategy.
+
+    Example:
+        >>> strategy_params(AggressiveLSTMStrategy, stop_loss_pct=0.004)
+    """
+    unknown = set(overrides) - set(STRATEGY_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown strategy parameters: {sorted(unknown)}")
+    if strategy_class is None:
+        params = dict(DEFAULT_PARAMS)
+    else:
+        params = {name: getattr(strategy_class, name) for name in STRATEGY_PARAMS}
+    params.update(overrides)
+    return params
+
+
+def run_fast_backtest(data: pd.DataFrame,
+                      strategy_class: Optional[Type] = None,
+                      cash: float = 10000,
+                      commission: float = 0.0004,
+                      fractional_unit: Optional[float] = DEFAULT_FRACTIONAL_UNIT,
+                      intrabar: Optional[Any] = None,
+                      **params) -> pd.Series:
+    """
+    Backtest LSTMScalpingStrategy (or a parameter variant) on prepared data.
+
+    Args:
+        data: Frame from BacktestRunner.prepare_data_for_backtest()
+        strategy_class: LSTMScalpingStrategy or a subclass that only changes
+            parameters (None = LSTMScalpingStrategy)
+        cash: Initial capital
+        commission: Relative commission per fill (0.0004 = 0.04%)
+        fractional_unit: Tradable unit as in FractionalBacktest (None = whole units, like Backtest)
+        intrabar: data.intrabar_store.IntrabarStore used to decide bars where both
+            SL and TP are in range (default: SL first, like Backtesting.py)
+        **params: Strategy parameter overrides (e.g. stop_loss_pct=0.004)
+
+    Returns:
+        pd.Series of Backtesting.py-compatible statistics, including
+        '_trades' and '_equity_curve'
+
+    Example:
+        >>> stats = run_fast_backtest(bt_data, AggressiveLSTMStrategy, cash=10000)
+        >>> print(stats['Return [%]'], stats['# Trades'])
+    """
+    params = strategy_params(strategy_class, **params)
+    scale = fractional_unit or 1.0
+
+    open_, high, low, close = _price_arrays(data, scale)
+    masks = _strategy_masks(data, params)
+
+    n = len(data)
+    equity = np.empty(n)
+    trades = np.empty((max(n, 1), _TRADE_FIELDS))
+    equity[:1] = cash
+    resolver = intrabar.resolver(data.index, scale) if intrabar is not None else None
+    n_trades = simulate_bars(open_, high, low, close, masks, params, commission, equity, trades,
+                             initial_state(cash), start=1, resolver=resolver)
+
+    trades_df = _trades_frame(trades[:n_trades], data.index, commission, scale)
+    return _compute_stats(trades_df, equity, data)
+
+
+def simulate_bars(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                  masks: Dict[str, np.ndarray], params: Dict[str, Any], commission: float,
+                  equity: np.ndarray, trades: np.ndarray, state: np.ndarray,
+                  start: int = 0, offset: int = 0,
+                  resolver: Optional[Callable[[int, int, float, float], Optional[bool]]] = None) -> int:
+    """
+    Run the bar loop (JIT-compiled when numba is available) from `state`.
+
+    Args:
+        open_, high, low, close: Prices in trading units (_price_arrays())
+        masks: Signal masks (_strategy_masks())
+        params: Full strategy parameters (strategy_params())
+        equity, trades: Output buffers (len(open_) and >= len(open_) rows)
+        state: State vector (initial_state() or left by a previous call), updated in place
+        start: First bar to process (1 on a fresh run: bar 0 only sets the starting equity)
+        offset: Added to the recorded trade bar numbers (bars already simulated)
+        resolver: Called as resolver(bar, side, sl, tp) (side 1 long / -1 short,
+            levels in trading units) for bars where both SL and TP are in range;
+            returns True if TP was reached first, False for SL, None if unknown
+            (treated as SL first). None = always SL first, like Backtesting.py
+
+    Returns:
+        Number of trades closed in these bars
+    """
+    n = len(open_)
+    if n <= start:
+        return 0
+    inputs = [open_, high, low, close, masks['long'], masks['short'], masks['exit_long'], masks['exit_short'],
+              np.full(n, -1 if resolver else 0, dtype=np.int8)]
+    simulate = compiled(_simulate)
+    if simulate is None:
+        # Plain Python indexes lists much faster than NumPy scalars
+        simulate = _simulate
+        inputs = [np.asarray(values).tolist() for values in inputs]
+    tp_first = inputs[-1]
+    ambiguous = np.full(4, -1.0)
+
+    n_trades = 0
+    while True:
+        n_trades += simulate(*inputs[:8], float(params['stop_loss_pct']), float(params['take_profit_pct']),
+                             float(params['position_size']), float(commission), equity, trades[n_trades:], state,
+                             int(start), int(offset), tp_first, ambiguous, resolver is not None)
+        if ambiguous[0] < 0:
+            return n_trades
+
+        # Stopped before an ambiguous bar: look it up and resume from that bar
+        bar = int(ambiguous[0])
+        tp_first[bar] = 1 if resolver(bar, int(ambiguous[1]), ambiguous[2], ambiguous[3]) else 0
+        ambiguous[0] = -1.0
+        start = bar
+
+
+def run_fast_backtest_batch(data: pd.DataFrame,
+                            variants: Sequence[Union[Type, Dict[str, Any]]],
+                            strategy_class: Optional[Type] = None,
+                            cash: float = 10000,
+                            commission: float = 0.0004,
+                            fractional_unit: Optional[float] = DEFAULT_FRACTIONAL_UNIT) -> List[pd.Series]:
+    """
+    Backtest several strategy variants in a single pass over the bars.
+
+    Each variant keeps its own position/cash state and the bar loop updates
+    all of them from one read of each bar, so simulating a handful of
+    variants costs about as much as simulating one. The equity statistics
+    are computed for all variants at once (_compute_stats_batch()), but each
+    variant still gets its own _trades and _equity_curve frames, which now
+    dominate: expect roughly the per-variant cost of run_fast_backtest()
+    minus the shared work, not the cost of a single backtest. Results are
+    identical to calling run_fast_backtest() for each variant.
+
+    Args:
+        data: Frame from BacktestRunner.prepare_data_for_backtest()
+        variants: Strategy classes (e.g. AggressiveLSTMStrategy) and/or dicts of
+            parameter overrides applied to strategy_class
+        strategy_class: Base strategy for dict variants (None = LSTMScalpingStrategy)
+        cash: Initial capital (every variant)
+        commission: Relative commission per fill
+        fractional_unit: Tradable unit as in FractionalBacktest (None = whole units)
+
+    Returns:
+        List of statistics Series (as run_fast_backtest() returns), in variant order
+
+    Example:
+        >>> results = run_fast_backtest_batch(bt_data, [LSTMScalpingStrategy, AggressiveLSTMStrategy,
+        ...                                             {'stop_loss_pct': 0.004, 'take_profit_pct': 0.012}])
+        >>> print([stats['Return [%]'] for stats in results])
+    """
+    params = [strategy_params(variant) if isinstance(variant, type) else strategy_params(strategy_class, **variant)
+              for variant in variants]
+    scale = fractional_unit or 1.0
+    n, n_variants = len(data), len(params)
+
+    open_, high, low, close = _price_arrays(data, scale)
+    masks = [_strategy_masks(data, variant_params) for variant_params in params]
+
+    def _stack(key):
+        # (n_bars, n_variants): a bar's signals for all variants are contiguous
+        return np.ascontiguousarray(np.column_stack([m[key] for m in masks]).reshape(n, n_variants))
+
+    long_entry, short_entry = _stack('long'), _stack('short')
+    equity = np.empty((n, n_variants))
+    # A trade needs an entry signal, so signal counts bound the trades per variant
+    capacity = int((long_entry | short_entry).sum(axis=0).max(initial=0)) + 1
+    trades = np.empty((n_variants, capacity, _TRADE_FIELDS))
+    n_trades = np.zeros(n_variants, dtype=np.int64)
+    per_variant = [np.array([float(p[name]) for p in params]) for name in
+                   ('stop_loss_pct', 'take_profit_pct', 'position_size')]
+    simulate_batch = compiled(_simulate_batch)
+
+    if n < 2:
+        equity[:] = cash
+    elif simulate_batch is not None:
+        simulate_batch(open_, high, low, close, long_entry, short_entry, _stack('exit_long'),
+                       _stack('exit_short'), *per_variant, float(cash), float(commission),
+                       equity, trades, n_trades)
+    else:
+        # Without numba, the per-variant Python loop is the faster option
+        return [run_fast_backtest(data, strategy_class, cash, commission, fractional_unit, **variant_params)
+                for variant_params in params]
+
+    trades_dfs = [_trades_frame(trades[v, :n_trades[v]], data.index, commission, scale)
+                  for v in range(n_variants)]
+    return _compute_stats_batch(trades_dfs, equity, data)
+
+
+def _price_arrays(data: pd.DataFrame, scale: float):
+    """Open, high, low, close as contiguous float arrays in (fractional) trading units."""
+    return tuple(np.ascontiguousarray(data[column].to_numpy(dtype=float) * scale)
+                 for column in ('Open', 'High', 'Low', 'Close'))
+
+
+def _strategy_masks(data: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Signal masks for `data`, honoring exit_horizon like LSTMScalpingStrategy.init()."""
+    exit_column = 'Predicted_Change'
+    if params['exit_horizon'] is not None:
+        exit_column = f"Predicted_Change_H{params['exit_horizon']}"
+        if exit_column not in data.columns:
+            raise ValueError(f"exit_horizon={params['exit_horizon']} needs a '{exit_column}' column "
+                             f"(add {params['exit_horizon']} to model.prediction_horizons)")
+
+    return compute_signal_masks(
+        data['Predicted_Change'].to_numpy(), data['RSI'].to_numpy(), data['MACD'].to_numpy(),
+        data['MACD_Signal'].to_numpy(), data[exit_column].to_numpy(),
+        params['prediction_threshold'], params['rsi_oversold'], params['rsi_overbought'],
+    )
+
+
+def _trades_frame(records: np.ndarray, index: pd.Index, commission: float, scale: float) -> pd.DataFrame:
+    """Build a Backtesting.py-style _trades DataFrame from raw trade records."""
+    size = records[:, _T_SIZE]
+    entry_price = records[:, _T_ENTRY_PRICE]
+    exit_price = records[:, _T_EXIT_PRICE]
+    entry_bar = records[:, _T_ENTRY_BAR].astype(np.int64)
+    exit_bar = records[:, _T_EXIT_BAR].astype(np.int64)
+
+    # Same arithmetic as Trade.pl / Trade.pl_pct (exit commission + entry commission)
+    commissions = np.abs(size) * exit_price * commission + np.abs(size) * entry_price * commission
+    pnl = size * (exit_price - entry_price) - commissions
+    return_pct = np.sign(size) * (exit_price / entry_price - 1) - commissions / (np.abs(size) * entry_price)
+
+    entry_time, exit_time = index[entry_bar], index[exit_bar]
+    # All columns in one constructor call: inserting columns afterwards costs as much again
+    return pd.DataFrame({
+        'Size': size * scale,
+        'EntryBar': entry_bar,
+        'ExitBar': exit_bar,
+        'EntryPrice': entry_price / scale,
+        'ExitPrice': exit_price / scale,
+        'SL': records[:, _T_SL] / scale,
+        'TP': records[:, _T_TP] / scale,
+        'PnL': pnl,
+        'Commission': commissions,
+        'ReturnPct': return_pct,
+        'EntryTime': entry_time,
+        'ExitTime': exit_time,
+        'Duration': exit_time - entry_time,
+        'Tag': np.full(len(records), None, dtype=object),
+    })
+
+
+def _geometric_mean(returns: np.ndarray) -> float:
+    """Geometric mean of simple returns (0 if any period lost everything)."""
+    returns = np.nan_to_num(np.asarray(returns, dtype=float)) + 1
+    if np.any(returns <= 0):
+        return 0
+    return np.exp(np.log(returns).sum() / (len(returns) or np.nan)) - 1
+
+
+def _mean(values: np.ndarray) -> float:
+    """Mean that returns NaN for empty input (like pandas) instead of warning."""
+    return values.mean() if len(values) else np.nan
+
+
+def _drawdown_periods(dd: np.ndarray):
+    """
+    Drawdown duration and peak per drawdown period, placed at the bar where
+    each period ends (NaN elsewhere), like Backtesting.py - without pandas apply.
+
+    Returns:
+        (end bar positions, start bar positions, peak drawdowns)
+    """
+    ends = np.flatnonzero(dd == 0)
+    if not len(ends) or ends[-1] != len(dd) - 1:
+        ends = np.r_[ends, len(dd) - 1]
+    starts = np.r_[ends[0], ends[:-1]]  # The first end has no previous zero: never kept
+    keep = ends > starts + 1
+    # Max of dd over [start, end] for every recovered period at once
+    segment_max = np.maximum.reduceat(dd, ends)
+    peaks = np.maximum(segment_max[:-1], dd[ends[1:]])
+    return ends[keep], starts[keep], np.r_[np.nan, peaks][keep]
+
+
+# Bar-only statistics terms of the most recently backtested index. pd.Index
+# is immutable, so repeated runs on one frame (an optimization, a strategy
+# comparison) reuse them; the weak reference never keeps a frame alive.
+_index_memo: Tuple[Optional[weakref.ref], Dict[str, Any]] = (None, {})
+
+
+def _index_context(data: pd.DataFrame) -> Dict[str, Any]:
+    """
+    The parts of the statistics that only depend on the bars, not the equity.
+
+    Computed once per frame and shared by every variant of a batch.
+    """
+    c = data['Close'].to_numpy()
+    context = dict(_index_terms(data.index))
+    context['buy_hold_return'] = (c[-1] - c[0]) / c[0] * 100
+    context['market_log_returns'] = np.log(c[1:] / c[:-1])
+    return context
+
+
+def _index_terms(index: pd.Index) -> Dict[str, Any]:
+    """Bar period, annualization and resampling positions of an index (memoized)."""
+    global _index_memo
+    ref, terms = _index_memo
+    if ref is not None and ref() is index:
+        return terms
+
+    terms = {
+        'period': pd.Series(index[-100:]).diff().dropna().median(),
+        'is_datetime_index': isinstance(index, pd.DatetimeIndex),
+        'annual_trading_days': np.nan,
+        'period_ends': None,
+    }
+    if terms['is_datetime_index']:
+        freq_days = terms['period'].days
+        have_weekends = index.dayofweek.to_series().between(5, 6).mean() > 2 / 7 * .6
+        terms['annual_trading_days'] = (
+            52 if freq_days == 7 else
+            12 if freq_days == 31 else
+            1 if freq_days == 365 else
+            (365 if have_weekends else 252))
+        freq = {7: 'W', 31: 'ME', 365: 'YE'}.get(freq_days, 'D')
+        # Position of the last bar in each (non-empty) resampling period
+        terms['period_ends'] = (pd.Series(np.arange(len(index)), index=index)
+                                .resample(freq).last().dropna().to_numpy(dtype=np.int64))
+    _index_memo = (weakref.ref(index), terms)
+    return terms
+
+
+def _compute_stats(trades_df: pd.DataFrame, equity: np.ndarray, data: pd.DataFrame,
+                   context: Optional[Dict[str, Any]] = None) -> pd.Series:
+    """
+    Backtesting.py statistics for the simulated run.
+
+    Same keys and definitions as backtesting._stats.compute_stats(), but the
+    drawdown bookkeeping is vectorized (compute_stats() runs a pandas apply per
+    drawdown period, which costs more than the simulation itself).
+    """
+    return _compute_stats_batch([trades_df], equity, data, context)[0]
+
+
+def _compute_stats_batch(trades: Sequence[pd.DataFrame], equity: np.ndarray, data: pd.DataFrame,
+                         context: Optional[Dict[str, Any]] = None) -> List[pd.Series]:
+    """
+    _compute_stats() for several runs over the same bars.
+
+    The equity curve statistics (drawdowns, period returns, volatility, beta)
+    are computed for all runs at once on a (n_runs, n_bars) matrix, whose rows
+    reduce exactly like 1-D arrays, so a run gets the same numbers alone or
+    in a batch. Only the trade statistics, the drawdown periods and the
+    result frames are built run by run.
+
+    Args:
+        trades: _trades_frame() of each run
+        equity: Equity curves, (n_bars,) for one run or (n_bars, n_runs)
+        data: The backtested frame
+        context: _index_context(data), if already computed
+    """
+    context = context or _index_context(data)
+    index = data.index
+    n = len(index)
+    curves = np.ascontiguousarray(np.asarray(equity, dtype=float).reshape(n, -1).T)
+    n_runs = len(curves)
+    first, final = curves[:, 0], curves[:, -1]
+
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        # NumPy warns where pandas quietly returns NaN (e.g. variance of one daily return)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        dd = 1 - curves / np.maximum.accumulate(curves, axis=1)
+        returns_pct = (final - first) / first * 100
+
+        annual_trading_days = context['annual_trading_days']
+        is_datetime_index = context['is_datetime_index']
+        if is_datetime_index:
+            # Same as Equity.resample(freq).last().dropna().pct_change().dropna()
+            period_equity = curves[:, context['period_ends']]
+            day_returns = period_equity[:, 1:] / period_equity[:, :-1] - 1
+            valid = ~np.isnan(day_returns)
+            if valid.all():
+                growth = day_returns + 1
+                day_var = day_returns.var(axis=1, ddof=1)
+                downside = np.mean(np.clip(day_returns, -np.inf, 0)**2, axis=1)
+            else:
+                # NaN where the equity was already 0; dropped like pandas' dropna()
+                growth = np.where(valid, day_returns + 1, 1)
+                day_var = np.nanvar(day_returns, axis=1, ddof=1)
+                downside = np.nanmean(np.clip(day_returns, -np.inf, 0)**2, axis=1)
+            counts = valid.sum(axis=1)
+            # _geometric_mean() per run
+            gmean_day_return = np.exp(np.log(growth).sum(axis=1) / np.where(counts, counts, np.nan)) - 1
+            gmean_day_return[(growth <= 0).any(axis=1)] = 0
+        else:
+            gmean_day_return = np.zeros(n_runs)
+            day_var = downside = np.full(n_runs, np.nan)
+
+        annualized_return = (1 + gmean_day_return)**annual_trading_days - 1
+        volatility = np.sqrt((day_var + (1 + gmean_day_return)**2)**annual_trading_days
+                             - (1 + gmean_day_return)**(2 * annual_trading_days)) * 100
+        sortino = annualized_return / (np.sqrt(downside) * np.sqrt(annual_trading_days))
+
+        max_dd = -np.nan_to_num(dd.max(axis=1))
+        market_log_returns = context['market_log_returns']
+        beta = np.full(n_runs, np.nan)
+        if n > 2:
+            # np.cov(equity_log_returns, market_log_returns)[0, 1] / [1, 1] for every run
+            equity_log_returns = np.log(curves[:, 1:] / curves[:, :-1])
+            equity_dev = equity_log_returns - equity_log_returns.mean(axis=1, keepdims=True)
+            market_dev = market_log_returns - market_log_returns.mean()
+            beta = (equity_dev * market_dev).sum(axis=1) / (market_dev * market_dev).sum()
+
+    if is_datetime_index:
+        duration = index[-1] - index[0]
+        time_in_years = (duration.days + duration.seconds / 86400) / 365.25
+
+    results = []
+    for run in range(n_runs):
+        s = _trade_stats(trades[run], curves[run], dd[run], index, context)
+        s['Return [%]'] = returns_pct[run]
+        s['Return (Ann.) [%]'] = annualized_return[run] * 100
+        s['Volatility (Ann.) [%]'] = volatility[run]
+        if is_datetime_index:
+            s['CAGR [%]'] = ((final[run] / first[run])**(1 / time_in_years) - 1) * 100 if time_in_years else np.nan
+        s['Sharpe Ratio'] = s['Return (Ann.) [%]'] / (volatility[run] or np.nan)
+        s['Sortino Ratio'] = sortino[run]
+        s['Calmar Ratio'] = annualized_return[run] / (-max_dd[run] or np.nan)
+        s['Alpha [%]'] = returns_pct[run] - beta[run] * context['buy_hold_return']
+        s['Beta'] = beta[run]
+        s['Max. Drawdown [%]'] = max_dd[run] * 100
+        results.append(pd.Series({key: s[key] for key in _STATS_ORDER if key in s}, dtype=object))
+    return results
+
+
+# Key order of backtesting._stats.compute_stats()
+_STATS_ORDER = (
+    'Start', 'End', 'Duration', 'Exposure Time [%]', 'Equity Final [$]', 'Equity Peak [$]',
+    'Commissions [$]', 'Return [%]', 'Buy & Hold Return [%]', 'Return (Ann.) [%]',
+    'Volatility (Ann.) [%]', 'CAGR [%]', 'Sharpe Ratio', 'Sortino Ratio', 'Calmar Ratio',
+    'Alpha [%]', 'Beta', 'Max. Drawdown [%]', 'Avg. Drawdown [%]', 'Max. Drawdown Duration',
+    'Avg. Drawdown Duration', '# Trades', 'Win Rate [%]', 'Best Trade [%]', 'Worst Trade [%]',
+    'Avg. Trade [%]', 'Max. Trade Duration', 'Avg. Trade Duration', 'Profit Factor',
+    'Expectancy [%]', 'SQN', 'Kelly Criterion', '_strategy', '_equity_curve', '_trades',
+)
+
+
+def _trade_stats(trades_df: pd.DataFrame, equity: np.ndarray, dd: np.ndarray, index: pd.Index,
+                 context: Dict[str, Any]) -> Dict[str, Any]:
+    """The statistics of one run that are not computed batch-wide, plus its result frames."""
+    n = len(index)
+    ends, starts, peaks = _drawdown_periods(dd)
+    if len(ends):
+        durations = np.asarray(index[ends] - index[starts])
+        if durations.dtype.kind == 'm':
+            dd_dur = np.full(n, np.timedelta64('NaT'), dtype=durations.dtype)
+        else:
+            dd_dur = np.full(n, np.nan)
+        dd_dur[ends] = durations
+        dd_peaks = np.full(n, np.nan)
+        dd_peaks[ends] = peaks
+        dd_dur, dd_peaks = pd.Series(dd_dur, index=index), pd.Series(dd_peaks, index=index)
+    else:
+        # No drawdown at all: Backtesting.py reports dd itself with zeros as NaN
+        dd_dur = dd_peaks = pd.Series(dd, index=index).replace(0, np.nan)
+
+    equity_df = pd.DataFrame({'Equity': equity, 'DrawdownPct': dd, 'DrawdownDuration': dd_dur}, index=index)
+
+    pl = trades_df['PnL'].to_numpy()
+    returns = trades_df['ReturnPct'].to_numpy()
+    durations = trades_df['Duration']
+
+    period = context['period']
+
+    def _round_timedelta(value):
+        if not isinstance(value, pd.Timedelta):
+            return value
+        resolution = getattr(period, 'resolution_string', None) or period.resolution
+        return value.ceil(resolution)
+
+    s = {}
+    s['Start'] = index[0]
+    s['End'] = index[-1]
+    s['Duration'] = s['End'] - s['Start']
+
+    # Bars spent in a trade, EntryBar..ExitBar inclusive
+    have_position = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(have_position, trades_df['EntryBar'].to_numpy(), 1)
+    np.add.at(have_position, trades_df['ExitBar'].to_numpy() + 1, -1)
+    s['Exposure Time [%]'] = (np.cumsum(have_position[:n]) > 0).mean() * 100
+    s['Equity Final [$]'] = equity[-1]
+    s['Equity Peak [$]'] = equity.max()
+    commissions = trades_df['Commission'].sum()
+    if commissions:
+        s['Commissions [$]'] = commissions
+    s['Buy & Hold Return [%]'] = context['buy_hold_return']
+    s['Avg. Drawdown [%]'] = -dd_peaks.mean() * 100
+    s['Max. Drawdown Duration'] = _round_timedelta(dd_dur.max())
+    s['Avg. Drawdown Duration'] = _round_timedelta(dd_dur.mean())
+    s['# Trades'] = n_trades = len(trades_df)
+    with np.errstate(all='ignore'):
+        win_rate = np.nan if not n_trades else (pl > 0).mean()
+        s['Win Rate [%]'] = win_rate * 100
+        s['Best Trade [%]'] = (returns.max() if n_trades else np.nan) * 100
+        s['Worst Trade [%]'] = (returns.min() if n_trades else np.nan) * 100
+        s['Avg. Trade [%]'] = _geometric_mean(returns) * 100
+        s['Max. Trade Duration'] = _round_timedelta(durations.max())
+        s['Avg. Trade Duration'] = _round_timedelta(durations.mean())
+        s['Profit Factor'] = returns[returns > 0].sum() / (abs(returns[returns < 0].sum()) or np.nan)
+        s['Expectancy [%]'] = _mean(returns) * 100
+        s['SQN'] = np.sqrt(n_trades) * _mean(pl) / ((pl.std(ddof=1) if n_trades > 1 else np.nan) or np.nan)
+        s['Kelly Criterion'] = win_rate - (1 - win_rate) / (_mean(pl[pl > 0]) / -_mean(pl[pl < 0]))
+
+    s['_strategy'] = None
+    s['_equity_curve'] = equity_df
+    s['_trades'] = trades_df
+    return s
+
+
+def compare_with_backtesting(data: pd.DataFrame,
+                             strategy_class: Optional[Type] = None,
+                             cash: float = 10000,
+                             commission: float = 0.0004,
+                             fractional_unit: Optional[float] = DEFAULT_FRACTIONAL_UNIT,
+                             rtol: float = 1e-9,
+                             **params) -> pd.DataFrame:
+    """
+    Cross-check the fast engine against Backtesting.py, trade by trade.
+
+    Runs both engines with identical settings and compares every trade's bars,
+    size, prices and PnL plus the final equity.
+
+    Returns:
+        DataFrame of mismatching fields (empty when both engines agree)
+
+    Example:
+        >>> mismatches = compare_with_backtesting(bt_data, ConservativeLSTMStrategy)
+        >>> assert mismatches.empty, mismatches
+    """
+    from backtesting import Backtest
+    from backtesting.lib import FractionalBacktest
+
+    strategy_class = resolve_strategy(strategy_class)
+    if fractional_unit:
+        bt = FractionalBacktest(data, strategy_class, cash=cash, commission=commission,
+                                exclusive_orders=True, trade_on_close=False,
+                                fractional_unit=fractional_unit)
+    else:
+        bt = Backtest(data, strategy_class, cash=cash, commission=commission,
+                      exclusive_orders=True, trade_on_close=False)
+    reference = bt.run(**params)
+    fast = run_fast_backtest(data, strategy_class, cash=cash, commission=commission,
+                             fractional_unit=fractional_unit, **params)
+
+    ref_trades, fast_trades = reference['_trades'], fast['_trades']
+    mismatches = []
+    if len(ref_trades) != len(fast_trades):
+        mismatches.append({'trade': None, 'field': '# Trades',
+                           'backtesting': len(ref_trades), 'fast': len(fast_trades)})
+
+    for field in ('EntryBar', 'ExitBar', 'Size', 'EntryPrice', 'ExitPrice', 'PnL'):
+        expected = ref_trades[field].to_numpy(dtype=float)
+        actual = fast_trades[field].to_numpy(dtype=float)
+        n = min(len(expected), len(actual))
+        bad = ~np.isclose(expected[:n], actual[:n], rtol=rtol, atol=0)
+        for trade in np.flatnonzero(bad):
+            mismatches.append({'trade': int(trade), 'field': field,
+                               'backtesting': expected[trade], 'fast': actual[trade]})
+
+    if not np.isclose(reference['Equity Final [$]'], fast['Equity Final [$]'], rtol=rtol, atol=0):
+        mismatches.append({'trade': None, 'field': 'Equity Final [$]',
+                           'backtesting': reference['Equity Final [$]'], 'fast': fast['Equity Final [$]']})
+
+    return pd.DataFrame(mismatches, columns=['trade', 'field', 'backtesting', 'fast'])
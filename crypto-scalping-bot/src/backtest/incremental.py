@@ -0,0 +1,241 @@
+"""
+Resumable fast-engine backtest for live monitoring.
+
+A dashboard that refreshes a long equity curve every minute should not
+replay the whole history each time. IncrementalBacktest keeps the fast
+engine's complete simulation state (open position, pending order, cash,
+equity curve, trade log) between calls: update() simulates only the bars
+appended since the last call, and save()/load() checkpoint that state to
+disk so a restarted process resumes where it stopped.
+
+The result is identical to run_fast_backtest() on the concatenated frame.
+Signal masks are per-bar, so they are computed for the new bars only; the
+equity curve and trade log grow in amortized O(new bars). stats() builds the
+full Backtesting.py statistics on demand (vectorized, O(all bars)).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Optional, Type, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtest.fast_engine import (ENGINE_VERSION, DEFAULT_FRACTIONAL_UNIT, _TRADE_FIELDS, _S_SIZE,
+                                  _S_ENTRY_PRICE, _S_SL, _S_TP, _S_PENDING, _compute_stats, _price_arrays,
+                                  _strategy_masks, _trades_frame, initial_state, simulate_bars,
+                                  strategy_params)
+
+# Bump when the checkpoint layout changes
+CHECKPOINT_VERSION = 1
+
+
+class _GrowingArray:
+    """Append-only array with capacity doubling (amortized O(1) per row)."""
+
+    def __init__(self, row_shape=(), dtype=float, values: Optional[np.ndarray] = None) -> None:
+        values = np.empty((0, *row_shape), dtype=dtype) if values is None else np.asarray(values, dtype=dtype)
+        self._data = np.empty((max(len(values), 1024), *row_shape), dtype=dtype)
+        self._data[:len(values)] = values
+        self.size = len(values)
+
+    def reserve(self, extra: int) -> np.ndarray:
+        """Make room for `extra` rows and return the (writable) slot after the current end."""
+        needed = self.size + extra
+        if needed > len(self._data):
+            grown = np.empty((max(needed, 2 * len(self._data)), *self._data.shape[1:]), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        return self._data[self.size:needed]
+
+    def extend(self, rows: int) -> None:
+        """Commit `rows` rows written into the slot returned by reserve()."""
+        self.size += rows
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self.size]
+
+
+class IncrementalBacktest:
+    """
+    Fast-engine backtest that can be extended with new bars.
+
+    Example:
+        >>> live = IncrementalBacktest(LSTMScalpingStrategy, cash=10000)
+        >>> live.update(bt_data)                     # full history once
+        >>> live.save('results/live_checkpoint.npz')
+        >>> # every minute, in the same or a restarted process:
+        >>> live = IncrementalBacktest.load('results/live_checkpoint.npz')
+        >>> new_equity = live.update(new_bars)       # O(len(new_bars))
+        >>> live.save('results/live_checkpoint.npz')
+    """
+
+    def __init__(self, strategy_class: Optional[Type] = None,
+                 cash: float = 10000, commission: float = 0.0004,
+                 fractional_unit: Optional[float] = DEFAULT_FRACTIONAL_UNIT, **params) -> None:
+        """
+        Args:
+            strategy_class: LSTMScalpingStrategy or a subclass that only changes
+                parameters (None = LSTMScalpingStrategy)
+            cash: Initial capital
+            commission: Relative commission per fill
+            fractional_unit: Tradable unit as in FractionalBacktest (None = whole units)
+            **params: Strategy parameter overrides
+        """
+        self.params = strategy_params(strategy_class, **params)
+        self.cash = float(cash)
+        self.commission = float(commission)
+        self.fractional_unit = fractional_unit
+        self.state = initial_state(self.cash)
+        self.tz: Optional[str] = None
+        self.time_unit = 'ns'                          # Resolution of the input index
+
+        self._times = _GrowingArray(dtype=np.int64)    # Bar timestamps (ns, UTC if tz-aware)
+        self._close = _GrowingArray()                  # Close prices (buy & hold, beta)
+        self._equity = _GrowingArray()
+        self._trades = _GrowingArray((_TRADE_FIELDS,))
+
+    @property
+    def n_bars(self) -> int:
+        """Bars simulated so far."""
+        return self._times.size
+
+    def update(self, data: pd.DataFrame) -> pd.Series:
+        """
+        Simulate newly appended bars.
+
+        Rows at or before the last simulated timestamp are ignored, so the
+        caller can pass an overlapping window (e.g. the last N bars).
+
+        Args:
+            data: New rows of the prepared backtest frame (same columns as
+                prepare_data_for_backtest(), sorted by time)
+
+        Returns:
+            pd.Series: Equity of the newly simulated bars
+        """
+        index = pd.DatetimeIndex(data.index)
+        if self.n_bars == 0:
+            self.tz = str(index.tz) if index.tz is not None else None
+            self.time_unit = index.unit
+        if (index.tz is None) != (self.tz is None):
+            raise ValueError("New bars must use the same timezone awareness as the checkpointed ones")
+        times = (index.tz_convert('UTC').tz_localize(None) if index.tz is not None else index).as_unit('ns').asi8
+        if not np.all(np.diff(times) > 0):
+            raise ValueError("New bars must be sorted by time without duplicates")
+        if self.n_bars:
+            new = times > self._times.values[-1]
+            data, times = data[new], times[new]
+        n = len(data)
+        if n == 0:
+            return pd.Series(dtype=float, name='Equity')
+
+        scale = self.fractional_unit or 1.0
+        open_, high, low, close = _price_arrays(data, scale)
+        masks = _strategy_masks(data, self.params)
+
+        offset = self.n_bars
+        equity = self._equity.reserve(n)
+        trades = self._trades.reserve(n)
+        start = 0
+        if offset == 0:
+            # First bar: starting equity only, like run_fast_backtest()
+            equity[0] = self.cash
+            start = 1
+        n_trades = simulate_bars(open_, high, low, close, masks, self.params, self.commission,
+                                 equity, trades, self.state, start=start, offset=offset)
+
+        self._equity.extend(n)
+        self._trades.extend(n_trades)
+        self._times.reserve(n)[:] = times
+        self._times.extend(n)
+        self._close.reserve(n)[:] = data['Close'].to_numpy(dtype=float)
+        self._close.extend(n)
+        return pd.Series(equity.copy(), index=data.index, name='Equity')
+
+    def _index(self) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(self._times.values).as_unit(self.time_unit)
+        return index.tz_localize('UTC').tz_convert(self.tz) if self.tz else index
+
+    @property
+    def equity_curve(self) -> pd.Series:
+        """Equity of every simulated bar."""
+        return pd.Series(self._equity.values.copy(), index=self._index(), name='Equity')
+
+    @property
+    def trades(self) -> pd.DataFrame:
+        """Closed trades (Backtesting.py _trades layout)."""
+        return _trades_frame(self._trades.values, self._index(), self.commission, self.fractional_unit or 1.0)
+
+    @property
+    def position(self) -> Dict[str, Any]:
+        """Open position (size in asset units, 0 = flat) and pending order after the last simulated bar."""
+        scale = self.fractional_unit or 1.0
+        size = float(self.state[_S_SIZE]) * scale
+        return {
+            'size': size,
+            'entry_price': float(self.state[_S_ENTRY_PRICE]) / scale if size else None,
+            'sl': float(self.state[_S_SL]) / scale if size else None,
+            'tp': float(self.state[_S_TP]) / scale if size else None,
+            'pending_order': {0: None, 1: 'buy', -1: 'sell', 2: 'close'}[int(self.state[_S_PENDING])],
+        }
+
+    def stats(self) -> pd.Series:
+        """Backtesting.py-compatible statistics of everything simulated so far."""
+        if self.n_bars == 0:
+            raise ValueError("No bars simulated yet")
+        index = self._index()
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return _compute_stats(self.trades, self._equity.values.copy(),
+                                  pd.DataFrame({'Close': self._close.values}, index=index))
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Checkpoint the full state to an .npz file (atomic write)."""
+        meta = {
+            'checkpoint_version': CHECKPOINT_VERSION,
+            'engine_version': ENGINE_VERSION,
+            'params': self.params,
+            'cash': self.cash,
+            'commission': self.commission,
+            'fractional_unit': self.fractional_unit,
+            'tz': self.tz,
+            'time_unit': self.time_unit,
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), state=self.state, times=self._times.values,
+                         close=self._close.values, equity=self._equity.values, trades=self._trades.values)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'IncrementalBacktest':
+        """Resume from a checkpoint written by save()."""
+        with np.load(path, allow_pickle=False) as checkpoint:
+            meta = json.loads(str(checkpoint['meta']))
+            if meta['checkpoint_version'] != CHECKPOINT_VERSION or meta['engine_version'] != ENGINE_VERSION:
+                raise ValueError(f"Checkpoint {path} was written by another engine/checkpoint version; "
+                                 f"rerun the backtest from the start")
+            backtest = cls(cash=meta['cash'], commission=meta['commission'],
+                           fractional_unit=meta['fractional_unit'], **meta['params'])
+            backtest.tz = meta['tz']
+            backtest.time_unit = meta['time_unit']
+            backtest.state = checkpoint['state'].copy()
+            backtest._times = _GrowingArray(dtype=np.int64, values=checkpoint['times'])
+            backtest._close = _GrowingArray(values=checkpoint['close'])
+            backtest._equity = _GrowingArray(values=checkpoint['equity'])
+            backtest._trades = _GrowingArray((_TRADE_FIELDS,), values=checkpoint['trades'])
+        return backtest
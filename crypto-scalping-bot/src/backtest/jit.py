@@ -0,0 +1,34 @@
+"""
+Lazy numba compilation of the backtest kernels.
+
+Importing numba costs ~0.2s, more than the rest of a backtest module's
+imports together. Kernels are therefore plain Python functions at import
+time and compiled (or loaded from numba's on-disk cache) the first time
+they are needed:
+
+    >>> simulate = compiled(_simulate) or _simulate
+"""
+
+from typing import Callable, Dict, Optional
+
+_compiled: Dict[Callable, Optional[Callable]] = {}
+
+
+def compiled(func: Callable) -> Optional[Callable]:
+    """
+    numba-compiled version of `func`, or None if numba is not installed.
+
+    The dispatcher is created once per function; numba itself compiles on
+    the first call (cache=True keeps the machine code across processes).
+    """
+    if hasattr(func, 'py_func'):
+        return func  # Already a numba dispatcher
+    if func not in _compiled:
+        try:
+            from numba import njit
+        except ImportError:
+            # numba is optional; callers fall back to the Python function
+            _compiled[func] = None
+        else:
+            _compiled[func] = njit(cache=True, nogil=True)(func)
+    return _compiled[func]
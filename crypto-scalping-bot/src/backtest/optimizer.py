@@ -0,0 +1,405 @@
+"""
+Parallel parameter optimization for LSTMScalpingStrategy.
+
+The backtest frame is copied once into shared memory; worker processes attach
+to it (zero-copy NumPy views) and evaluate parameter sets as they are handed
+out, so every combination costs one simulation and no data transfer. Results
+stream back to the parent as soon as each evaluation finishes.
+
+Search methods:
+    - grid: every combination of the parameter lists
+    - random: n_iter samples (lists = choices, (low, high) tuples = uniform)
+    - halving: successive halving - score all candidates on a short prefix of
+      the data, keep the best 1/eta, repeat with eta-times more bars until the
+      survivors are scored on the full period
+
+Results are collected in a columnar SweepResults table (scalar statistics
+only), so memory stays small however many candidates are evaluated; trade
+logs are kept for the best `keep_trades` parameter sets only.
+"""
+
+import io
+import os
+import sys
+import time
+import itertools
+import warnings
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from strategies.signals import resolve_strategy
+from backtest.fast_engine import DEFAULT_FRACTIONAL_UNIT, run_fast_backtest
+from backtest.result_cache import ResultCache, result_key
+from backtest.sweep_results import SweepResults
+
+# The grid BacktestRunner.optimize_strategy() has always used
+DEFAULT_PARAM_GRID = {
+    'prediction_threshold': [0.001, 0.002, 0.003, 0.004],
+    'stop_loss_pct': [0.003, 0.005, 0.007, 0.01],
+    'take_profit_pct': [0.006, 0.01, 0.015, 0.02],
+    'position_size': [0.5, 0.7, 0.9, 0.95],
+}
+
+ParamGrid = Dict[str, Union[List[Any], Tuple[float, float]]]
+
+
+def grid_candidates(param_grid: ParamGrid,
+                    constraint: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+    """Every combination of the grid's value lists that passes `constraint`."""
+    names = list(param_grid)
+    for name, values in param_grid.items():
+        if isinstance(values, tuple):
+            raise ValueError(f"Grid search needs a list of values for '{name}', got range {values}")
+    candidates = [dict(zip(names, combo)) for combo in itertools.product(*param_grid.values())]
+    return [c for c in candidates if constraint is None or constraint(c)]
+
+
+def random_candidates(param_grid: ParamGrid, n_iter: int, seed: Optional[int] = None,
+                      constraint: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                      max_tries: int = 100) -> List[Dict[str, Any]]:
+    """
+    Sample up to `n_iter` distinct parameter sets.
+
+    Lists are sampled as choices, (low, high) tuples uniformly. Samples failing
+    `constraint` are redrawn (up to max_tries * n_iter draws in total).
+    """
+    rng = np.random.default_rng(seed)
+    candidates, seen = [], set()
+    for _ in range(max_tries * n_iter):
+        if len(candidates) >= n_iter:
+            break
+        candidate = {}
+        for name, values in param_grid.items():
+            if isinstance(values, tuple):
+                candidate[name] = float(rng.uniform(*values))
+            else:
+                candidate[name] = values[rng.integers(len(values))]
+        key = tuple(candidate.items())
+        if key in seen or (constraint is not None and not constraint(candidate)):
+            continue
+        seen.add(key)
+        candidates.append(candidate)
+    return candidates
+
+
+class SharedFrame:
+    """
+    A numeric DataFrame stored in a shared memory block.
+
+    The parent creates it once; workers rebuild the DataFrame from the block
+    without copying (columns are contiguous slices of one Fortran-ordered array).
+    """
+
+    def __init__(self, data: pd.DataFrame) -> None:
+        values = np.asfortranarray(data.to_numpy(dtype=np.float64))
+        index = data.index
+        tz = getattr(index, 'tz', None)
+        if tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        index = index.to_numpy()
+        index_dtype = str(index.dtype)  # e.g. datetime64[ns] or datetime64[us]
+        index = index.view(np.int64) if index.dtype.kind == 'M' else index.astype(np.int64)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes + index.nbytes, 1))
+        block = np.ndarray(values.shape, dtype=np.float64, buffer=self._shm.buf, order='F')
+        block[:] = values
+        np.ndarray(index.shape, dtype=np.int64, buffer=self._shm.buf, offset=values.nbytes)[:] = index
+
+        # Everything a worker needs to attach (small and picklable)
+        self.spec = {
+            'name': self._shm.name,
+            'shape': values.shape,
+            'columns': list(data.columns),
+            'index_dtype': index_dtype,
+            'tz': str(tz) if tz is not None else None,
+        }
+
+    def close(self) -> None:
+        """Release and remove the shared block (parent side)."""
+        self._shm.close()
+        self._shm.unlink()
+
+    @staticmethod
+    def attach(spec: Dict[str, Any]) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+        """Attach to a block created by the parent and return (handle, DataFrame view)."""
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        n_rows, n_cols = spec['shape']
+        values = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=shm.buf, order='F')
+        index = np.ndarray((n_rows,), dtype=np.int64, buffer=shm.buf, offset=values.nbytes)
+        if spec['index_dtype'].startswith('datetime64'):
+            index = pd.DatetimeIndex(index.view(spec['index_dtype']))
+            if spec['tz']:
+                index = index.tz_localize('UTC').tz_convert(spec['tz'])
+        frame = pd.DataFrame({col: values[:, i] for i, col in enumerate(spec['columns'])}, index=index, copy=False)
+        return shm, frame
+
+
+# Per-worker state, set by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(spec: Dict[str, Any], settings: Dict[str, Any]) -> None:
+    """Process pool initializer: attach to the shared frame once per worker."""
+    shm, frame = SharedFrame.attach(spec)
+    _worker.update(shm=shm, data=frame, **settings)
+
+
+def _evaluate(params: Dict[str, Any], n_bars: Optional[int] = None,
+              keep_trades: bool = False) -> Dict[str, Any]:
+    """Backtest one parameter set (optionally on the first n_bars) in a worker."""
+    data = _worker['data'] if n_bars is None else _worker['data'].iloc[:n_bars]
+    stats = evaluate_params(data, params, _worker['strategy_class'], _worker['cash'],
+                            _worker['commission'], _worker['engine'], keep_trades)
+    return {**params, **stats}
+
+
+def evaluate_params(data: pd.DataFrame, params: Dict[str, Any],
+                    strategy_class: Optional[Type] = None,
+                    cash: float = 10000, commission: float = 0.0004,
+                    engine: str = 'fast', keep_trades: bool = False) -> Dict[str, Any]:
+    """
+    Backtest one parameter set and return its scalar statistics.
+
+    Args:
+        strategy_class: Strategy class (None = LSTMScalpingStrategy)
+        engine: 'fast' (fast_engine) or 'backtesting' (Backtesting.py)
+        keep_trades: Also return the trade log as '_trades' (the equity
+            curve and strategy object are always dropped)
+    """
+    if engine == 'fast':
+        stats = run_fast_backtest(data, strategy_class, cash=cash, commission=commission,
+                                  fractional_unit=DEFAULT_FRACTIONAL_UNIT, **params)
+    elif engine == 'backtesting':
+        from backtesting.lib import FractionalBacktest
+
+        # Strategy init prints diagnostics on every run
+        with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()):
+            warnings.simplefilter('ignore')
+            bt = FractionalBacktest(data, resolve_strategy(strategy_class), cash=cash, commission=commission,
+                                    exclusive_orders=True, trade_on_close=False)
+            stats = bt.run(**params)
+    else:
+        raise ValueError(f"Unknown backtest engine '{engine}' (use 'backtesting' or 'fast')")
+
+    return {key: value for key, value in stats.items()
+            if not key.startswith('_') or (keep_trades and key == '_trades')}
+
+
+class ParallelOptimizer:
+    """
+    Evaluate many strategy parameter sets across a process pool.
+
+    Example:
+        >>> optimizer = ParallelOptimizer(bt_data, workers=8)
+        >>> results = optimizer.optimize(method='random', n_iter=500)
+        >>> print(results.head())  # best first
+    """
+
+    def __init__(self, data: pd.DataFrame,
+                 strategy_class: Optional[Type] = None,
+                 cash: float = 10000,
+                 commission: float = 0.0004,
+                 engine: str = 'fast',
+                 workers: Optional[int] = None,
+                 cache: Optional[ResultCache] = None) -> None:
+        """
+        Args:
+            data: Prepared backtest data (from prepare_data_for_backtest)
+            strategy_class: Strategy whose parameters are optimized (None = LSTMScalpingStrategy)
+            cash: Initial capital
+            commission: Trading commission
+            engine: 'fast' or 'backtesting' (per-evaluation simulator)
+            workers: Worker processes (default: CPU count)
+            cache: Result cache; parameter points evaluated before (on the
+                same data, strategy and settings) are not re-simulated
+        """
+        self.data = data.select_dtypes(include='number')
+        self.strategy_class = strategy_class
+        self.cash = cash
+        self.commission = commission
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.top_trades: Dict[int, pd.DataFrame] = {}
+        self._data_digest: Optional[str] = None
+
+    def optimize(self, param_grid: Optional[ParamGrid] = None,
+                 method: str = 'grid',
+                 maximize: str = 'Sharpe Ratio',
+                 constraint: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 n_iter: int = 100,
+                 eta: int = 3,
+                 min_bars: int = 2000,
+                 seed: Optional[int] = None,
+                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 keep_trades: int = 0) -> pd.DataFrame:
+        """
+        Search the parameter space and rank the results.
+
+        Args:
+            param_grid: {param: [values]} or {param: (low, high)} for random search
+                (default: DEFAULT_PARAM_GRID)
+            method: 'grid', 'random' or 'halving'
+            maximize: Statistic to maximize (any Backtesting.py stats key)
+            constraint: Optional filter on candidate dicts, e.g.
+                lambda p: p['take_profit_pct'] > p['stop_loss_pct']
+            n_iter: Number of random samples ('random'; 'halving' over random candidates)
+            eta: Halving rate - keep the best 1/eta per rung ('halving')
+            min_bars: Bars in the first halving rung (at least)
+            seed: Random seed
+            on_result: Called with each result dict as soon as it arrives
+            keep_trades: Re-run the best this-many parameter sets for their trade
+                logs, stored in self.top_trades by rank (0 = best)
+
+        Returns:
+            pd.DataFrame with one row per evaluated parameter set (final rung for
+            'halving'), sorted by `maximize` (best first)
+        """
+        param_grid = param_grid or DEFAULT_PARAM_GRID
+        if method in ('grid', 'halving') and not any(isinstance(v, tuple) for v in param_grid.values()):
+            candidates = grid_candidates(param_grid, constraint)
+            if method == 'halving' and n_iter < len(candidates):
+                rng = np.random.default_rng(seed)
+                candidates = [candidates[i] for i in rng.choice(len(candidates), n_iter, replace=False)]
+        elif method in ('random', 'halving'):
+            candidates = random_candidates(param_grid, n_iter, seed, constraint)
+        else:
+            raise ValueError(f"Unknown search method '{method}' (use 'grid', 'random' or 'halving')")
+
+        if not candidates:
+            raise ValueError("No parameter sets to evaluate (check the grid and constraint).")
+
+        name = self.strategy_class.__name__ if self.strategy_class else 'LSTMScalpingStrategy'
+        print(f"\nOptimizing {name}: {len(candidates)} candidates, "
+              f"method={method}, engine={self.engine}, workers={self.workers}")
+
+        start = time.perf_counter()
+        # Hashed per search (not per candidate): self.data cannot change while it runs
+        self._data_digest = self.cache.data_digest(self.data) if self.cache is not None else None
+        shared = SharedFrame(self.data)
+        settings = {'strategy_class': self.strategy_class, 'cash': self.cash,
+                    'commission': self.commission, 'engine': self.engine}
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(shared.spec, settings)) as pool:
+                row_params: List[Dict[str, Any]] = []
+                if method == 'halving':
+                    results = self._successive_halving(pool, candidates, maximize, eta, min_bars, on_result,
+                                                       row_params)
+                else:
+                    results = self._run_batch(pool, candidates, None, on_result, maximize, row_params)
+                ranked = self._rank(results, maximize)
+                self.top_trades = self._collect_trades(pool, ranked, keep_trades, row_params)
+        finally:
+            shared.close()
+
+        elapsed = time.perf_counter() - start
+        print(f"Evaluated in {elapsed:.1f}s ({results.nbytes / 1024:.0f} KiB of results)")
+
+        return ranked.reset_index(drop=True)
+
+    def _run_batch(self, pool: ProcessPoolExecutor, candidates: Iterable[Dict[str, Any]],
+                   n_bars: Optional[int],
+                   on_result: Optional[Callable[[Dict[str, Any]], None]],
+                   maximize: Optional[str] = None,
+                   row_params: Optional[List[Dict[str, Any]]] = None) -> SweepResults:
+        """
+        Submit candidates (cached ones are answered directly) and collect results in completion order.
+
+        row_params, if given, receives the candidate dict of each results row in
+        row order: the table stores numbers as floats, so e.g. int parameters
+        must be taken from the candidates, not read back from the table.
+        """
+        results = SweepResults(maximize)
+        row_params = row_params if row_params is not None else []
+        futures = {}
+        for params in candidates:
+            key = self._cache_key(params, n_bars)
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                result = cached.to_dict()
+                results.append(result)
+                row_params.append(params)
+                if on_result is not None:
+                    on_result(result)
+            else:
+                futures[pool.submit(_evaluate, params, n_bars)] = (key, params)
+        if len(results):
+            print(f"  {len(results)} cached, {len(futures)} to evaluate")
+
+        n_futures = len(futures)
+        for done, future in enumerate(as_completed(futures), 1):
+            # Drop the future with its result once it is in the table
+            key, params = futures.pop(future)
+            result = future.result()
+            results.append(result)
+            row_params.append(params)
+            if key:
+                self.cache.put(key, result)
+            if on_result is not None:
+                on_result(result)
+            if done % max(1, n_futures // 10) == 0 or done == n_futures:
+                print(f"  {done}/{n_futures} evaluated")
+        return results
+
+    @staticmethod
+    def _collect_trades(pool: ProcessPoolExecutor, ranked: pd.DataFrame, keep_trades: int,
+                        row_params: List[Dict[str, Any]]) -> Dict[int, pd.DataFrame]:
+        """Trade logs of the best keep_trades runs, re-simulated (runs are deterministic)."""
+        if keep_trades <= 0:
+            return {}
+        best = [row_params[row] for row in ranked.index[:keep_trades]]
+        futures = [pool.submit(_evaluate, params, None, True) for params in best]
+        return {rank: future.result()['_trades'] for rank, future in enumerate(futures)}
+
+    def _cache_key(self, params: Dict[str, Any], n_bars: Optional[int]) -> Optional[str]:
+        """Summary-entry cache key of one evaluation, or None without a cache."""
+        if self.cache is None:
+            return None
+        # Both engines run with the FractionalBacktest default unit here
+        return result_key(self._data_digest, resolve_strategy(self.strategy_class), params,
+                          cash=self.cash, commission=self.commission, engine=self.engine,
+                          fractional_unit=DEFAULT_FRACTIONAL_UNIT, n_bars=n_bars, summary=True)
+
+    def _successive_halving(self, pool: ProcessPoolExecutor, candidates: List[Dict[str, Any]],
+                            maximize: str, eta: int, min_bars: int,
+                            on_result: Optional[Callable[[Dict[str, Any]], None]],
+                            row_params: Optional[List[Dict[str, Any]]] = None) -> SweepResults:
+        """Score on growing prefixes of the data, keeping the best 1/eta each rung (row_params: of the last)."""
+        if eta < 2:
+            raise ValueError("eta must be >= 2")
+        n_bars = len(self.data)
+
+        # Enough rungs to shrink to ~1 survivor, but the first rung keeps >= min_bars
+        n_rungs = 1 + int(np.floor(np.log(len(candidates)) / np.log(eta))) if len(candidates) > 1 else 1
+        while n_rungs > 1 and n_bars / eta ** (n_rungs - 1) < min_bars:
+            n_rungs -= 1
+
+        survivors = candidates
+        for rung in range(n_rungs):
+            budget = int(n_bars / eta ** (n_rungs - 1 - rung))
+            final = rung == n_rungs - 1
+            print(f"  Rung {rung + 1}/{n_rungs}: {len(survivors)} candidates on {budget} bars")
+            rung_params = row_params if final and row_params is not None else []
+            results = self._run_batch(pool, survivors, None if final else budget,
+                                      on_result if final else None, maximize, rung_params)
+            if final:
+                return results
+            ranked = self._rank(results, maximize)
+            keep = max(1, len(survivors) // eta)
+            survivors = [rung_params[row] for row in ranked.index[:keep]]
+        return results
+
+    @staticmethod
+    def _rank(results: SweepResults, maximize: str) -> pd.DataFrame:
+        """Results as a DataFrame sorted by `maximize` (NaN last); index = SweepResults row."""
+        results.maximize = maximize
+        return results.ranked()
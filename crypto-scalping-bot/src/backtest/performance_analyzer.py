@@ -4,11 +4,12 @@ Performance analysis and visualization for backtest results.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 import json
-from typing import Optional, Dict, Any
+import sys
+from typing import Optional, Dict, Any, List, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent))
 
 
 class PerformanceAnalyzer:
@@ -49,6 +50,25 @@ class PerformanceAnalyzer:
         self.trades_df = trades_df
         self.equity_curve = equity_curve
 
+    @classmethod
+    def from_trade_log(cls, path: str = 'results/trade_log', mmap: bool = True) -> 'PerformanceAnalyzer':
+        """
+        Analyzer over a run saved with trade_log.save_trade_log(), without re-simulating.
+
+        Args:
+            path: Trade log directory
+            mmap: Memory-map the stored columns instead of reading them into memory
+
+        Example:
+            >>> analyzer = PerformanceAnalyzer.from_trade_log('results/trade_log')
+            >>> metrics = analyzer.calculate_metrics()
+        """
+        from backtest.trade_log import load_trade_log
+
+        run = load_trade_log(path, mmap=mmap)
+        equity = run['_equity_curve']
+        return cls(run['_trades'], equity['Equity'] if equity is not None else None)
+
     def calculate_metrics(self, initial_capital: float = 10000) -> Dict[str, Any]:
         """
         Calculate comprehensive trading performance metrics.
@@ -75,7 +95,9 @@ class PerformanceAnalyzer:
         if self.trades_df is None or len(self.trades_df) == 0:
             return {}
 
-        trades = self.trades_df.copy()
+        # Only the columns used below (the rest may be large or memory-mapped)
+        trades = self.trades_df[[column for column in ('PnL', 'EntryTime', 'ExitTime')
+                                 if column in self.trades_df.columns]].copy()
 
         # Basic metrics
         total_trades = len(trades)
@@ -159,40 +181,108 @@ class PerformanceAnalyzer:
 
         return metrics
 
+    @staticmethod
+    def calculate_metrics_batch(trades: List[pd.DataFrame], equity_curves: Optional[Sequence] = None,
+                                initial_capital: float = 10000) -> pd.DataFrame:
+        """
+        calculate_metrics() for many runs at once (e.g. every optimization run).
+
+        All runs are scored together with vectorized NumPy reductions over
+        ragged arrays (see batch_metrics.py); use batch_metrics.batch_metrics()
+        directly when the trades are already flat arrays.
+
+        Args:
+            trades: One trades DataFrame per run
+            equity_curves: (n_runs, n_points) matrix (NaN-padded) or a list of
+                per-run equity curves, optional
+            initial_capital: Starting portfolio value for return calculations
+
+        Returns:
+            DataFrame with one row per run and the calculate_metrics() keys as
+            columns (trade durations as timedeltas)
+
+        Example:
+            >>> metrics = PerformanceAnalyzer.calculate_metrics_batch([s['_trades'] for s in runs])
+            >>> print(metrics.nlargest(5, 'sharpe_ratio'))
+        """
+        from backtest.batch_metrics import batch_metrics_from_trades
+
+        return batch_metrics_from_trades(trades, equity_curves, initial_capital)
+
+    def rolling_metrics(self, window: int = 1440, trade_window: int = 50,
+                        periods_per_year: float = 525600) -> pd.DataFrame:
+        """
+        Rolling drawdown, Sharpe, win rate and underwater duration along the equity curve.
+
+        O(n) streaming implementation (see rolling_metrics.py); use
+        RollingRiskMonitor directly to keep updating it as new points arrive.
+
+        Args:
+            window: Equity points in the drawdown / Sharpe window (1440 = one day of 1m bars)
+            trade_window: Trades in the win-rate window
+            periods_per_year: Equity points per year for Sharpe annualization
+
+        Returns:
+            DataFrame indexed like the equity curve (empty without one)
+
+        Example:
+            >>> rolling = analyzer.rolling_metrics(window=1440)
+            >>> print(rolling[['sharpe_ratio', 'max_drawdown_pct']].describe())
+        """
+        if self.equity_curve is None or len(self.equity_curve) == 0:
+            return pd.DataFrame()
+
+        from backtest.rolling_metrics import rolling_risk_metrics
+
+        trades = None
+        if self.trades_df is not None and {'PnL', 'ExitTime'} <= set(self.trades_df.columns):
+            trades = self.trades_df.sort_values('ExitTime', kind='stable')
+        return rolling_risk_metrics(self.equity_curve, trades, window, trade_window, periods_per_year)
+
+    def monte_carlo(self, n_paths: int = 10000, method: str = 'block', block_size: Optional[int] = None,
+                    initial_capital: float = 10000, confidence: float = 0.95,
+                    seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Confidence intervals of return, drawdown and streaks over resampled trade orderings.
+
+        calculate_metrics() scores the one ordering the backtest produced; this
+        resamples the trade PnL sequence n_paths times (see monte_carlo.py).
+
+        Args:
+            n_paths: Number of resampled paths
+            method: 'shuffle' (permutations), 'bootstrap' or 'block' (block bootstrap)
+            block_size: Block length for method='block' (default: n_trades^(1/3))
+            initial_capital: Starting portfolio value
+            confidence: Two-sided interval width (0.95 = 2.5th-97.5th percentile)
+            seed: Random seed for reproducible results
+
+        Returns:
+            DataFrame indexed by metric (total_return_pct, max_drawdown_pct,
+            max_consecutive_losses, max_consecutive_wins, sharpe_ratio) with
+            observed, mean, lower, median, upper columns
+
+        Example:
+            >>> intervals = analyzer.monte_carlo(n_paths=10000, seed=42)
+            >>> print(intervals.loc['max_drawdown_pct', ['lower', 'upper']])
+        """
+        if self.trades_df is None or len(self.trades_df) == 0:
+            return pd.DataFrame()
+
+        from backtest.monte_carlo import run_monte_carlo
+
+        return run_monte_carlo(self.trades_df, n_paths=n_paths, method=method, block_size=block_size,
+                               initial_capital=initial_capital, confidence=confidence, seed=seed)['intervals']
+
     def plot_equity_curve(self, save_path: str = 'results/equity_curve.png') -> None:
         """Plot equity curve over time."""
         if self.equity_curve is None:
             print("No equity curve data available.")
             return
 
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
-
-        # Equity curve
-        ax1.plot(self.equity_curve.index, self.equity_curve.values, linewidth=2, color='#2E86AB')
-        ax1.fill_between(self.equity_curve.index, self.equity_curve.values, alpha=0.3, color='#2E86AB')
-        ax1.set_title('Equity Curve', fontsize=14, fontweight='bold')
-        ax1.set_xlabel('Date')
-        ax1.set_ylabel('Equity ($)')
-        ax1.grid(True, alpha=0.3)
-        ax1.axhline(y=self.equity_curve.iloc[0], color='red', linestyle='--', alpha=0.5, label='Initial Capital')
-        ax1.legend()
-
-        # Drawdown
-        running_max = self.equity_curve.expanding().max()
-        drawdown = (self.equity_curve - running_max) / running_max * 100
-
-        ax2.fill_between(drawdown.index, drawdown.values, 0, alpha=0.3, color='#A23B72')
-        ax2.plot(drawdown.index, drawdown.values, linewidth=2, color='#A23B72')
-        ax2.set_title('Drawdown', fontsize=14, fontweight='bold')
-        ax2.set_xlabel('Date')
-        ax2.set_ylabel('Drawdown (%)')
-        ax2.grid(True, alpha=0.3)
-
-        plt.tight_layout()
-        Path(save_path).parent.mkdir(exist_ok=True)
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
+        from backtest.report_builder import render_equity_curve
+
+        render_equity_curve(self.equity_curve, save_path)
         print(f"Equity curve plot saved to {save_path}")
-        plt.close()
 
     def plot_trade_analysis(self, save_path: str = 'results/trade_analysis.png') -> None:
         """Plot trade distribution and analysis."""
@@ -200,63 +290,10 @@ class PerformanceAnalyzer:
             print("No trade data available.")
             return
 
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-
-        # PnL distribution
-        ax1 = axes[0, 0]
-        self.trades_df['PnL'].hist(bins=50, ax=ax1, color='#2E86AB', alpha=0.7, edgecolor='black')
-        ax1.axvline(x=0, color='red', linestyle='--', linewidth=2)
-        ax1.set_title('PnL Distribution', fontsize=12, fontweight='bold')
-        ax1.set_xlabel('PnL ($)')
-        ax1.set_ylabel('Frequency')
-        ax1.grid(True, alpha=0.3)
-
-        # Cumulative PnL
-        ax2 = axes[0, 1]
-        cumulative_pnl = self.trades_df['PnL'].cumsum()
-        ax2.plot(cumulative_pnl.index, cumulative_pnl.values, linewidth=2, color='#F18F01')
-        ax2.fill_between(cumulative_pnl.index, cumulative_pnl.values, alpha=0.3, color='#F18F01')
-        ax2.set_title('Cumulative PnL', fontsize=12, fontweight='bold')
-        ax2.set_xlabel('Trade Number')
-        ax2.set_ylabel('Cumulative PnL ($)')
-        ax2.grid(True, alpha=0.3)
-        ax2.axhline(y=0, color='red', linestyle='--', alpha=0.5)
-
-        # Win/Loss by hour (if timestamp available)
-        ax3 = axes[1, 0]
-        if 'EntryTime' in self.trades_df.columns:
-            self.trades_df['Hour'] = pd.to_datetime(self.trades_df['EntryTime']).dt.hour
-            hourly_pnl = self.trades_df.groupby('Hour')['PnL'].sum()
-            colors = ['#06A77D' if x > 0 else '#D62246' for x in hourly_pnl.values]
-            hourly_pnl.plot(kind='bar', ax=ax3, color=colors, alpha=0.7)
-            ax3.set_title('PnL by Hour of Day', fontsize=12, fontweight='bold')
-            ax3.set_xlabel('Hour')
-            ax3.set_ylabel('Total PnL ($)')
-            ax3.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-            ax3.grid(True, alpha=0.3, axis='y')
-        else:
-            ax3.text(0.5, 0.5, 'Hour data not available', ha='center', va='center')
-            ax3.set_title('PnL by Hour of Day', fontsize=12, fontweight='bold')
-
-        # Win rate over time (rolling)
-        ax4 = axes[1, 1]
-        self.trades_df['Win'] = self.trades_df['PnL'] > 0
-        rolling_win_rate = self.trades_df['Win'].rolling(window=20, min_periods=1).mean() * 100
-        ax4.plot(rolling_win_rate.index, rolling_win_rate.values, linewidth=2, color='#6A4C93')
-        ax4.fill_between(rolling_win_rate.index, rolling_win_rate.values, alpha=0.3, color='#6A4C93')
-        ax4.axhline(y=50, color='red', linestyle='--', linewidth=2, label='50% Baseline')
-        ax4.set_title('Rolling Win Rate (20 trades)', fontsize=12, fontweight='bold')
-        ax4.set_xlabel('Trade Number')
-        ax4.set_ylabel('Win Rate (%)')
-        ax4.set_ylim([0, 100])
-        ax4.grid(True, alpha=0.3)
-        ax4.legend()
-
-        plt.tight_layout()
-        Path(save_path).parent.mkdir(exist_ok=True)
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
+        from backtest.report_builder import render_trade_analysis
+
+        render_trade_analysis(self.trades_df, save_path)
         print(f"Trade analysis plot saved to {save_path}")
-        plt.close()
 
     def plot_returns_distribution(self, save_path: str = 'results/returns_distribution.png') -> None:
         """Plot returns distribution and statistics."""
@@ -264,39 +301,57 @@ class PerformanceAnalyzer:
             print("No trade data available.")
             return
 
-        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        from backtest.report_builder import render_returns_distribution
 
-        # Returns histogram with normal curve
-        ax1 = axes[0]
-        returns = self.trades_df['ReturnPct'] if 'ReturnPct' in self.trades_df.columns else self.trades_df['PnL']
+        render_returns_distribution(self.trades_df, save_path)
+        print(f"Returns distribution plot saved to {save_path}")
 
-        ax1.hist(returns, bins=50, density=True, alpha=0.7, color='#2E86AB', edgecolor='black')
+    def plot_all(self, output_dir: str = 'results', workers: Optional[int] = None,
+                 force: bool = False) -> pd.DataFrame:
+        """
+        All plots at once, in parallel, skipping those whose inputs are unchanged.
 
-        # Fit normal distribution
-        mu, std = returns.mean(), returns.std()
-        x = np.linspace(returns.min(), returns.max(), 100)
-        ax1.plot(x, 1/(std * np.sqrt(2 * np.pi)) * np.exp(-0.5 * ((x - mu)/std)**2),
-                linewidth=2, color='red', label=f'Normal (μ={mu:.2f}, σ={std:.2f})')
+        Args:
+            output_dir: Directory for the figures (same file names as the plot_* defaults)
+            workers: Worker processes (default: CPU count)
+            force: Redraw even if unchanged since the last call
 
-        ax1.axvline(x=0, color='black', linestyle='--', linewidth=1)
-        ax1.set_title('Returns Distribution', fontsize=12, fontweight='bold')
-        ax1.set_xlabel('Return')
-        ax1.set_ylabel('Density')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
+        Returns:
+            Status per figure ('rendered', 'cached' or 'no data'); see report_builder.py
 
-        # Q-Q plot
-        ax2 = axes[1]
-        from scipy import stats
-        stats.probplot(returns, dist="norm", plot=ax2)
-        ax2.set_title('Q-Q Plot (Normal Distribution)', fontsize=12, fontweight='bold')
-        ax2.grid(True, alpha=0.3)
+        Example:
+            >>> analyzer.plot_all()            # second call with the same trades: all 'cached'
+        """
+        from backtest.report_builder import ReportBuilder
 
-        plt.tight_layout()
-        Path(save_path).parent.mkdir(exist_ok=True)
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
-        print(f"Returns distribution plot saved to {save_path}")
-        plt.close()
+        builder = ReportBuilder(output_dir, workers=workers, force=force)
+        builder.add('', self.trades_df, self.equity_curve)
+        status = builder.build()
+        for row in status.itertuples():
+            print(f"{row.figure:<22} {row.status:<9} {row.path}")
+        return status
+
+    def record_metrics(self, store, strategy: str, params: Optional[Dict[str, Any]] = None,
+                       data_hash: Optional[str] = None, initial_capital: float = 10000) -> int:
+        """
+        Append calculate_metrics() of these trades to a results database.
+
+        Args:
+            store: ResultsStore (see results_store.py)
+            strategy: Strategy name the trades came from
+            params: Strategy parameters
+            data_hash: hash_frame() of the backtest frame, if known
+            initial_capital: Starting capital for returns
+
+        Returns:
+            int: run_id of the stored row
+
+        Example:
+            >>> with ResultsStore('results/results.db') as store:
+            ...     analyzer.record_metrics(store, 'LSTMScalpingStrategy', {'prediction_threshold': 0.001})
+        """
+        return store.record(self.calculate_metrics(initial_capital), strategy, params, source='analyzer',
+                            data_hash=data_hash)
 
     def generate_report(self, save_path: str = 'results/performance_report.json', initial_capital: float = 10000) -> Dict[str, Any]:
         """Generate comprehensive performance report."""
@@ -335,34 +390,37 @@ class PerformanceAnalyzer:
         return metrics
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """
-    Load backtest results and generate complete performance analysis.
+    Load a saved backtest run and generate complete performance analysis.
+
+    Reads the trade log written by the backtest (results/trade_log, see
+    trade_log.py) and produces the metrics report and plots.
 
-    Reads from results/backtest_results.csv and produces visualizations.
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
     """
-    from pathlib import Path
-    import sys
+    import argparse
 
-    results_dir = Path('results')
+    parser = argparse.ArgumentParser(description='Analyze a saved backtest run')
+    parser.add_argument('--run-dir', default='results/trade_log', help='Trade log directory')
+    parser.add_argument('--output-dir', default='results', help='Directory for the report and plots')
+    parser.add_argument('--workers', type=int, default=None, help='Plot rendering processes')
+    args = parser.parse_args(argv)
 
-    # Check if backtest results exist
-    if not (results_dir / 'backtest_results.csv').exists():
-        print("No backtest results found. Run backtest first.")
+    if not (Path(args.run_dir) / 'meta.json').exists():
+        print("No saved backtest run found. Run backtest first.")
         sys.exit(1)
 
-    # Load results
-    results = pd.read_csv(results_dir / 'backtest_results.csv', index_col=0)
-
     print("Generating performance analysis...")
 
-    # Note: This would need to be adapted based on actual backtest output format
-    # For now, this is a template showing how to use the analyzer
-
-    analyzer = PerformanceAnalyzer()
+    analyzer = PerformanceAnalyzer.from_trade_log(args.run_dir)
+    initial_capital = float(analyzer.equity_curve.iloc[0]) if analyzer.equity_curve is not None else 10000
+    analyzer.generate_report(str(Path(args.output_dir) / 'performance_report.json'), initial_capital)
+    analyzer.plot_all(args.output_dir, workers=args.workers)
 
     print("\nPerformance analysis complete!")
-    print("Check the 'results' directory for visualizations.")
+    print(f"Check the '{args.output_dir}' directory for visualizations.")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,154 @@
+"""
+Size-bounded interactive backtest plots.
+
+Backtest.plot() draws every bar, so a year of 1m bars produces a huge HTML
+file that is slow to write and to open. plot_backtest() draws at most
+`max_points` points per series instead:
+
+    - close price and equity are downsampled with Largest-Triangle-Three-Buckets
+      (LTTB), which keeps the peaks, troughs and turns a line chart shows
+    - a high/low band per LTTB bucket keeps the true price range visible
+    - every trade's entry and exit marker is drawn at its exact time and price
+
+It only needs a statistics Series (Backtesting.py or fast engine, cached or
+fresh) and the backtest frame, so it works without a Backtest instance.
+"""
+
+import sys
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtest.jit import compiled
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the n_out points LTTB keeps (first and last always included)."""
+    n = len(x)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[n_out - 1] = n - 1
+    bucket = (n - 2) / (n_out - 2)
+    anchor = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        # Average of the next bucket is the third triangle vertex
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor]) -
+                       (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(np.argmax(areas))
+        selected[i + 1] = anchor
+    return selected
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Downsample a line to at most max_points points with LTTB.
+
+    Args:
+        x: Strictly increasing x values (e.g. int64 ns timestamps)
+        y: Values
+        max_points: Output size (>= 3)
+
+    Returns:
+        np.ndarray: Sorted indices into x/y (all indices if the line is short enough)
+    """
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Without numba, LTTB runs one NumPy step per bucket
+    return (compiled(_lttb) or _lttb)(x, y, max_points)
+
+
+def plot_backtest(stats: pd.Series, data: pd.DataFrame, filename: Union[str, Path] = 'results/backtest_plot.html',
+                  max_points: int = 5000, open_browser: bool = False) -> Path:
+    """
+    Write an interactive equity/price/trades plot with bounded size.
+
+    Args:
+        stats: Backtest statistics with _equity_curve and _trades
+            (Backtesting.py, fast engine or result cache)
+        data: Backtest frame the statistics were computed on (Close, High, Low)
+        filename: Output HTML file
+        max_points: Points per downsampled series; output size and render
+            time depend on this and the number of trades, not on the bar count
+        open_browser: Open the file after writing it
+
+    Returns:
+        Path: The written file
+    """
+    from bokeh.io import output_file, save, show
+    from bokeh.layouts import column
+    from bokeh.models import ColumnDataSource, HoverTool, NumeralTickFormatter
+    from bokeh.plotting import figure
+
+    filename = Path(filename)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+
+    times = pd.DatetimeIndex(data.index).as_unit('ns')
+    x = times.asi8
+    close = data['Close'].to_numpy(dtype=float)
+    equity_curve = stats['_equity_curve']
+    equity = equity_curve['Equity'].to_numpy(dtype=float)
+    equity_times = pd.DatetimeIndex(equity_curve.index).as_unit('ns')
+
+    # Price: LTTB line plus the high/low range of each bucket it stands for
+    price_idx = lttb_indices(x, close, max_points)
+    band_high = np.maximum.reduceat(data['High'].to_numpy(dtype=float), price_idx)
+    band_low = np.minimum.reduceat(data['Low'].to_numpy(dtype=float), price_idx)
+    price_source = ColumnDataSource({'time': times[price_idx], 'close': close[price_idx],
+                                     'high': band_high, 'low': band_low})
+
+    equity_idx = lttb_indices(equity_times.asi8, equity, max_points)
+    equity_source = ColumnDataSource({'time': equity_times[equity_idx], 'equity': equity[equity_idx]})
+
+    trades = stats['_trades']
+    long_trade = trades['Size'].to_numpy() > 0
+    trade_columns = {
+        'entry_time': pd.DatetimeIndex(trades['EntryTime']), 'entry_price': trades['EntryPrice'].to_numpy(),
+        'exit_time': pd.DatetimeIndex(trades['ExitTime']), 'exit_price': trades['ExitPrice'].to_numpy(),
+        'pnl': trades['PnL'].to_numpy(), 'return_pct': trades['ReturnPct'].to_numpy() * 100,
+    }
+    long_source = ColumnDataSource({name: values[long_trade] for name, values in trade_columns.items()})
+    short_source = ColumnDataSource({name: values[~long_trade] for name, values in trade_columns.items()})
+
+    tools = 'xpan,xwheel_zoom,box_zoom,reset,save'
+    equity_fig = figure(height=220, x_axis_type='datetime', tools=tools, output_backend='webgl',
+                        title=f"Equity ({len(equity_idx):,} of {len(equity):,} points)")
+    equity_fig.line('time', 'equity', source=equity_source, color='#2E86AB', line_width=1.5)
+    equity_fig.yaxis.formatter = NumeralTickFormatter(format='$0,0')
+
+    price_fig = figure(height=420, x_axis_type='datetime', tools=tools, output_backend='webgl',
+                       x_range=equity_fig.x_range,
+                       title=f"Price ({len(price_idx):,} of {len(close):,} bars), {len(trades):,} trades")
+    price_fig.varea('time', 'low', 'high', source=price_source, color='#999999', alpha=0.25)
+    price_fig.line('time', 'close', source=price_source, color='#333333', line_width=1)
+    for source, color, entry_marker in ((long_source, '#2CA02C', 'triangle'),
+                                        (short_source, '#D62728', 'inverted_triangle')):
+        entries = price_fig.scatter('entry_time', 'entry_price', source=source, marker=entry_marker,
+                                    size=8, color=color, alpha=0.8)
+        exits = price_fig.scatter('exit_time', 'exit_price', source=source, marker='x',
+                                  size=7, color=color, alpha=0.8)
+        price_fig.segment('entry_time', 'entry_price', 'exit_time', 'exit_price', source=source,
+                          color=color, line_dash='dotted', line_width=1)
+        price_fig.add_tools(HoverTool(renderers=[entries, exits], formatters={'@entry_time': 'datetime'},
+                                      tooltips=[('Entry', '@entry_time{%F %T}'), ('Price', '@entry_price{0,0.00}'),
+                                                ('Exit price', '@exit_price{0,0.00}'), ('PnL', '@pnl{0,0.00}'),
+                                                ('Return', '@return_pct{0.00}%')]))
+
+    output_file(filename, title=filename.stem)
+    layout = column(equity_fig, price_fig, sizing_mode='stretch_width')
+    if open_browser:
+        show(layout)
+    else:
+        save(layout)
+    return filename
@@ -0,0 +1,494 @@
+"""
+Portfolio backtest of LSTMScalpingStrategy across a basket of symbols.
+
+BacktestRunner trades one symbol with exclusive orders. This module runs the
+strategy on many symbols against one shared capital pool and enforces the
+portfolio limits from the `trading` config section:
+
+    - max_open_positions: entries beyond the cap are skipped; when more
+      symbols signal on the same bar than there are free slots, the ones with
+      the strongest predicted move (|Predicted_Change|) are taken
+    - max_daily_loss: once equity falls this far below the day's opening
+      equity (UTC days), open positions are closed at the next open and no
+      new entries are taken until the next day
+    - leverage: each position commits max_position_size of equity as margin
+      and trades margin x leverage of notional; entries never use more than
+      the free margin
+
+Per-symbol work (loading the frame, evaluating compute_signal_masks) runs in
+parallel. The symbols' bars are then merged into one time-ordered event
+stream and replayed in a single loop (JIT-compiled with numba when it is
+installed), so the cost is linear in the total number of bars.
+
+Fills follow the fast engine: orders decided on a bar's close fill at that
+symbol's next open, SL/TP brackets can trigger on the entry bar (SL first),
+commission is charged on entry and exit. Positions are not liquidated
+individually (stops sit well inside the liquidation price); if total equity
+reaches zero everything is closed and the run stops.
+"""
+
+import os
+import sys
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Type, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtest.jit import compiled
+from backtest.fast_engine import (DEFAULT_FRACTIONAL_UNIT, _TRADE_FIELDS, _T_SIZE, _T_ENTRY_BAR, _T_EXIT_BAR,
+                                  _T_ENTRY_PRICE, _T_EXIT_PRICE, _T_SL, _T_TP, _compute_stats,
+                                  _strategy_masks, _trades_frame, strategy_params)
+
+FrameSource = Union[pd.DataFrame, str, Path]
+
+_NS_PER_DAY = 86_400_000_000_000
+
+
+def load_backtest_frame(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Read a prepared backtest frame (BacktestRunner.prepare_data_for_backtest()
+    output saved with to_csv / to_parquet, datetime index).
+    """
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def symbol_signals(data: FrameSource, params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Everything the portfolio loop needs from one symbol, as flat arrays.
+
+    Args:
+        data: Prepared backtest frame or a path to one
+        params: Full strategy parameters (strategy_params())
+
+    Returns:
+        Dictionary of arrays aligned with the symbol's bars: times (int64 ns
+        UTC), open, high, low, close, long, short, exit_long, exit_short,
+        strength (|Predicted_Change|)
+    """
+    if not isinstance(data, pd.DataFrame):
+        data = load_backtest_frame(data)
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    if not index.is_monotonic_increasing:
+        raise ValueError("Backtest frame index must be sorted by time")
+
+    signals = {'times': index.as_unit('ns').asi8.copy()}
+    for column in ('Open', 'High', 'Low', 'Close'):
+        signals[column.lower()] = data[column].to_numpy(dtype=float)
+    signals.update(_strategy_masks(data, params))
+    signals['strength'] = np.abs(data['Predicted_Change'].to_numpy(dtype=float))
+    return signals
+
+
+def generate_signals(sources: Mapping[str, FrameSource], params: Dict[str, Any],
+                     workers: Optional[int] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    symbol_signals() for every symbol, in parallel.
+
+    Paths are loaded in worker processes (parsing holds the GIL); in-memory
+    frames are handled by threads, which share them without copying.
+
+    Returns:
+        {symbol: symbol_signals(...)} in the order of `sources`
+    """
+    workers = workers or os.cpu_count() or 1
+    use_processes = any(not isinstance(source, pd.DataFrame) for source in sources.values())
+    executor_class = ProcessPoolExecutor if use_processes and workers > 1 else ThreadPoolExecutor
+    with executor_class(max_workers=min(workers, max(len(sources), 1))) as pool:
+        futures = {symbol: pool.submit(symbol_signals, source, params) for symbol, source in sources.items()}
+        return {symbol: future.result() for symbol, future in futures.items()}
+
+
+def _record_trade(trades, trade_symbols, n_trades, s, size, entry_bar, exit_bar, entry_price,
+                  exit_price, sl, tp):
+    trades[n_trades, _T_SIZE] = size
+    trades[n_trades, _T_ENTRY_BAR] = entry_bar
+    trades[n_trades, _T_EXIT_BAR] = exit_bar
+    trades[n_trades, _T_ENTRY_PRICE] = entry_price
+    trades[n_trades, _T_EXIT_PRICE] = exit_price
+    trades[n_trades, _T_SL] = sl
+    trades[n_trades, _T_TP] = tp
+    trade_symbols[n_trades] = s
+    return n_trades + 1
+
+
+def _simulate_portfolio(order, bounds, days, row_symbol, first_row, last_row, first_close,
+                        open_, high, low, close, long_entry, short_entry, exit_long, exit_short, strength,
+                        stop_loss_pct, take_profit_pct, position_size, leverage, cash, commission, unit,
+                        max_open_positions, max_daily_loss, equity, basket, trades, trade_symbols, counters):
+    """
+    Time-ordered replay of all symbols' bars on one capital pool.
+
+    Rows are the symbols' bars concatenated; `order` sorts them by time and
+    rows order[bounds[g]:bounds[g + 1]] share timestamp g. Fills `equity` and
+    `basket` (equal-weight buy & hold index) per timestamp, `trades` /
+    `trade_symbols` per closed trade and `counters` (max open positions,
+    entries skipped by the cap, days halted by the loss breaker); returns the
+    number of closed trades.
+    """
+    n_symbols = len(first_close)
+    n_times = len(bounds) - 1
+    n_trades = 0
+
+    size = np.zeros(n_symbols)
+    entry_price = np.zeros(n_symbols)
+    entry_bar = np.zeros(n_symbols, dtype=np.int64)
+    sl = np.zeros(n_symbols)
+    tp = np.zeros(n_symbols)
+    pending = np.zeros(n_symbols, dtype=np.int64)   # 1 buy, -1 sell, 2 close
+    pending_sl = np.zeros(n_symbols)
+    pending_tp = np.zeros(n_symbols)
+    last_close = first_close.copy()
+    candidates = np.zeros(n_symbols, dtype=np.int64)
+    candidate_rows = np.zeros(n_symbols, dtype=np.int64)
+    candidate_strength = np.zeros(n_symbols)
+
+    used_margin = 0.0
+    day = days[0]
+    day_start_equity = cash
+    halted = False
+    prev_equity = cash
+
+    for g in range(n_times):
+        if days[g] != day:
+            day = days[g]
+            day_start_equity = prev_equity
+            halted = False
+
+        # --- Broker: fill orders queued on each symbol's previous bar ---
+        for k in range(bounds[g], bounds[g + 1]):
+            r = order[k]
+            s = row_symbol[r]
+            o = open_[r]
+            exit_price = 0.0
+            closed = False
+
+            if pending[s] == 2:
+                exit_price = o
+                closed = True
+            elif pending[s] != 0:
+                current_equity = cash
+                for j in range(n_symbols):
+                    if size[j] != 0.0:
+                        current_equity += size[j] * (last_close[j] - entry_price[j])
+                margin = min(current_equity * position_size, current_equity - used_margin)
+                units = np.floor(margin * leverage / (o * (1 + commission)) / unit) * unit
+                if units > 0:
+                    size[s] = units if pending[s] == 1 else -units
+                    entry_price[s] = o
+                    entry_bar[s] = g
+                    sl[s] = pending_sl[s]
+                    tp[s] = pending_tp[s]
+                    cash -= units * o * commission
+                    used_margin += units * o / leverage
+            pending[s] = 0
+
+            if size[s] != 0.0 and not closed:
+                if size[s] > 0:
+                    if low[r] <= sl[s]:
+                        exit_price = min(o, sl[s])
+                        closed = True
+                    elif high[r] >= tp[s]:
+                        exit_price = max(o, tp[s])
+                        closed = True
+                else:
+                    if high[r] >= sl[s]:
+                        exit_price = max(o, sl[s])
+                        closed = True
+                    elif low[r] <= tp[s]:
+                        exit_price = min(o, tp[s])
+                        closed = True
+
+            # A symbol whose data ends before the portfolio's does not keep its slot
+            if size[s] != 0.0 and not closed and r == last_row[s] and g < n_times - 1:
+                exit_price = close[r]
+                closed = True
+
+            if closed:
+                cash += size[s] * (exit_price - entry_price[s]) - abs(size[s]) * exit_price * commission
+                used_margin -= abs(size[s]) * entry_price[s] / leverage
+                n_trades = _record_trade(trades, trade_symbols, n_trades, s, size[s], entry_bar[s], g,
+                                         entry_price[s], exit_price, sl[s], tp[s])
+                size[s] = 0.0
+
+            last_close[s] = close[r]
+
+        # --- Mark to market ---
+        n_open = 0
+        current_equity = cash
+        relative = 0.0
+        for j in range(n_symbols):
+            relative += last_close[j] / first_close[j]
+            if size[j] != 0.0:
+                current_equity += size[j] * (last_close[j] - entry_price[j])
+                n_open += 1
+        if n_open == 0:
+            used_margin = 0.0
+        equity[g] = current_equity
+        basket[g] = relative / n_symbols
+        prev_equity = current_equity
+        counters[0] = max(counters[0], n_open)
+
+        if current_equity <= 0:
+            # Out of money: liquidate everything at the last close and stop
+            for j in range(n_symbols):
+                if size[j] != 0.0:
+                    n_trades = _record_trade(trades, trade_symbols, n_trades, j, size[j], entry_bar[j], g,
+                                             entry_price[j], last_close[j], sl[j], tp[j])
+            for h in range(g, n_times):
+                equity[h] = 0.0
+                basket[h] = basket[g]
+            return n_trades
+
+        # --- Daily loss breaker ---
+        if not halted and max_daily_loss > 0 and current_equity < day_start_equity * (1 - max_daily_loss):
+            halted = True
+            counters[2] += 1
+            for j in range(n_symbols):
+                pending[j] = 2 if size[j] != 0.0 else 0
+
+        # --- Strategy: decide on this bar's close ---
+        n_candidates = 0
+        for k in range(bounds[g], bounds[g + 1]):
+            r = order[k]
+            s = row_symbol[r]
+            if r == first_row[s]:
+                continue  # Like LSTMScalpingStrategy.next(), no decision on the first bar
+            if size[s] > 0:
+                if exit_long[r]:
+                    pending[s] = 2
+            elif size[s] < 0:
+                if exit_short[r]:
+                    pending[s] = 2
+            elif pending[s] == 0 and not halted and r != last_row[s] and (long_entry[r] or short_entry[r]):
+                candidates[n_candidates] = s
+                candidate_rows[n_candidates] = r
+                candidate_strength[n_candidates] = strength[r]
+                n_candidates += 1
+
+        if n_candidates:
+            slots = max_open_positions
+            for j in range(n_symbols):
+                if (size[j] != 0.0 and pending[j] != 2) or pending[j] == 1 or pending[j] == -1:
+                    slots -= 1
+            ranked = np.argsort(-candidate_strength[:n_candidates], kind='mergesort')
+            for m in range(n_candidates):
+                if m >= slots:
+                    counters[1] += n_candidates - m
+                    break
+                s = candidates[ranked[m]]
+                c = close[candidate_rows[ranked[m]]]
+                if long_entry[candidate_rows[ranked[m]]]:
+                    pending[s] = 1
+                    pending_sl[s] = c * (1 - stop_loss_pct)
+                    pending_tp[s] = c * (1 + take_profit_pct)
+                else:
+                    pending[s] = -1
+                    pending_sl[s] = c * (1 + stop_loss_pct)
+                    pending_tp[s] = c * (1 - take_profit_pct)
+
+    return n_trades
+
+
+def _portfolio_kernel():
+    """Compiled _simulate_portfolio (numba is imported on first use), or the Python version."""
+    global _record_trade
+    simulate = compiled(_simulate_portfolio)
+    if simulate is None:
+        return _simulate_portfolio
+    # The kernel calls _record_trade, which numba resolves as a global when compiling
+    _record_trade = compiled(_record_trade)
+    return simulate
+
+
+def run_portfolio_backtest(sources: Mapping[str, FrameSource],
+                           strategy_class: Optional[Type] = None,
+                           cash: float = 10000,
+                           commission: float = 0.0004,
+                           leverage: float = 1.0,
+                           max_open_positions: int = 3,
+                           max_daily_loss: Optional[float] = None,
+                           position_size: Optional[float] = None,
+                           fractional_unit: Optional[float] = DEFAULT_FRACTIONAL_UNIT,
+                           workers: Optional[int] = None,
+                           **params) -> pd.Series:
+    """
+    Backtest the strategy on several symbols sharing one capital pool.
+
+    Args:
+        sources: {symbol: prepared backtest frame or path to one}
+        strategy_class: LSTMScalpingStrategy or a subclass that only changes
+            parameters (None = LSTMScalpingStrategy)
+        cash: Initial capital of the whole portfolio
+        commission: Relative commission per fill
+        leverage: Notional per unit of margin
+        max_open_positions: Maximum concurrent positions across all symbols
+        max_daily_loss: Daily loss breaker as a fraction of the day's opening
+            equity (None = no breaker)
+        position_size: Margin per position as a fraction of equity
+            (default: the strategy's position_size / max_open_positions)
+        fractional_unit: Smallest tradable quantity (None = whole units)
+        workers: Parallel workers for per-symbol signal generation
+        **params: Strategy parameter overrides
+
+    Returns:
+        pd.Series of Backtesting.py-style statistics for the portfolio equity
+        (buy & hold = equal-weight basket), plus 'Max. Open Positions',
+        'Skipped Entries' (position cap), 'Halted Days' (loss breaker),
+        '_trades' (with a Symbol column) and '_equity_curve'
+
+    Example:
+        >>> stats = run_portfolio_backtest({'BTC': btc_data, 'ETH': eth_data, 'SOL': 'data/portfolio/SOL.csv'},
+        ...                                leverage=5, max_open_positions=3, max_daily_loss=0.05)
+        >>> print(symbol_breakdown(stats))
+    """
+    if not sources:
+        raise ValueError("No symbols to backtest")
+    params = strategy_params(strategy_class, **params)
+    position_size = position_size or params['position_size'] / max_open_positions
+
+    signals = generate_signals(sources, params, workers)
+    symbols = list(signals)
+
+    def _concat(key):
+        return np.concatenate([signals[symbol][key] for symbol in symbols])
+
+    times = _concat('times')
+    lengths = np.array([len(signals[symbol]['times']) for symbol in symbols])
+    if np.any(lengths == 0):
+        raise ValueError(f"Empty backtest frames: {[s for s, n in zip(symbols, lengths) if n == 0]}")
+    row_symbol = np.repeat(np.arange(len(symbols)), lengths)
+    last_row = np.cumsum(lengths) - 1
+    first_row = last_row - lengths + 1
+    first_close = np.array([signals[symbol]['close'][0] for symbol in symbols])
+
+    # Merge: stable sort keeps symbol order within a timestamp
+    order = np.argsort(times, kind='stable')
+    sorted_times = times[order]
+    bounds = np.r_[0, np.flatnonzero(np.diff(sorted_times)) + 1, len(times)]
+    union_times = sorted_times[bounds[:-1]]
+    n_times = len(union_times)
+
+    arrays = {key: _concat(key) for key in ('open', 'high', 'low', 'close', 'long', 'short',
+                                             'exit_long', 'exit_short', 'strength')}
+    del signals
+
+    equity = np.empty(n_times)
+    basket = np.empty(n_times)
+    trades = np.empty((int(arrays['long'].sum() + arrays['short'].sum()) + 1, _TRADE_FIELDS))
+    trade_symbols = np.zeros(len(trades), dtype=np.int64)
+    counters = np.zeros(3, dtype=np.int64)
+    args = (order, bounds, union_times // _NS_PER_DAY, row_symbol, first_row, last_row, first_close,
+            arrays['open'], arrays['high'], arrays['low'], arrays['close'], arrays['long'], arrays['short'],
+            arrays['exit_long'], arrays['exit_short'], arrays['strength'],
+            float(params['stop_loss_pct']), float(params['take_profit_pct']), float(position_size),
+            float(leverage), float(cash), float(commission), float(fractional_unit or 1.0),
+            int(max_open_positions), float(max_daily_loss or 0.0), equity, basket, trades, trade_symbols, counters)
+
+    n_trades = _portfolio_kernel()(*args)
+
+    index = pd.DatetimeIndex(union_times)
+    first_index = next(iter(sources.values()))
+    if isinstance(first_index, pd.DataFrame) and getattr(first_index.index, 'tz', None) is not None:
+        index = index.tz_localize('UTC').tz_convert(first_index.index.tz)
+
+    trades_df = _trades_frame(trades[:n_trades], index, commission, 1.0)
+    trades_df.insert(0, 'Symbol', np.array(symbols, dtype=object)[trade_symbols[:n_trades]])
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        stats = _compute_stats(trades_df, equity, pd.DataFrame({'Close': basket}, index=index))
+
+    public = stats[[key for key in stats.index if not key.startswith('_')]]
+    portfolio = pd.Series({
+        '# Symbols': len(symbols),
+        'Max. Open Positions': int(counters[0]),
+        'Skipped Entries': int(counters[1]),
+        'Halted Days': int(counters[2]),
+    }, dtype=object)
+    return pd.concat([public, portfolio, stats[[key for key in stats.index if key.startswith('_')]]])
+
+
+def symbol_breakdown(stats: pd.Series) -> pd.DataFrame:
+    """Per-symbol trade count, total PnL, win rate and average return of a portfolio run."""
+    trades = stats['_trades']
+    grouped = trades.groupby('Symbol', sort=True)
+    return pd.DataFrame({
+        'Trades': grouped.size(),
+        'PnL [$]': grouped['PnL'].sum(),
+        'Win Rate [%]': grouped['PnL'].apply(lambda pnl: (pnl > 0).mean() * 100),
+        'Avg. Trade [%]': grouped['ReturnPct'].mean() * 100,
+    }).sort_values('PnL [$]', ascending=False)
+
+
+def main():
+    """Backtest every prepared frame in portfolio.data_dir as one portfolio."""
+    with open('config/config.yaml') as f:
+        config = yaml.safe_load(f)
+    portfolio_config = config.get('portfolio', {})
+    trading = config['trading']
+
+    parser = argparse.ArgumentParser(description='Multi-symbol portfolio backtest')
+    parser.add_argument('--data-dir', default=portfolio_config.get('data_dir', 'data/portfolio'),
+                        help='Directory of <SYMBOL>.csv / .parquet backtest frames')
+    parser.add_argument('--symbols', nargs='*', default=portfolio_config.get('symbols') or None,
+                        help='Symbols to trade (default: every frame in --data-dir)')
+    parser.add_argument('--workers', type=int, default=portfolio_config.get('workers'),
+                        help='Parallel workers for signal generation (default: CPU count)')
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    files = {path.stem: path for path in sorted(data_dir.glob('*.csv')) + sorted(data_dir.glob('*.parquet'))}
+    if args.symbols:
+        missing = sorted(set(args.symbols) - set(files))
+        if missing:
+            print(f"No backtest frame for {missing} in {data_dir}")
+            sys.exit(1)
+        files = {symbol: files[symbol] for symbol in args.symbols}
+    if not files:
+        print(f"No backtest frames in {data_dir}. Save BacktestRunner.prepare_data_for_backtest() "
+              f"output per symbol as {data_dir}/<SYMBOL>.csv")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"PORTFOLIO BACKTEST: {len(files)} symbols")
+    print(f"Max open positions: {trading['max_open_positions']}, leverage: {trading['leverage']}x, "
+          f"max daily loss: {trading['max_daily_loss']:.1%}")
+    print("=" * 60)
+
+    stats = run_portfolio_backtest(
+        files,
+        cash=trading['initial_capital'],
+        commission=config['backtesting']['commission'],
+        leverage=trading['leverage'],
+        max_open_positions=trading['max_open_positions'],
+        max_daily_loss=trading['max_daily_loss'],
+        position_size=trading['max_position_size'],
+        workers=args.workers,
+    )
+
+    print(stats[[key for key in stats.index if not key.startswith('_')]].to_string())
+    breakdown = symbol_breakdown(stats)
+    print("\nPer-symbol breakdown:")
+    print(breakdown.to_string())
+
+    results_dir = Path('results')
+    results_dir.mkdir(exist_ok=True)
+    stats[[key for key in stats.index if not key.startswith('_')]].to_csv(results_dir / 'portfolio_results.csv')
+    stats['_trades'].to_csv(results_dir / 'portfolio_trades.csv', index=False)
+    breakdown.to_csv(results_dir / 'portfolio_symbols.csv')
+    print(f"\nResults saved to {results_dir}/portfolio_*.csv")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+"""
+Parallel, incremental rendering of performance report figures.
+
+PerformanceAnalyzer's plot_* methods draw one matplotlib figure after
+another in the calling process. ReportBuilder renders the figures of many
+strategies (e.g. a 50-run sweep) at once:
+
+    - each figure is one task in a process pool, so a report scales with cores
+    - a figure is keyed by a hash of the inputs it draws (only the columns
+      it uses), the renderer version and the dpi; figures whose key matches
+      the manifest of the previous build are not redrawn
+    - matplotlib (and scipy, for the Q-Q plot) is imported inside the
+      renderers, so importing this module or skipping every figure costs nothing
+
+    >>> builder = ReportBuilder('results/reports', workers=8)
+    >>> for name, stats in sweep.items():
+    ...     builder.add(name, stats['_trades'], stats['_equity_curve']['Equity'])
+    >>> status = builder.build()      # one row per figure: rendered / cached / no data
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Bump when a renderer's output changes, so cached figures are redrawn
+RENDERER_VERSION = 1
+
+MANIFEST_NAME = '.report_manifest.json'
+
+
+def _returns(trades: pd.DataFrame) -> pd.Series:
+    return trades['ReturnPct'] if 'ReturnPct' in trades.columns else trades['PnL']
+
+
+def render_equity_curve(equity: pd.Series, save_path: str, dpi: int = 150) -> None:
+    """Equity curve and drawdown chart."""
+    import matplotlib.pyplot as plt
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+
+    # Equity curve
+    ax1.plot(equity.index, equity.values, linewidth=2, color='#2E86AB')
+    ax1.fill_between(equity.index, equity.values, alpha=0.3, color='#2E86AB')
+    ax1.set_title('Equity Curve', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Equity ($)')
+    ax1.grid(True, alpha=0.3)
+    ax1.axhline(y=equity.iloc[0], color='red', linestyle='--', alpha=0.5, label='Initial Capital')
+    ax1.legend()
+
+    # Drawdown
+    running_max = equity.expanding().max()
+    drawdown = (equity - running_max) / running_max * 100
+
+    ax2.fill_between(drawdown.index, drawdown.values, 0, alpha=0.3, color='#A23B72')
+    ax2.plot(drawdown.index, drawdown.values, linewidth=2, color='#A23B72')
+    ax2.set_title('Drawdown', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Date')
+    ax2.set_ylabel('Drawdown (%)')
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    plt.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+def render_trade_analysis(trades: pd.DataFrame, save_path: str, dpi: int = 150) -> None:
+    """PnL distribution, cumulative PnL, PnL by hour and rolling win rate."""
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+
+    # PnL distribution
+    ax1 = axes[0, 0]
+    trades['PnL'].hist(bins=50, ax=ax1, color='#2E86AB', alpha=0.7, edgecolor='black')
+    ax1.axvline(x=0, color='red', linestyle='--', linewidth=2)
+    ax1.set_title('PnL Distribution', fontsize=12, fontweight='bold')
+    ax1.set_xlabel('PnL ($)')
+    ax1.set_ylabel('Frequency')
+    ax1.grid(True, alpha=0.3)
+
+    # Cumulative PnL
+    ax2 = axes[0, 1]
+    cumulative_pnl = trades['PnL'].cumsum()
+    ax2.plot(cumulative_pnl.index, cumulative_pnl.values, linewidth=2, color='#F18F01')
+    ax2.fill_between(cumulative_pnl.index, cumulative_pnl.values, alpha=0.3, color='#F18F01')
+    ax2.set_title('Cumulative PnL', fontsize=12, fontweight='bold')
+    ax2.set_xlabel('Trade Number')
+    ax2.set_ylabel('Cumulative PnL ($)')
+    ax2.grid(True, alpha=0.3)
+    ax2.axhline(y=0, color='red', linestyle='--', alpha=0.5)
+
+    # Win/Loss by hour (if timestamp available)
+    ax3 = axes[1, 0]
+    if 'EntryTime' in trades.columns:
+        hourly_pnl = trades['PnL'].groupby(pd.to_datetime(trades['EntryTime']).dt.hour.rename('Hour')).sum()
+        colors = ['#06A77D' if x > 0 else '#D62246' for x in hourly_pnl.values]
+        hourly_pnl.plot(kind='bar', ax=ax3, color=colors, alpha=0.7)
+        ax3.set_title('PnL by Hour of Day', fontsize=12, fontweight='bold')
+        ax3.set_xlabel('Hour')
+        ax3.set_ylabel('Total PnL ($)')
+        ax3.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+        ax3.grid(True, alpha=0.3, axis='y')
+    else:
+        ax3.text(0.5, 0.5, 'Hour data not available', ha='center', va='center')
+        ax3.set_title('PnL by Hour of Day', fontsize=12, fontweight='bold')
+
+    # Win rate over time (rolling)
+    ax4 = axes[1, 1]
+    rolling_win_rate = (trades['PnL'] > 0).rolling(window=20, min_periods=1).mean() * 100
+    ax4.plot(rolling_win_rate.index, rolling_win_rate.values, linewidth=2, color='#6A4C93')
+    ax4.fill_between(rolling_win_rate.index, rolling_win_rate.values, alpha=0.3, color='#6A4C93')
+    ax4.axhline(y=50, color='red', linestyle='--', linewidth=2, label='50% Baseline')
+    ax4.set_title('Rolling Win Rate (20 trades)', fontsize=12, fontweight='bold')
+    ax4.set_xlabel('Trade Number')
+    ax4.set_ylabel('Win Rate (%)')
+    ax4.set_ylim([0, 100])
+    ax4.grid(True, alpha=0.3)
+    ax4.legend()
+
+    plt.tight_layout()
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    plt.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+def render_returns_distribution(trades: pd.DataFrame, save_path: str, dpi: int = 150) -> None:
+    """Returns histogram with a fitted normal curve, and a normal Q-Q plot."""
+    import matplotlib.pyplot as plt
+    from scipy import stats
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Returns histogram with normal curve
+    ax1 = axes[0]
+    returns = _returns(trades)
+
+    ax1.hist(returns, bins=50, density=True, alpha=0.7, color='#2E86AB', edgecolor='black')
+
+    # Fit normal distribution
+    mu, std = returns.mean(), returns.std()
+    x = np.linspace(returns.min(), returns.max(), 100)
+    ax1.plot(x, 1/(std * np.sqrt(2 * np.pi)) * np.exp(-0.5 * ((x - mu)/std)**2),
+             linewidth=2, color='red', label=f'Normal (μ={mu:.2f}, σ={std:.2f})')
+
+    ax1.axvline(x=0, color='black', linestyle='--', linewidth=1)
+    ax1.set_title('Returns Distribution', fontsize=12, fontweight='bold')
+    ax1.set_xlabel('Return')
+    ax1.set_ylabel('Density')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # Q-Q plot
+    ax2 = axes[1]
+    stats.probplot(returns, dist="norm", plot=ax2)
+    ax2.set_title('Q-Q Plot (Normal Distribution)', fontsize=12, fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    plt.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+# name -> (renderer, input it draws: 'equity' or 'trades', trade columns it reads)
+FIGURES: Dict[str, tuple] = {
+    'equity_curve': (render_equity_curve, 'equity', ()),
+    'trade_analysis': (render_trade_analysis, 'trades', ('PnL', 'EntryTime')),
+    'returns_distribution': (render_returns_distribution, 'trades', ('ReturnPct', 'PnL')),
+}
+
+
+def _figure_input(figure: str, trades: Optional[pd.DataFrame], equity: Optional[pd.Series]) -> Any:
+    """The data `figure` draws (trades reduced to the columns it reads), or None if missing."""
+    _, source, columns = FIGURES[figure]
+    if source == 'equity':
+        return equity if equity is not None and len(equity) else None
+    if trades is None or len(trades) == 0:
+        return None
+    if figure == 'returns_distribution':
+        columns = ['ReturnPct'] if 'ReturnPct' in trades.columns else ['PnL']
+    return trades[[column for column in columns if column in trades.columns]]
+
+
+def figure_key(figure: str, data: Any, dpi: int) -> str:
+    """Hash of everything that determines a figure's image."""
+    from backtest.result_cache import hash_frame
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    material = json.dumps([figure, RENDERER_VERSION, dpi, hash_frame(frame)])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _init_worker() -> None:
+    """Draw off-screen in pool workers."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(figure: str, data: Any, save_path: str, dpi: int) -> str:
+    FIGURES[figure][0](data, save_path, dpi)
+    return save_path
+
+
+class ReportBuilder:
+    """Renders report figures of many strategies in parallel, skipping unchanged ones."""
+
+    def __init__(self, output_dir: str = 'results/reports', figures: Optional[Sequence[str]] = None,
+                 dpi: int = 150, workers: Optional[int] = None, force: bool = False) -> None:
+        """
+        Args:
+            output_dir: Figures go to output_dir/<name>/<figure>.png (output_dir/<figure>.png
+                for an empty name); the manifest of rendered keys is kept here too
+            figures: Figures to draw per strategy (default: all of FIGURES)
+            dpi: Image resolution
+            workers: Worker processes (default: CPU count; 1 = render in this process)
+            force: Redraw every figure even if its inputs are unchanged
+        """
+        unknown = set(figures or ()) - set(FIGURES)
+        if unknown:
+            raise ValueError(f"Unknown figures: {sorted(unknown)} (available: {list(FIGURES)})")
+        self.output_dir = Path(output_dir)
+        self.figures = list(figures or FIGURES)
+        self.dpi = dpi
+        self.workers = workers or os.cpu_count() or 1
+        self.force = force
+        self._tasks: List[Dict[str, Any]] = []
+
+    def add(self, name: str, trades: Optional[pd.DataFrame] = None,
+            equity: Optional[pd.Series] = None) -> None:
+        """
+        Queue the figures of one strategy.
+
+        Args:
+            name: Strategy name (subdirectory of output_dir; '' = output_dir itself)
+            trades: Trades DataFrame (PnL, optional EntryTime and ReturnPct)
+            equity: Equity curve
+        """
+        for figure in self.figures:
+            path = self.output_dir / name / f'{figure}.png'
+            self._tasks.append({'name': name, 'figure': figure, 'path': path,
+                                'data': _figure_input(figure, trades, equity)})
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            return json.loads((self.output_dir / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.output_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.output_dir / MANIFEST_NAME)
+
+    def build(self) -> pd.DataFrame:
+        """
+        Render every queued figure whose inputs changed since the last build.
+
+        Returns:
+            DataFrame with name, figure, path and status ('rendered', 'cached'
+            or 'no data') per queued figure
+        """
+        manifest = self._load_manifest()
+        pending = []
+        for task in self._tasks:
+            if task['data'] is None:
+                task['status'] = 'no data'
+                continue
+            task['key'] = figure_key(task['figure'], task['data'], self.dpi)
+            relative = task['path'].relative_to(self.output_dir).as_posix()
+            if not self.force and manifest.get(relative) == task['key'] and task['path'].exists():
+                task['status'] = 'cached'
+            else:
+                pending.append(task)
+
+        try:
+            self._render_all(pending, manifest)
+        finally:
+            self._save_manifest(manifest)
+
+        status = pd.DataFrame([{key: task[key] for key in ('name', 'figure', 'path', 'status')}
+                               for task in self._tasks], columns=['name', 'figure', 'path', 'status'])
+        self._tasks = []
+        return status
+
+    def _render_all(self, pending: List[Dict[str, Any]], manifest: Dict[str, str]) -> None:
+        """Render pending figures, recording each finished one in the manifest."""
+        def done(task: Dict[str, Any]) -> None:
+            task['status'] = 'rendered'
+            task['data'] = None
+            manifest[task['path'].relative_to(self.output_dir).as_posix()] = task['key']
+
+        workers = min(self.workers, len(pending))
+        if workers <= 1:
+            for task in pending:
+                _render(task['figure'], task['data'], str(task['path']), self.dpi)
+                done(task)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [(task, pool.submit(_render, task['figure'], task['data'], str(task['path']), self.dpi))
+                       for task in pending]
+            for task, future in futures:
+                future.result()
+                done(task)
+
+
+def build_reports(runs: Dict[str, Any], output_dir: str = 'results/reports',
+                  figures: Optional[Sequence[str]] = None, dpi: int = 150,
+                  workers: Optional[int] = None, force: bool = False) -> pd.DataFrame:
+    """
+    Figures for several backtest runs.
+
+    Args:
+        runs: {name: statistics Series/dict with _trades and _equity_curve}
+        output_dir, figures, dpi, workers, force: See ReportBuilder
+
+    Returns:
+        ReportBuilder.build() status table
+    """
+    builder = ReportBuilder(output_dir, figures, dpi, workers, force)
+    for name, stats in runs.items():
+        equity = stats.get('_equity_curve')
+        if isinstance(equity, pd.DataFrame):
+            equity = equity['Equity']
+        builder.add(name, stats.get('_trades'), equity)
+    return builder.build()
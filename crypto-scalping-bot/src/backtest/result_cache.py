@@ -0,0 +1,270 @@
+"""
+Content-addressed cache of backtest results.
+
+A result is keyed by a SHA-256 of everything that determines it:
+    - the backtest frame (index, column names, values)
+    - the strategy class (name and source of its modules, plus strategies/signals.py
+      with the entry/exit rules both engines use) and its parameters
+    - cash, commission, fractional unit
+    - the engine and its version (the source of fast_engine.py, or backtesting.__version__)
+
+so a hit is always safe to reuse and changing any input is a miss. Entries
+are single .npz files: statistics as JSON, _trades and _equity_curve as one
+typed binary array per column (no pickles, no text parsing), so a hit loads
+in milliseconds.
+
+Summary entries (statistics only, no trades/equity) are keyed separately and
+used by the optimizer, which revisits the same parameter points across runs.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import inspect
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Type
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import strategies.signals
+from backtest import fast_engine
+
+# Bump when the on-disk layout changes
+CACHE_FORMAT_VERSION = 1
+
+_FRAMES = ('_trades', '_equity_curve')
+
+
+def hash_frame(data: pd.DataFrame) -> str:
+    """SHA-256 of a DataFrame's index, column names, dtypes and values."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes)),
+                              str(data.index.dtype)]).encode())
+    index = data.index
+    if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+        digest.update(str(index.tz).encode())
+        index = index.tz_localize(None)
+    digest.update(np.ascontiguousarray(index.to_numpy()).view(np.uint8) if index.dtype.kind in 'iuMmf'
+                  else pd.util.hash_pandas_object(index.to_series(), index=False).to_numpy().view(np.uint8))
+    for column in data.columns:
+        values = data[column].to_numpy()
+        if values.dtype.kind not in 'biufMm':
+            values = pd.util.hash_pandas_object(data[column], index=False).to_numpy()
+        digest.update(np.ascontiguousarray(values).view(np.uint8))
+    return digest.hexdigest()
+
+
+def _source_digest(module: Any) -> str:
+    """SHA-256 of a module's source file."""
+    return hashlib.sha256(Path(inspect.getsourcefile(module)).read_bytes()).hexdigest()
+
+
+def _strategy_fingerprint(strategy_class: Type) -> Dict[str, Any]:
+    """
+    Class name, parameter attributes and a hash of the source of every project
+    class in its MRO and of strategies/signals.py (the entry/exit rules).
+    """
+    source = hashlib.sha256()
+    source.update(_source_digest(strategies.signals).encode())
+    params = {}
+    for cls in reversed(strategy_class.__mro__):
+        if cls is object or cls.__module__.split('.')[0] == 'backtesting':
+            continue
+        try:
+            source.update(Path(inspect.getsourcefile(cls)).read_bytes())
+        except (OSError, TypeError):
+            source.update(cls.__qualname__.encode())
+        params.update({name: value for name, value in vars(cls).items()
+                       if not name.startswith('_') and isinstance(value, (int, float, str, bool, type(None)))})
+    return {'class': f'{strategy_class.__module__}.{strategy_class.__qualname__}',
+            'source': source.hexdigest(), 'params': params}
+
+
+def _engine_version(engine: str) -> str:
+    if engine == 'fast':
+        # The simulation's source, so editing the engine cannot serve results of the old one
+        return f'fast-{fast_engine.ENGINE_VERSION}-{_source_digest(fast_engine)}'
+    import backtesting
+    return f"backtesting-{getattr(backtesting, '__version__', 'unknown')}"
+
+
+def result_key(data_digest: str, strategy_class: Type, params: Optional[Dict[str, Any]] = None,
+               cash: float = 10000, commission: float = 0.0004, engine: str = 'fast',
+               fractional_unit: Optional[float] = None, n_bars: Optional[int] = None,
+               summary: bool = False, extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Cache key of one backtest.
+
+    Args:
+        data_digest: hash_frame() of the full backtest frame
+        strategy_class: Strategy class
+        params: Parameter overrides passed to the run
+        n_bars: Only the first n_bars of the frame were used (successive halving)
+        summary: Key of a statistics-only entry
+        extra: Other inputs that change the result (e.g. intrabar store fingerprint)
+    """
+    fingerprint = _strategy_fingerprint(strategy_class)
+    fingerprint['params'].update(params or {})
+    material = {
+        'format': CACHE_FORMAT_VERSION,
+        'data': data_digest,
+        'n_bars': n_bars,
+        'strategy': fingerprint,
+        'cash': float(cash),
+        'commission': float(commission),
+        'fractional_unit': fractional_unit,
+        'engine': _engine_version(engine),
+        'summary': summary,
+    }
+    if extra:
+        material['extra'] = extra
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON-safe tagged form of a statistics value."""
+    if isinstance(value, pd.Timestamp):
+        return {'timestamp': value.isoformat()}
+    if isinstance(value, pd.Timedelta):
+        return {'timedelta': None if pd.isna(value) else int(value.value)}
+    if value is pd.NaT:
+        return {'nat': True}
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, (int, float, str, bool, type(None))):
+        return value
+    return {'repr': repr(value)}
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if 'timestamp' in value:
+            return pd.Timestamp(value['timestamp'])
+        if 'timedelta' in value:
+            return pd.NaT if value['timedelta'] is None else pd.Timedelta(value['timedelta'], unit='ns')
+        if 'nat' in value:
+            return pd.NaT
+        return value['repr']
+    return value
+
+
+def _encode_array(values: np.ndarray):
+    """(array, dtype note) with tz-aware datetimes as naive UTC and objects as JSON."""
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return np.asarray(values.tz_convert('UTC').tz_localize(None)), {'tz': str(values.dtype.tz)}
+    values = np.asarray(values)
+    if values.dtype.kind == 'O':
+        return None, {'json': [_encode_value(v) for v in values]}
+    return values, {}
+
+
+def _decode_array(values: Optional[np.ndarray], note: Dict[str, Any]):
+    if 'json' in note:
+        return np.array([_decode_value(v) for v in note['json']], dtype=object)
+    if 'tz' in note:
+        return pd.DatetimeIndex(values).tz_localize('UTC').tz_convert(note['tz'])
+    return values
+
+
+class ResultCache:
+    """
+    Backtest results on disk, keyed by content.
+
+    Example:
+        >>> cache = ResultCache('results/cache')
+        >>> key = result_key(cache.data_digest(bt_data), LSTMScalpingStrategy)
+        >>> stats = cache.get(key)
+        >>> if stats is None:
+        ...     stats = run_fast_backtest(bt_data)
+        ...     cache.put(key, stats)
+    """
+
+    def __init__(self, cache_dir: str = 'results/cache') -> None:
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def data_digest(self, data: pd.DataFrame) -> str:
+        """
+        hash_frame(data), computed from the frame's current contents.
+
+        Not memoized by object: a frame edited in place must get a new key,
+        not the cached result of what it held before.
+        """
+        return hash_frame(data)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f'{key}.npz'
+
+    def get(self, key: str) -> Optional[pd.Series]:
+        """Cached statistics Series (with _trades/_equity_curve unless a summary entry), or None."""
+        path = self._path(key)
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        with np.load(path, allow_pickle=False) as entry:
+            meta = json.loads(str(entry['meta']))
+            stats = {name: _decode_value(value) for name, value in meta['stats'].items()}
+            for name, layout in meta['frames'].items():
+                index = entry[f'{name}/index']
+                if layout['index_note']:
+                    index = _decode_array(index, layout['index_note'])
+                columns = {
+                    column: _decode_array(entry[f'{name}/{i}'] if f'{name}/{i}' in entry.files else None, note)
+                    for i, (column, note) in enumerate(zip(layout['columns'], layout['notes']))
+                }
+                stats[name] = pd.DataFrame(columns, index=pd.Index(index), columns=layout['columns'])
+
+        if meta['frames']:
+            stats['_strategy'] = None
+        self.hits += 1
+        return pd.Series(stats, dtype=object)
+
+    def put(self, key: str, stats: Any) -> None:
+        """
+        Store a result: a statistics Series/dict. Private entries other than
+        _trades and _equity_curve (e.g. the _strategy instance) are dropped.
+        """
+        arrays = {}
+        meta = {'stats': {}, 'frames': {}}
+        for name, value in stats.items():
+            if name in _FRAMES and isinstance(value, pd.DataFrame):
+                index, index_note = _encode_array(value.index.array if isinstance(value.index, pd.DatetimeIndex)
+                                                  else value.index.to_numpy())
+                arrays[f'{name}/index'] = index
+                notes = []
+                for i, column in enumerate(value.columns):
+                    values = value[column].array if isinstance(value[column].dtype, pd.DatetimeTZDtype) \
+                        else value[column].to_numpy()
+                    encoded, note = _encode_array(values)
+                    if encoded is not None:
+                        arrays[f'{name}/{i}'] = encoded
+                    notes.append(note)
+                meta['frames'][name] = {'columns': list(value.columns), 'notes': notes, 'index_note': index_note}
+            elif not name.startswith('_'):
+                meta['stats'][name] = _encode_value(value)
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def clear(self) -> None:
+        """Delete every cached entry."""
+        for path in self.cache_dir.glob('*/*.npz'):
+            path.unlink()
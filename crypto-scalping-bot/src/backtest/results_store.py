@@ -0,0 +1,281 @@
+"""
+Queryable history of backtest runs in an embedded SQLite database.
+
+results/backtest_results.csv, strategy_comparison.csv and
+performance_report.json are overwritten by every run. ResultsStore appends
+one row per run instead (BacktestRunner, compare_strategies, optimization
+sweeps and PerformanceAnalyzer.record_metrics), with indexed columns for
+what runs are compared by:
+
+    strategy, label, params_hash, data_hash, engine, source, run_key
+    return_pct, sharpe_ratio, sortino_ratio, calmar_ratio, max_drawdown_pct,
+    win_rate_pct, n_trades, profit_factor
+
+Backtesting.py statistics ('Sharpe Ratio') and PerformanceAnalyzer metrics
+('sharpe_ratio') fill the same columns; every statistic is also kept as
+JSON in `stats`. run_key (the result cache key) identifies a run, so
+re-running an identical backtest does not add a duplicate row.
+
+    >>> store = ResultsStore('results/results.db')
+    >>> store.leaderboard('sharpe_ratio', n=20, strategy='LSTMScalpingStrategy')
+
+SQLite is in the standard library and handles concurrent appends from
+several processes (WAL journal).
+"""
+
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Indexed metric column -> statistic names that fill it (Backtesting.py, PerformanceAnalyzer)
+METRIC_COLUMNS: Dict[str, tuple] = {
+    'return_pct': ('Return [%]', 'total_return_pct'),
+    'sharpe_ratio': ('Sharpe Ratio', 'sharpe_ratio'),
+    'sortino_ratio': ('Sortino Ratio', 'sortino_ratio'),
+    'calmar_ratio': ('Calmar Ratio', 'calmar_ratio'),
+    'max_drawdown_pct': ('Max. Drawdown [%]', 'max_drawdown_pct'),
+    'win_rate_pct': ('Win Rate [%]', 'win_rate_pct'),
+    'n_trades': ('# Trades', 'total_trades'),
+    'profit_factor': ('Profit Factor', 'profit_factor'),
+}
+
+_KEY_COLUMNS = ['strategy', 'label', 'params_hash', 'data_hash', 'engine', 'source']
+
+# Filters with a (filter, metric) index for the most common per-strategy / per-dataset leaderboards
+_RANKED_BY = ['strategy', 'data_hash']
+_RANKED_METRICS = ['sharpe_ratio', 'return_pct']
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    run_key TEXT UNIQUE,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    source TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    label TEXT,
+    params TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    data_hash TEXT,
+    engine TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    {', '.join(f'{column} REAL' for column in METRIC_COLUMNS)},
+    stats TEXT NOT NULL
+);
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_runs_{column} ON runs ({column});' for column in _KEY_COLUMNS
+          if column not in _RANKED_BY)}
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_runs_{column} ON runs ({column});' for column in METRIC_COLUMNS)}
+{''.join(f'CREATE INDEX IF NOT EXISTS idx_runs_{key}_{metric} ON runs ({key}, {metric});'
+         for key in _RANKED_BY for metric in _RANKED_METRICS)}
+"""
+
+
+def _json_value(value: Any) -> Any:
+    """JSON-safe scalar (NaN/inf and timestamps as strings)."""
+    if hasattr(value, 'item') and not isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        value = value.item()
+    if isinstance(value, float) and (value != value or value in (float('inf'), float('-inf'))):
+        return str(value)
+    if isinstance(value, (int, float, str, bool, type(None))):
+        return value
+    return str(value)
+
+
+def _metric(value: Any) -> Optional[float]:
+    """REAL column value (None for missing/non-numeric)."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+
+def params_hash(params: Mapping[str, Any]) -> str:
+    """Stable hash of a parameter set (key order does not matter)."""
+    text = json.dumps({k: _json_value(v) for k, v in params.items()}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class ResultsStore:
+    """Append-only table of backtest runs with indexed leaderboard columns."""
+
+    def __init__(self, path: str = 'results/results.db') -> None:
+        """
+        Args:
+            path: SQLite database file (created on first use)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    @staticmethod
+    def _row(stats: Mapping[str, Any], strategy: str, params: Optional[Mapping[str, Any]], source: str,
+             label: Optional[str], data_hash: Optional[str], engine: Optional[str],
+             run_key: Optional[str]) -> tuple:
+        params = json.dumps({k: _json_value(v) for k, v in (params or {}).items()}, sort_keys=True)
+        public = {name: _json_value(value) for name, value in stats.items() if not str(name).startswith('_')}
+        metrics = []
+        for names in METRIC_COLUMNS.values():
+            value = next((stats[name] for name in names if name in stats), None)
+            metrics.append(_metric(value))
+        start, end = stats.get('Start'), stats.get('End')
+        return (run_key, source, strategy, label, params, hashlib.sha256(params.encode()).hexdigest()[:16],
+                data_hash, engine,
+                None if start is None else str(start), None if end is None else str(end),
+                *metrics, json.dumps(public))
+
+    def record(self, stats: Mapping[str, Any], strategy: str, params: Optional[Mapping[str, Any]] = None,
+               source: str = 'backtest', label: Optional[str] = None, data_hash: Optional[str] = None,
+               engine: Optional[str] = None, run_key: Optional[str] = None) -> int:
+        """
+        Append one run.
+
+        Args:
+            stats: Statistics Series/dict (Backtesting.py / fast engine statistics
+                or PerformanceAnalyzer.calculate_metrics()); '_' entries are dropped
+            strategy: Strategy class name
+            params: Strategy parameters of the run
+            source: What produced the run ('backtest', 'comparison', 'optimizer', 'analyzer')
+            label: Free-form name (e.g. the compare_strategies variant name)
+            data_hash: hash_frame() of the backtest frame
+            engine: 'fast' or 'backtesting'
+            run_key: Unique run id (result cache key); a run already stored
+                under it is not added again (only a missing label is filled in)
+
+        Returns:
+            int: run_id of the (new or existing) row
+        """
+        return self.record_many([dict(stats=stats, strategy=strategy, params=params, source=source,
+                                      label=label, data_hash=data_hash, engine=engine, run_key=run_key)])[0]
+
+    def record_many(self, runs: Iterable[Mapping[str, Any]]) -> List[int]:
+        """
+        Append many runs in one transaction.
+
+        Args:
+            runs: Dicts with record()'s arguments (stats and strategy required)
+
+        Returns:
+            list: run_id per run
+        """
+        columns = ['run_key', 'source', 'strategy', 'label', 'params', 'params_hash', 'data_hash',
+                   'engine', 'start_time', 'end_time', *METRIC_COLUMNS, 'stats']
+        insert = (f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                  f"ON CONFLICT(run_key) DO UPDATE SET label = COALESCE(runs.label, excluded.label)")
+        run_ids = []
+        with self._conn:
+            for run in runs:
+                row = self._row(run['stats'], run['strategy'], run.get('params'), run.get('source', 'backtest'),
+                                run.get('label'), run.get('data_hash'), run.get('engine'), run.get('run_key'))
+                cursor = self._conn.execute(insert, row)
+                if row[0] is None:
+                    run_ids.append(cursor.lastrowid)
+                else:
+                    # lastrowid is not set when the run was already stored
+                    run_ids.append(self._conn.execute('SELECT run_id FROM runs WHERE run_key = ?',
+                                                      (row[0],)).fetchone()[0])
+        return run_ids
+
+    def query(self, sql: str, parameters: Sequence[Any] = ()) -> pd.DataFrame:
+        """Run a SELECT against the `runs` table and return the rows as a DataFrame."""
+        return pd.read_sql_query(sql, self._conn, params=list(parameters))
+
+    def leaderboard(self, metric: str = 'sharpe_ratio', n: int = 20, ascending: bool = False,
+                    min_trades: int = 0, **filters: Any) -> pd.DataFrame:
+        """
+        Best runs by an indexed metric.
+
+        Args:
+            metric: One of METRIC_COLUMNS
+            n: Rows to return
+            ascending: Lowest first (default highest first; drawdowns are negative,
+                so the default ranks the smallest max_drawdown_pct first)
+            min_trades: Ignore runs with fewer trades
+            **filters: Equality filters on strategy, label, params_hash,
+                data_hash, engine or source
+
+        Returns:
+            DataFrame of runs (params parsed into a dict column), best first
+
+        Example:
+            >>> store.leaderboard('return_pct', n=10, data_hash=digest, min_trades=30)
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric '{metric}' (use one of {list(METRIC_COLUMNS)})")
+        unknown = set(filters) - set(_KEY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot filter on {sorted(unknown)} (use {_KEY_COLUMNS})")
+
+        where = [f'{metric} IS NOT NULL']
+        values: List[Any] = []
+        if min_trades:
+            where.append('n_trades >= ?')
+            values.append(min_trades)
+        for column, value in filters.items():
+            where.append(f'{column} = ?')
+            values.append(value)
+        sql = (f"SELECT run_id, created_at, source, strategy, label, params, data_hash, engine, "
+               f"{', '.join(METRIC_COLUMNS)} FROM runs WHERE {' AND '.join(where)} "
+               f"ORDER BY {metric} {'ASC' if ascending else 'DESC'} LIMIT ?")
+        frame = self.query(sql, values + [n])
+        frame['params'] = frame['params'].map(json.loads)
+        return frame
+
+    def stats(self, run_id: int) -> Dict[str, Any]:
+        """All statistics stored for one run."""
+        row = self._conn.execute('SELECT stats FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f'No run with run_id {run_id}')
+        return json.loads(row[0])
+
+
+def main() -> None:
+    """Print a leaderboard of stored runs."""
+    parser = argparse.ArgumentParser(description='Query stored backtest runs')
+    parser.add_argument('--db', default='results/results.db', help='Results database')
+    parser.add_argument('--metric', default='sharpe_ratio', choices=list(METRIC_COLUMNS), help='Rank by')
+    parser.add_argument('--top', type=int, default=20, help='Rows to show')
+    parser.add_argument('--strategy', help='Only this strategy class')
+    parser.add_argument('--source', help="Only runs from 'backtest', 'comparison', 'optimizer' or 'analyzer'")
+    parser.add_argument('--min-trades', type=int, default=0, help='Ignore runs with fewer trades')
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"No results database at {args.db}. Run a backtest first.")
+        sys.exit(1)
+
+    filters = {key: value for key, value in (('strategy', args.strategy), ('source', args.source)) if value}
+    with ResultsStore(args.db) as store:
+        board = store.leaderboard(args.metric, n=args.top, min_trades=args.min_trades, **filters)
+        print("=" * 60)
+        print(f"LEADERBOARD: {args.metric} ({len(store):,} runs stored)")
+        print("=" * 60)
+        with pd.option_context('display.width', 200, 'display.max_colwidth', 60):
+            print(board.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
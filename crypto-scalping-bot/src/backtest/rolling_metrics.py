@@ -0,0 +1,324 @@
+"""
+Streaming rolling risk metrics for long equity curves.
+
+PerformanceAnalyzer reports whole-period numbers. Monitoring a live or
+multi-month 1m equity curve needs them over a trailing window, for
+millions of points, and updated as new points arrive. Every metric here is
+a small state machine that processes each point in amortized O(1):
+
+    - RollingDrawdown: drawdown from the trailing-window peak (monotonic
+      deque of candidate peaks) and the deepest such drawdown in the window
+      (second monotonic deque) - the definition
+      `(eq / eq.rolling(w).max() - 1).rolling(w).min()`
+    - RollingSharpe: per-bar return mean/std from running windowed moments
+    - RollingWinRate: share of winning trades among the last N trades
+    - UnderwaterDuration: bars (and time) since the last all-time equity high
+
+update() accepts any chunk of new points and continues from the previous
+call, so one update() with the whole curve and many small ones give the
+same result. Loops are JIT-compiled with numba when available.
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtest.jit import compiled
+
+# One year of 1m bars (crypto trades around the clock)
+DEFAULT_PERIODS_PER_YEAR = 525600
+
+# Deque state slots: head position and size of each ring buffer
+_HEAD, _SIZE = 0, 1
+
+
+def _drawdown_kernel(equity, window, start, peak_pos, peak_val, peak_state, dd_pos, dd_val, dd_state,
+                     out_dd, out_max_dd):
+    """Trailing-window peak drawdown and its rolling minimum (two monotonic deques)."""
+    cap = len(peak_pos)
+    for i in range(len(equity)):
+        pos = start + i
+        value = equity[i]
+
+        # Candidate peaks: values decreasing from front to back
+        head, size = peak_state[_HEAD], peak_state[_SIZE]
+        while size > 0 and peak_val[(head + size - 1) % cap] <= value:
+            size -= 1
+        peak_pos[(head + size) % cap] = pos
+        peak_val[(head + size) % cap] = value
+        size += 1
+        while peak_pos[head] <= pos - window:
+            head = (head + 1) % cap
+            size -= 1
+        peak_state[_HEAD], peak_state[_SIZE] = head, size
+        drawdown = (value / peak_val[head] - 1) * 100
+        out_dd[i] = drawdown
+
+        # Candidate minima of the drawdown: values increasing from front to back
+        head, size = dd_state[_HEAD], dd_state[_SIZE]
+        while size > 0 and dd_val[(head + size - 1) % cap] >= drawdown:
+            size -= 1
+        dd_pos[(head + size) % cap] = pos
+        dd_val[(head + size) % cap] = drawdown
+        size += 1
+        while dd_pos[head] <= pos - window:
+            head = (head + 1) % cap
+            size -= 1
+        dd_state[_HEAD], dd_state[_SIZE] = head, size
+        out_max_dd[i] = dd_val[head]
+
+
+def _moments_kernel(values, window, buffer, moments, out_mean, out_std):
+    """
+    Windowed mean and sample std with a Welford-style add/remove update.
+
+    moments = [count, mean, m2, position]; buffer holds the last `window` values.
+    """
+    for i in range(len(values)):
+        x = values[i]
+        count, mean, m2, pos = moments[0], moments[1], moments[2], int(moments[3])
+        slot = pos % window
+        if count < window:
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+        else:
+            old = buffer[slot]
+            new_mean = mean + (x - old) / window
+            m2 += (x - old) * (x - new_mean + old - mean)
+            mean = new_mean
+        buffer[slot] = x
+        moments[0], moments[1], moments[2], moments[3] = count, mean, max(m2, 0.0), pos + 1
+        out_mean[i] = mean
+        out_std[i] = np.sqrt(moments[2] / (count - 1)) if count > 1 else np.nan
+
+
+def _underwater_kernel(equity, state, out_bars, out_max_bars):
+    """Bars since the last all-time high; state = [peak, bars_underwater, max_bars_underwater]."""
+    for i in range(len(equity)):
+        if equity[i] >= state[0]:
+            state[0] = equity[i]
+            state[1] = 0
+        else:
+            state[1] += 1
+        state[2] = max(state[2], state[1])
+        out_bars[i] = state[1]
+        out_max_bars[i] = state[2]
+
+
+def _values(data) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(data, dtype=np.float64))
+
+
+def _result(values, data, name):
+    """Wrap output like the input (Series with the same index, or an array)."""
+    return pd.Series(values, index=data.index, name=name) if isinstance(data, pd.Series) else values
+
+
+class RollingDrawdown:
+    """Drawdown from the trailing-window peak and the deepest one within the window (%)."""
+
+    def __init__(self, window: int) -> None:
+        """
+        Args:
+            window: Points in the trailing window (e.g. 1440 = one day of 1m bars)
+        """
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.n = 0
+        self._peak_pos = np.zeros(window + 1, dtype=np.int64)
+        self._peak_val = np.zeros(window + 1)
+        self._peak_state = np.zeros(2, dtype=np.int64)
+        self._dd_pos = np.zeros(window + 1, dtype=np.int64)
+        self._dd_val = np.zeros(window + 1)
+        self._dd_state = np.zeros(2, dtype=np.int64)
+
+    def update(self, equity: Union[pd.Series, np.ndarray]) -> pd.DataFrame:
+        """
+        Process new equity points.
+
+        Returns:
+            DataFrame with drawdown_pct and max_drawdown_pct per new point
+        """
+        values = _values(equity)
+        drawdown, max_drawdown = np.empty(len(values)), np.empty(len(values))
+        (compiled(_drawdown_kernel) or _drawdown_kernel)(
+            values, self.window, self.n, self._peak_pos, self._peak_val, self._peak_state,
+            self._dd_pos, self._dd_val, self._dd_state, drawdown, max_drawdown)
+        self.n += len(values)
+        return pd.DataFrame({'drawdown_pct': drawdown, 'max_drawdown_pct': max_drawdown},
+                            index=equity.index if isinstance(equity, pd.Series) else None)
+
+
+class RollingSharpe:
+    """Annualized Sharpe ratio of per-point returns over a trailing window (risk-free rate 0)."""
+
+    def __init__(self, window: int, periods_per_year: float = DEFAULT_PERIODS_PER_YEAR) -> None:
+        """
+        Args:
+            window: Returns in the trailing window (NaN until it is full)
+            periods_per_year: Points per year for annualization (525600 for 1m bars)
+        """
+        if window < 2:
+            raise ValueError("window must be >= 2")
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self._buffer = np.zeros(window)
+        self._moments = np.zeros(4)
+        self._last = np.nan
+
+    def update(self, equity: Union[pd.Series, np.ndarray]) -> Union[pd.Series, np.ndarray]:
+        """Process new equity points; returns the rolling Sharpe at each of them."""
+        values = _values(equity)
+        previous = np.empty_like(values)
+        if len(values):
+            previous[0] = self._last
+            previous[1:] = values[:-1]
+            self._last = values[-1]
+
+        sharpe = np.full(len(values), np.nan)
+        # The very first point has no return
+        first = 1 if np.isnan(previous[:1]).any() else 0
+        returns = values[first:] / previous[first:] - 1
+        mean, std = np.empty(len(returns)), np.empty(len(returns))
+        count_before = self._moments[0]
+        (compiled(_moments_kernel) or _moments_kernel)(returns, self.window, self._buffer, self._moments, mean, std)
+
+        filled = count_before + np.arange(1, len(returns) + 1) >= self.window
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe[first:] = np.where(filled & (std > 0), mean / std * np.sqrt(self.periods_per_year), np.nan)
+        return _result(sharpe, equity, 'sharpe_ratio')
+
+
+class RollingWinRate:
+    """Share of winning trades (PnL > 0) among the last `window` trades (%)."""
+
+    def __init__(self, window: int = 50) -> None:
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self._buffer = np.zeros(window)
+        self._moments = np.zeros(4)
+
+    def update(self, pnl: Union[pd.Series, np.ndarray]) -> Union[pd.Series, np.ndarray]:
+        """Process new closed trades; returns the win rate after each (over fewer trades until the window fills)."""
+        wins = (_values(pnl) > 0).astype(np.float64)
+        mean, std = np.empty(len(wins)), np.empty(len(wins))
+        (compiled(_moments_kernel) or _moments_kernel)(wins, self.window, self._buffer, self._moments, mean, std)
+        return _result(mean * 100, pnl, 'win_rate_pct')
+
+
+class UnderwaterDuration:
+    """Time since the last all-time equity high, and the longest such stretch so far."""
+
+    def __init__(self) -> None:
+        self._state = np.array([-np.inf, 0.0, 0.0])
+        self._peak_time: Optional[int] = None
+        self._max_duration = 0
+
+    def update(self, equity: Union[pd.Series, np.ndarray]) -> pd.DataFrame:
+        """
+        Process new equity points.
+
+        Returns:
+            DataFrame with underwater_bars and max_underwater_bars per new point,
+            plus underwater_duration / max_underwater_duration (timedeltas) when
+            equity is a datetime-indexed Series
+        """
+        values = _values(equity)
+        bars, max_bars = np.empty(len(values)), np.empty(len(values))
+        (compiled(_underwater_kernel) or _underwater_kernel)(values, self._state, bars, max_bars)
+        index = equity.index if isinstance(equity, pd.Series) else None
+        columns = {'underwater_bars': bars.astype(np.int64), 'max_underwater_bars': max_bars.astype(np.int64)}
+
+        if isinstance(index, pd.DatetimeIndex) and len(values):
+            times = index.as_unit('ns').asi8
+            at_peak = bars == 0
+            # Time of the most recent peak at or before each point (carried over between calls)
+            peak_times = np.where(at_peak, times, np.iinfo(np.int64).min)
+            np.maximum.accumulate(peak_times, out=peak_times)
+            if self._peak_time is not None:
+                np.maximum(peak_times, self._peak_time, out=peak_times)
+            peak_times = np.where(peak_times == np.iinfo(np.int64).min, times[0], peak_times)
+            duration = times - peak_times
+            running_max = np.maximum.accumulate(np.maximum(duration, self._max_duration))
+            self._peak_time = int(peak_times[-1])
+            self._max_duration = int(running_max[-1])
+            columns['underwater_duration'] = duration.view('timedelta64[ns]')
+            columns['max_underwater_duration'] = running_max.view('timedelta64[ns]')
+        return pd.DataFrame(columns, index=index)
+
+
+class RollingRiskMonitor:
+    """
+    All rolling metrics of one equity curve (and its trades), updatable.
+
+    Example:
+        >>> monitor = RollingRiskMonitor(window=1440)     # one day of 1m bars
+        >>> history = monitor.update(stats['_equity_curve']['Equity'])
+        >>> # every minute:
+        >>> latest = monitor.update(new_equity_points, new_trades_pnl)
+    """
+
+    def __init__(self, window: int = 1440, trade_window: int = 50,
+                 periods_per_year: float = DEFAULT_PERIODS_PER_YEAR) -> None:
+        """
+        Args:
+            window: Equity points in the drawdown / Sharpe window
+            trade_window: Trades in the win-rate window
+            periods_per_year: Points per year for Sharpe annualization
+        """
+        self.drawdown = RollingDrawdown(window)
+        self.sharpe = RollingSharpe(window, periods_per_year)
+        self.win_rate = RollingWinRate(trade_window)
+        self.underwater = UnderwaterDuration()
+        self._last_win_rate = np.nan
+
+    def update(self, equity: pd.Series, trades: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Process new equity points and trades closed during them.
+
+        Args:
+            equity: New equity points (datetime-indexed)
+            trades: Trades closed since the previous call (PnL and ExitTime
+                columns, in exit order), optional
+
+        Returns:
+            DataFrame indexed like equity: drawdown_pct, max_drawdown_pct,
+            sharpe_ratio, win_rate_pct (as of each point), underwater_bars,
+            max_underwater_bars and, for datetime indexes, underwater durations
+        """
+        # Columns are collected first and the frame built once: per-column
+        # inserts dominate the cost of small (per-bar) updates
+        drawdown = self.drawdown.update(equity)
+        columns = {name: drawdown[name].to_numpy() for name in drawdown.columns}
+        columns['sharpe_ratio'] = self.sharpe.update(equity.to_numpy(dtype=float))
+
+        win_rate = np.full(len(equity), self._last_win_rate)
+        if trades is not None and len(trades):
+            after_trade = self.win_rate.update(trades['PnL'].to_numpy(dtype=float))
+            exit_times = pd.DatetimeIndex(trades['ExitTime']).as_unit('ns').asi8
+            # Latest trade closed at or before each point
+            latest = np.searchsorted(exit_times, pd.DatetimeIndex(equity.index).as_unit('ns').asi8,
+                                     side='right') - 1
+            win_rate = np.where(latest >= 0, after_trade[np.maximum(latest, 0)], self._last_win_rate)
+            self._last_win_rate = after_trade[-1]
+        columns['win_rate_pct'] = win_rate
+
+        underwater = self.underwater.update(equity)
+        columns.update((name, underwater[name].to_numpy()) for name in underwater.columns)
+        return pd.DataFrame(columns, index=equity.index)
+
+
+def rolling_risk_metrics(equity: pd.Series, trades: Optional[pd.DataFrame] = None, window: int = 1440,
+                         trade_window: int = 50,
+                         periods_per_year: float = DEFAULT_PERIODS_PER_YEAR) -> pd.DataFrame:
+    """Rolling metrics of a whole equity curve (one RollingRiskMonitor update)."""
+    return RollingRiskMonitor(window, trade_window, periods_per_year).update(equity, trades)
@@ -0,0 +1,176 @@
+"""
+Compact result table for large parameter sweeps.
+
+Every Backtesting.py / fast-engine run returns a statistics Series holding
+the full _trades and _equity_curve DataFrames. Keeping those for thousands
+of parameter sets (or a list of per-run dicts) makes memory grow with the
+sweep. SweepResults keeps only the scalar statistics and parameters, in one
+growing NumPy column per key (a few hundred bytes per run), and the trade
+log of the best `keep_trades` runs by the maximized statistic:
+
+    >>> results = SweepResults(maximize='Sharpe Ratio', keep_trades=5)
+    >>> for params in candidates:
+    ...     results.append(bt.run(**params), params)   # equity/trades dropped here
+    >>> ranked = results.ranked()
+    >>> best_trades = results.trades(ranked.index[0])
+"""
+
+import sys
+import heapq
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtest.incremental import _GrowingArray
+
+_NAT = np.iinfo(np.int64).min
+
+
+class SweepResults:
+    """Columnar store of per-run statistics with the top-K runs' trades."""
+
+    def __init__(self, maximize: Optional[str] = 'Sharpe Ratio', keep_trades: int = 0) -> None:
+        """
+        Args:
+            maximize: Statistic that ranks runs (for ranked() and keep_trades)
+            keep_trades: Keep _trades of this many best runs (0 = none)
+        """
+        self.maximize = maximize
+        self.keep_trades = keep_trades
+        self._columns: Dict[str, Any] = {}     # name -> _GrowingArray (numeric/time) or list (other)
+        self._kinds: Dict[str, str] = {}       # name -> 'f', 'm' (Timedelta), 'M' (Timestamp) or 'O'
+        self._rows = 0
+        self._top: List[tuple] = []            # min-heap of (score, row)
+        self._trades: Dict[int, pd.DataFrame] = {}
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @staticmethod
+    def _kind(value: Any) -> Optional[str]:
+        """Column kind of a value; None for missing values (None, NaN, pd.NaT), which fit any kind."""
+        if isinstance(value, pd.Timedelta) or isinstance(value, np.timedelta64):
+            return 'm'
+        if isinstance(value, pd.Timestamp) or isinstance(value, np.datetime64):
+            return 'M'
+        if value is None or value is pd.NaT or (isinstance(value, (float, np.floating)) and np.isnan(value)):
+            return None
+        if isinstance(value, (bool, int, float, np.number, np.bool_)):
+            return 'f'
+        return 'O'
+
+    def _add_column(self, name: str, kind: str) -> None:
+        """New column, backfilled with missing values for the rows so far."""
+        if kind == 'O':
+            self._columns[name] = [None] * self._rows
+        else:
+            dtype = float if kind == 'f' else np.int64
+            column = _GrowingArray(dtype=dtype)
+            column.reserve(self._rows)[:] = np.nan if kind == 'f' else _NAT
+            column.extend(self._rows)
+            self._columns[name] = column
+        self._kinds[name] = kind
+
+    def _retype(self, name: str, kind: str) -> None:
+        """
+        Change a column's kind when a value of another kind arrives.
+
+        A column that has only seen missing values (created as 'f', e.g.
+        'Max. Drawdown Duration' of a zero-trade run) takes the new kind;
+        a column with values of a different kind becomes 'O'.
+        """
+        old_kind = self._kinds[name]
+        values = self.column(name)
+        if old_kind == 'f' and kind != 'O' and np.isnan(values).all():
+            self._add_column(name, kind)
+        else:
+            self._columns[name] = [None if pd.isna(value) else value
+                                   for value in pd.Index(values).astype(object)]
+            self._kinds[name] = 'O'
+
+    def append(self, stats: Mapping[str, Any], params: Optional[Mapping[str, Any]] = None) -> int:
+        """
+        Add one run.
+
+        Args:
+            stats: Statistics Series/dict of the run; keys starting with '_'
+                are dropped, except _trades when the run is among the best
+                keep_trades
+            params: Parameters of the run (stored as columns before the statistics)
+
+        Returns:
+            int: Row number of the run
+        """
+        row = {**(params or {}), **{key: value for key, value in stats.items() if not key.startswith('_')}}
+        kinds = {}
+        for name, value in row.items():
+            kind = kinds[name] = self._kind(value)
+            if name not in self._columns:
+                self._add_column(name, kind or 'f')
+            elif kind is not None and kind != self._kinds[name] and self._kinds[name] != 'O':
+                self._retype(name, kind)
+        for name, column in self._columns.items():
+            value = row.get(name)
+            kind = self._kinds[name]
+            if kind == 'O':
+                column.append(value)
+                continue
+            if kinds.get(name) is None:
+                value = np.nan if kind == 'f' else _NAT
+            elif kind == 'f':
+                value = float(value)
+            else:
+                value = (pd.Timedelta(value) if kind == 'm' else pd.Timestamp(value)).value
+            column.reserve(1)[0] = value
+            column.extend(1)
+
+        index = self._rows
+        self._rows += 1
+        if self.keep_trades and '_trades' in stats:
+            self._offer_trades(index, row.get(self.maximize), stats['_trades'])
+        return index
+
+    def _offer_trades(self, row: int, score: Any, trades: pd.DataFrame) -> None:
+        """Keep `trades` if the run ranks among the best keep_trades."""
+        score = float(score) if score is not None and not pd.isna(score) else -np.inf
+        if len(self._top) < self.keep_trades:
+            heapq.heappush(self._top, (score, -row))
+        elif (score, -row) > self._top[0]:
+            _, dropped = heapq.heapreplace(self._top, (score, -row))
+            self._trades.pop(-dropped, None)
+        else:
+            return
+        self._trades[row] = trades
+
+    def trades(self, row: int) -> Optional[pd.DataFrame]:
+        """Trades of a kept run (None if the run is not among the best keep_trades)."""
+        return self._trades.get(row)
+
+    def column(self, name: str) -> np.ndarray:
+        """One column as an array (no copy for numeric columns)."""
+        column, kind = self._columns[name], self._kinds[name]
+        if kind == 'O':
+            return np.array(column, dtype=object)
+        values = column.values
+        return values if kind == 'f' else values.view(f'{kind}8[ns]')
+
+    def to_frame(self) -> pd.DataFrame:
+        """All runs in append order (index = row number)."""
+        return pd.DataFrame({name: self.column(name) for name in self._columns})
+
+    def ranked(self) -> pd.DataFrame:
+        """All runs sorted by `maximize` (best first, NaN last); index = row number."""
+        frame = self.to_frame()
+        if self.maximize not in frame.columns:
+            raise ValueError(f"Unknown statistic to maximize: '{self.maximize}'")
+        return frame.sort_values(self.maximize, ascending=False, na_position='last', kind='stable')
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the table (excluding kept trades)."""
+        return sum(column.values.nbytes if kind != 'O' else 8 * len(column)
+                   for column, kind in zip(self._columns.values(), self._kinds.values()))
@@ -0,0 +1,172 @@
+"""
+Columnar, memory-mappable persistence of a backtest's trades and equity curve.
+
+results/backtest_results.csv keeps the statistics as text and drops
+_trades and _equity_curve, so nothing downstream can analyze a run without
+simulating it again. save_trade_log() writes a run as a directory of typed
+binary columns:
+
+    trade_log/
+        meta.json               statistics, column names and dtype notes
+        trades/index.npy        trade index
+        trades/<i>.npy          one .npy per _trades column (int, float, datetime64, timedelta64)
+        equity/index.npy        bar timestamps
+        equity/<i>.npy          Equity, DrawdownPct, DrawdownDuration
+
+load_trade_log() memory-maps the columns (np.load(mmap_mode='r')) and
+wraps them in DataFrames without copying, so opening a year of 1m equity
+reads only the pages a computation touches. Object columns (e.g. Tag) are
+stored as JSON in meta.json; value encoding is shared with result_cache.py.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtest.result_cache import _decode_array, _decode_value, _encode_array, _encode_value
+
+# Bump when the on-disk layout changes
+TRADE_LOG_VERSION = 1
+
+# Directory name -> statistics key
+FRAMES = {'trades': '_trades', 'equity': '_equity_curve'}
+
+
+def _write_frame(frame: pd.DataFrame, directory: Path) -> Dict[str, Any]:
+    """One .npy per column (and the index); returns the layout for meta.json."""
+    directory.mkdir(parents=True)
+    index, index_note = _encode_array(frame.index.array if isinstance(frame.index, pd.DatetimeIndex)
+                                      else frame.index.to_numpy())
+    if index is not None:
+        np.save(directory / 'index.npy', index, allow_pickle=False)
+    notes = []
+    for i, column in enumerate(frame.columns):
+        values = frame.iloc[:, i]
+        encoded, note = _encode_array(values.array if isinstance(values.dtype, pd.DatetimeTZDtype)
+                                      else values.to_numpy())
+        if encoded is not None:
+            np.save(directory / f'{i}.npy', encoded, allow_pickle=False)
+        notes.append(note)
+    return {'columns': [str(column) for column in frame.columns], 'notes': notes,
+            'index_note': index_note, 'rows': len(frame)}
+
+
+def save_trade_log(stats: Any, path: str = 'results/trade_log') -> Path:
+    """
+    Write a run's statistics, _trades and _equity_curve as typed columns.
+
+    The directory is replaced as a whole (written next to it, then renamed),
+    so a reader never sees half of a run.
+
+    Args:
+        stats: Statistics Series/dict of a Backtesting.py or fast-engine run
+        path: Output directory
+
+    Returns:
+        Path: The written directory
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=path.parent, prefix=f'.{path.name}.'))
+    try:
+        meta = {'version': TRADE_LOG_VERSION, 'stats': {}, 'frames': {}}
+        for name, value in stats.items():
+            if not str(name).startswith('_'):
+                meta['stats'][str(name)] = _encode_value(value)
+        for directory, key in FRAMES.items():
+            frame = stats.get(key) if hasattr(stats, 'get') else None
+            if isinstance(frame, pd.DataFrame):
+                meta['frames'][directory] = _write_frame(frame, tmp / directory)
+        (tmp / 'meta.json').write_text(json.dumps(meta))
+
+        # Swap in the new run; the old one is removed only after the rename
+        old = None
+        if path.exists():
+            old = path.with_name(f'.{path.name}.old-{os.getpid()}')
+            os.replace(path, old)
+        os.replace(tmp, path)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+
+def _read_meta(path: Path) -> Dict[str, Any]:
+    meta_path = path / 'meta.json'
+    if not meta_path.exists():
+        raise FileNotFoundError(f"No trade log at {path} (run a backtest first)")
+    meta = json.loads(meta_path.read_text())
+    if meta.get('version') != TRADE_LOG_VERSION:
+        raise ValueError(f"Trade log {path} has format version {meta.get('version')}, "
+                         f"expected {TRADE_LOG_VERSION}")
+    return meta
+
+
+def _load_frame(path: Path, frame: str, layout: Dict[str, Any], columns: Optional[List[str]],
+                mmap: bool) -> pd.DataFrame:
+    directory = path / frame
+    mode = 'r' if mmap else None
+
+    def load(name: str, note: Dict[str, Any]):
+        file = directory / f'{name}.npy'
+        values = np.load(file, mmap_mode=mode, allow_pickle=False) if file.exists() else None
+        return _decode_array(values, note)
+
+    wanted = layout['columns'] if columns is None else list(columns)
+    missing = set(wanted) - set(layout['columns'])
+    if missing:
+        raise KeyError(f"Columns not in the {frame} log: {sorted(missing)}")
+    data = {column: load(str(i), layout['notes'][i])
+            for i, column in enumerate(layout['columns']) if column in wanted}
+    index = pd.Index(load('index', layout['index_note']), copy=False)
+    return pd.DataFrame(data, index=index, columns=wanted, copy=False)
+
+
+def read_frame(path: str, frame: str = 'trades', columns: Optional[List[str]] = None,
+               mmap: bool = True) -> Optional[pd.DataFrame]:
+    """
+    One stored frame, optionally only some of its columns.
+
+    Args:
+        path: Trade log directory
+        frame: 'trades' or 'equity'
+        columns: Columns to load (default: all)
+        mmap: Memory-map the columns (read-only, no copy) instead of reading them
+
+    Returns:
+        DataFrame, or None if the run had no such frame
+    """
+    layout = _read_meta(Path(path))['frames'].get(frame)
+    return None if layout is None else _load_frame(Path(path), frame, layout, columns, mmap)
+
+
+def load_trade_log(path: str = 'results/trade_log', mmap: bool = True) -> pd.Series:
+    """
+    A stored run as a statistics Series with _trades and _equity_curve.
+
+    Args:
+        path: Trade log directory
+        mmap: Memory-map the columns (read-only, no copy) instead of reading them
+
+    Example:
+        >>> run = load_trade_log('results/trade_log')
+        >>> run['Sharpe Ratio'], len(run['_trades'])
+    """
+    path = Path(path)
+    meta = _read_meta(path)
+    stats = {name: _decode_value(value) for name, value in meta['stats'].items()}
+    for directory, key in FRAMES.items():
+        layout = meta['frames'].get(directory)
+        stats[key] = None if layout is None else _load_frame(path, directory, layout, None, mmap)
+    return pd.Series(stats, dtype=object)
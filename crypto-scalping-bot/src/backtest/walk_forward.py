@@ -0,0 +1,418 @@
+"""
+Walk-forward evaluation: retrain (or fine-tune) and backtest over rolling folds.
+
+The single date split in lstm_model.main() scores one two-week window. This
+harness slides that split across the data:
+
+    fold 0: [ train ][ val ][ test ]
+    fold 1:     [ train ][ val ][ test ]
+    ...
+    fold N-1:               [ train ][ val ][ test ]   <- ends at the last bar
+
+Test windows tile the end of the data back to back, so the folds together
+backtest one contiguous out-of-sample period. In 'anchored' mode every
+training window starts at the first bar instead of sliding.
+
+Sequences are built once by the parent and cached under
+data/cache/walk_forward/<key>/ (key = hash of processed_data.csv and the model
+config); fold workers memory-map them instead of re-running preprocessing.
+Folds train in separate processes, each limited to its share of CPU threads,
+and write their artifacts to results/walk_forward/fold_XX/.
+
+Usage:
+    python src/backtest/walk_forward.py [--folds 6] [--mode rolling] [--workers 3]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import yaml
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from strategies.lstm_strategy import LSTMScalpingStrategy, AggressiveLSTMStrategy, ConservativeLSTMStrategy
+
+STRATEGIES = {
+    'default': LSTMScalpingStrategy,
+    'aggressive': AggressiveLSTMStrategy,
+    'conservative': ConservativeLSTMStrategy,
+}
+
+# Columns of processed_data.csv the backtest needs (see prepare_data_for_backtest)
+BACKTEST_COLUMNS = [
+    'datetime', 'open', 'high', 'low', 'close', 'volume', 'rsi_14', 'macd', 'macd_signal',
+    'bb_upper', 'bb_lower', 'adx_14', 'atr_14', 'atr_sma_20', 'volume_sma_20',
+]
+
+# Per-fold results aggregated into the summary (mean/std/min/max)
+SUMMARY_METRICS = [
+    'Return [%]', 'Sharpe Ratio', 'Max. Drawdown [%]', 'Win Rate [%]', '# Trades',
+    'Profit Factor', 'mae', 'direction_accuracy',
+]
+
+
+def generate_folds(timestamps: pd.DatetimeIndex, n_folds: int, train_period: str = '35D',
+                   val_period: str = '7D', test_period: str = '7D', mode: str = 'rolling') -> pd.DataFrame:
+    """
+    Split a time range into walk-forward folds.
+
+    Windows are right-closed like the pipeline's date split: a fold trains on
+    (train_start, train_end], validates on (train_end, val_end] and backtests
+    on (val_end, test_end]. The last fold's test window ends at the last bar.
+
+    Args:
+        timestamps: Sorted sample timestamps
+        n_folds: Number of folds
+        train_period, val_period, test_period: Window lengths (pandas offsets, e.g. '35D', '12h')
+        mode: 'rolling' (fixed-length training window) or 'anchored' (training
+            always starts at the first bar)
+
+    Returns:
+        pd.DataFrame with one row per fold: fold, train_start, train_end,
+        val_end, test_end (train_start is None in anchored mode)
+
+    Raises:
+        ValueError: If the data is too short for the requested folds
+
+    Example:
+        >>> folds = generate_folds(times, n_folds=12, train_period='21D', test_period='3D')
+    """
+    if mode not in ('rolling', 'anchored'):
+        raise ValueError(f"Unknown walk-forward mode '{mode}' (use 'rolling' or 'anchored')")
+    if n_folds < 1:
+        raise ValueError("n_folds must be at least 1")
+
+    first, last = pd.Timestamp(timestamps[0]), pd.Timestamp(timestamps[-1])
+    train_period = pd.Timedelta(train_period)
+    val_period = pd.Timedelta(val_period)
+    test_period = pd.Timedelta(test_period)
+
+    folds = []
+    for fold in range(n_folds):
+        test_end = last - (n_folds - 1 - fold) * test_period
+        val_end = test_end - test_period
+        train_end = val_end - val_period
+        train_start = train_end - train_period if mode == 'rolling' else None
+
+        earliest = train_start if train_start is not None else train_end
+        if earliest < first:
+            needed = n_folds * test_period + val_period + (train_period if mode == 'rolling' else pd.Timedelta(0))
+            raise ValueError(f"{n_folds} folds need {needed} of data, only {last - first} available "
+                             f"(use fewer folds or shorter periods)")
+
+        folds.append({'fold': fold, 'train_start': train_start, 'train_end': train_end,
+                      'val_end': val_end, 'test_end': test_end})
+
+    return pd.DataFrame(folds)
+
+
+def fold_masks(times: np.ndarray, fold: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Boolean train/val/test masks of one generate_folds() row over sample timestamps."""
+    times = pd.DatetimeIndex(times)
+    train = times <= fold['train_end']
+    if fold['train_start'] is not None and not pd.isna(fold['train_start']):
+        train &= times > fold['train_start']
+    return {
+        'train': np.asarray(train),
+        'val': np.asarray((times > fold['train_end']) & (times <= fold['val_end'])),
+        'test': np.asarray((times > fold['val_end']) & (times <= fold['test_end'])),
+    }
+
+
+def feature_cache_key(data_path: Path, config: Dict[str, Any]) -> str:
+    """Hash of the processed data file and every config setting that changes the sequences."""
+    digest = hashlib.sha256()
+    with open(data_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    model_config = config['model']
+    digest.update(json.dumps({
+        'features': model_config['features'],
+        'lookback': model_config['lookback_periods'],
+        'horizons': model_config.get('prediction_horizons', [1]),
+    }, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def build_feature_cache(data_path: Path, config_path: str = 'config/config.yaml',
+                        cache_root: Path = Path('data/cache/walk_forward')) -> Path:
+    """
+    Create (or reuse) the cached LSTM sequences for walk-forward folds.
+
+    Writes X.npy, y.npy (targets), times.npy (int64 ns timestamp of each
+    sequence's target bar), rows.npy (position of that bar in the processed
+    data) and market.pkl (the columns the backtest needs).
+
+    Returns:
+        Cache directory
+    """
+    from data.preprocess import DataPreprocessor
+
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    cache_dir = Path(cache_root) / feature_cache_key(data_path, config)
+    if (cache_dir / 'market.pkl').exists():
+        print(f"Using cached features: {cache_dir}")
+        return cache_dir
+
+    print(f"Building feature cache from {data_path}...")
+    df = pd.read_csv(data_path)
+    df['datetime'] = pd.to_datetime(df['datetime'])
+
+    # Same sequences (and scaler fit) as lstm_model.main() builds for the pipeline
+    preprocessor = DataPreprocessor(config_path)
+    X, y, indices = preprocessor.create_sequences(df, lookback=config['model']['lookback_periods'])
+    rows = df.index.get_indexer(indices)
+    times = df['datetime'].to_numpy(dtype='datetime64[ns]')[rows].astype(np.int64)
+
+    # Write to a temporary directory first so an interrupted build is never reused
+    tmp_dir = cache_dir.with_name(cache_dir.name + '.tmp')
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    np.save(tmp_dir / 'X.npy', X.astype(np.float32))
+    np.save(tmp_dir / 'y.npy', y)
+    np.save(tmp_dir / 'times.npy', times)
+    np.save(tmp_dir / 'rows.npy', rows)
+    df[[col for col in BACKTEST_COLUMNS if col in df.columns]].to_pickle(tmp_dir / 'market.pkl')
+    tmp_dir.replace(cache_dir)
+
+    print(f"Cached {len(X)} sequences to {cache_dir}")
+    return cache_dir
+
+
+def _init_worker(threads: int) -> None:
+    """Limit each fold process to its share of CPU threads (before TensorFlow runs any op)."""
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(min(threads, 2))
+
+
+def run_fold(fold: Dict[str, Any], cache_dir: str, output_dir: str, config_path: str = 'config/config.yaml',
+             strategy: str = 'default', engine: str = 'fast', init_bundle: Optional[str] = None,
+             fine_tune_epochs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Train (or fine-tune) on one fold and backtest its test window.
+
+    Training output goes to {output_dir}/fold_XX/train.log; the fold's
+    checkpoints, training metrics and test predictions are saved next to it.
+
+    Args:
+        fold: Row of generate_folds()
+        cache_dir: Directory written by build_feature_cache()
+        output_dir: Parent directory for per-fold artifacts
+        config_path: Model/backtest config
+        strategy: Key of STRATEGIES
+        engine: Backtest engine ('fast' or 'backtesting')
+        init_bundle: Model bundle to start from instead of a fresh model.
+            Must be trained on the same processed data (sequences are scaled
+            with the cache's scaler, not the bundle's)
+        fine_tune_epochs: Epochs when fine-tuning from init_bundle (default: config epochs)
+
+    Returns:
+        Dictionary of fold boundaries, sample counts, model metrics and backtest statistics
+    """
+    from models.lstm_model import LSTMPricePredictor
+    from backtest.backtest_runner import BacktestRunner
+    from backtest.optimizer import evaluate_params
+
+    cache_dir = Path(cache_dir)
+    fold_dir = Path(output_dir) / f"fold_{fold['fold']:02d}"
+    fold_dir.mkdir(parents=True, exist_ok=True)
+
+    # Read-only views: nothing is copied until a fold slices its windows
+    X = np.load(cache_dir / 'X.npy', mmap_mode='r')
+    y = np.load(cache_dir / 'y.npy', mmap_mode='r')
+    times = np.load(cache_dir / 'times.npy').astype('datetime64[ns]')
+    rows = np.load(cache_dir / 'rows.npy')
+    market = pd.read_pickle(cache_dir / 'market.pkl')
+
+    masks = fold_masks(times, fold)
+    X_train, y_train = X[masks['train']], y[masks['train']]
+    X_val, y_val = X[masks['val']], y[masks['val']]
+    X_test, y_test = X[masks['test']], y[masks['test']]
+    if min(len(X_train), len(X_val), len(X_test)) == 0:
+        raise ValueError(f"Fold {fold['fold']} has an empty window "
+                         f"(train={len(X_train)}, val={len(X_val)}, test={len(X_test)})")
+
+    start = time.perf_counter()
+    with open(fold_dir / 'train.log', 'w') as log, contextlib.redirect_stdout(log):
+        if init_bundle:
+            model = LSTMPricePredictor.load_bundle(init_bundle, config_path)
+            if fine_tune_epochs:
+                model.config['model']['epochs'] = fine_tune_epochs
+        else:
+            model = LSTMPricePredictor(config_path)
+        model.artifact_dir = fold_dir
+
+        history = model.train(X_train, y_train, X_val, y_val)
+        model_metrics = model.evaluate(X_test, y_test)
+        predictions = model.predict(X_test)
+    train_seconds = time.perf_counter() - start
+
+    # Multi-horizon: first horizon drives entries, the rest become Predicted_Change_H{n}
+    if predictions.ndim == 2:
+        horizon_predictions = {horizon: predictions[:, col] for col, horizon in enumerate(model.horizons)}
+        predicted, actual = predictions[:, 0], y_test[:, 0]
+    else:
+        horizon_predictions = {}
+        predicted, actual = predictions, y_test
+
+    test_rows = market.iloc[rows[masks['test']]]
+    pd.DataFrame({'datetime': test_rows['datetime'].values, 'actual': actual, 'predicted': predicted,
+                  **{f'predicted_h{h}': values for h, values in horizon_predictions.items()}}
+                 ).to_csv(fold_dir / 'predictions.csv', index=False)
+
+    runner = BacktestRunner(config_path)
+    bt_data = runner.prepare_data_for_backtest(test_rows, predicted, actual, horizon_predictions)
+    stats = evaluate_params(bt_data, {}, STRATEGIES[strategy],
+                            cash=runner.config['trading']['initial_capital'],
+                            commission=runner.config['backtesting']['commission'],
+                            engine=engine)
+
+    return {
+        **fold,
+        'n_train': len(X_train), 'n_val': len(X_val), 'n_test': len(X_test),
+        'epochs_trained': len(history.history['loss']),
+        'train_seconds': train_seconds,
+        **model_metrics,
+        **{key: value for key, value in stats.items() if key in SUMMARY_METRICS or key in ('Start', 'End')},
+    }
+
+
+def summarize_folds(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate per-fold results: mean/std/min/max of SUMMARY_METRICS.
+
+    The compounded return over all test windows (which are contiguous) is
+    reported as the 'Return [%]' row's 'compounded' column.
+    """
+    columns = [col for col in SUMMARY_METRICS if col in results.columns]
+    summary = results[columns].apply(pd.to_numeric, errors='coerce').agg(['mean', 'std', 'min', 'max']).T
+    summary['compounded'] = np.nan
+    if 'Return [%]' in summary.index:
+        summary.loc['Return [%]', 'compounded'] = ((1 + results['Return [%]'] / 100).prod() - 1) * 100
+    return summary
+
+
+def run_walk_forward(config_path: str = 'config/config.yaml', data_path: str = 'data/processed_data.csv',
+                     n_folds: Optional[int] = None, mode: Optional[str] = None,
+                     train_period: Optional[str] = None, val_period: Optional[str] = None,
+                     test_period: Optional[str] = None, workers: Optional[int] = None,
+                     strategy: str = 'default', engine: str = 'fast', init_bundle: Optional[str] = None,
+                     fine_tune_epochs: Optional[int] = None,
+                     output_dir: str = 'results/walk_forward') -> pd.DataFrame:
+    """
+    Run every fold in parallel and collect the per-fold results.
+
+    Arguments left as None come from the config's walk_forward section.
+
+    Returns:
+        pd.DataFrame with one row per fold (see run_fold), sorted by fold
+
+    Example:
+        >>> results = run_walk_forward(n_folds=12, train_period='21D', test_period='3D', workers=4)
+        >>> print(summarize_folds(results))
+    """
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    settings = config.get('walk_forward', {})
+
+    n_folds = n_folds or settings.get('n_folds', 6)
+    mode = mode or settings.get('mode', 'rolling')
+    train_period = train_period or settings.get('train_period', '35D')
+    val_period = val_period or settings.get('val_period', '7D')
+    test_period = test_period or settings.get('test_period', '7D')
+    fine_tune_epochs = fine_tune_epochs or settings.get('fine_tune_epochs')
+    cpu_count = os.cpu_count() or 1
+    workers = min(n_folds, workers or settings.get('workers') or max(1, cpu_count // 4))
+    threads = max(1, cpu_count // workers)
+
+    cache_dir = build_feature_cache(Path(data_path), config_path)
+    times = np.load(cache_dir / 'times.npy').astype('datetime64[ns]')
+    folds = generate_folds(pd.DatetimeIndex(times), n_folds, train_period, val_period, test_period, mode)
+
+    print(f"\n{'='*60}")
+    print(f"WALK-FORWARD: {n_folds} {mode} folds, {workers} workers x {threads} threads")
+    print(f"{'='*60}")
+    for fold in folds.itertuples():
+        train_from = fold.train_start if fold.train_start is not None and not pd.isna(fold.train_start) else 'start'
+        print(f"Fold {fold.fold:2d}: train {train_from} -> {fold.train_end} | "
+              f"test {fold.val_end} -> {fold.test_end}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # TensorFlow is not fork-safe: start each worker from a fresh interpreter
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(threads,)) as executor:
+        futures = {
+            executor.submit(run_fold, fold, str(cache_dir), str(output_dir), config_path,
+                            strategy, engine, init_bundle, fine_tune_epochs): fold['fold']
+            for fold in folds.to_dict('records')
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"Fold {futures[future]:2d} done ({len(results)}/{n_folds}): "
+                  f"return {result['Return [%]']:.2f}%, {result['# Trades']} trades, "
+                  f"trained {result['epochs_trained']} epochs in {result['train_seconds']:.0f}s")
+
+    return pd.DataFrame(results).sort_values('fold').reset_index(drop=True)
+
+
+def main() -> None:
+    """Run the walk-forward evaluation and save per-fold and summary results."""
+    parser = argparse.ArgumentParser(description='Walk-forward evaluation of the LSTM strategy')
+    parser.add_argument('--config', default='config/config.yaml', help='Config file')
+    parser.add_argument('--data', default='data/processed_data.csv', help='Processed data (preprocess.py output)')
+    parser.add_argument('--folds', type=int, help='Number of folds (default: config walk_forward.n_folds)')
+    parser.add_argument('--mode', choices=['rolling', 'anchored'], help='Training window mode')
+    parser.add_argument('--train', dest='train_period', help="Training window, e.g. '35D'")
+    parser.add_argument('--val', dest='val_period', help="Validation window, e.g. '7D'")
+    parser.add_argument('--test', dest='test_period', help="Test (backtest) window, e.g. '7D'")
+    parser.add_argument('--workers', type=int, help='Parallel fold processes')
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='default', help='Strategy variant')
+    parser.add_argument('--engine', choices=['fast', 'backtesting'], default='fast', help='Backtest engine')
+    parser.add_argument('--init-bundle', help='Fine-tune from this model bundle instead of training from scratch')
+    parser.add_argument('--fine-tune-epochs', type=int, help='Epochs per fold when fine-tuning')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_walk_forward(
+        config_path=args.config, data_path=args.data, n_folds=args.folds, mode=args.mode,
+        train_period=args.train_period, val_period=args.val_period, test_period=args.test_period,
+        workers=args.workers, strategy=args.strategy, engine=args.engine,
+        init_bundle=args.init_bundle, fine_tune_epochs=args.fine_tune_epochs,
+    )
+    summary = summarize_folds(results)
+
+    print(f"\n{'='*60}")
+    print(f"WALK-FORWARD RESULTS ({time.perf_counter() - start:.0f}s)")
+    print(f"{'='*60}")
+    print(results[['fold', 'Start', 'End', 'Return [%]', 'Sharpe Ratio', 'Max. Drawdown [%]',
+                   '# Trades', 'direction_accuracy']].to_string(index=False))
+    print(f"\n{summary.to_string()}")
+
+    results_dir = Path('results')
+    results_dir.mkdir(exist_ok=True)
+    results.to_csv(results_dir / 'walk_forward.csv', index=False)
+    summary.to_csv(results_dir / 'walk_forward_summary.csv')
+    print(f"\nResults saved to {results_dir / 'walk_forward.csv'} and {results_dir / 'walk_forward_summary.csv'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,15 @@
 """Data fetching and preprocessing modules."""
 
-from .fetch_data import OKXDataFetcher
-from .preprocess import DataPreprocessor
-
 __all__ = ['OKXDataFetcher', 'DataPreprocessor']
+
+
+def __getattr__(name):
+    # Import lazily so ccxt (fetching) and sklearn/ta (preprocessing) are only
+    # loaded by the steps that use them, not by e.g. data.intrabar_store
+    if name == 'OKXDataFetcher':
+        from .fetch_data import OKXDataFetcher
+        return OKXDataFetcher
+    if name == 'DataPreprocessor':
+        from .preprocess import DataPreprocessor
+        return DataPreprocessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
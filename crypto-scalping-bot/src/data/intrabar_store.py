@@ -0,0 +1,222 @@
+"""
+On-disk store of sub-minute price data for intrabar SL/TP resolution.
+
+When a 1m bar's range covers both a position's stop-loss and take-profit,
+the bar alone cannot tell which was hit first (Backtesting.py and the fast
+engine assume the stop). IntrabarStore keeps second-level bars or ticks
+partitioned by UTC day:
+
+    data/intrabar/
+        manifest.json          # days, row counts, time range
+        2024-03-16/times.npy   # int64 ns, sorted
+        2024-03-16/high.npy
+        2024-03-16/low.npy
+
+Day files are memory-mapped on first access and searched with a binary
+search, so resolving a few hundred ambiguous bars only touches the pages
+around those bars - the full sub-minute dataset is never loaded.
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+_NS_PER_DAY = 86_400_000_000_000
+
+# Bump when the on-disk layout changes
+STORE_FORMAT_VERSION = 1
+
+
+class IntrabarStore:
+    """
+    Day-partitioned, memory-mapped sub-minute highs/lows.
+
+    Example:
+        >>> store = IntrabarStore.write(seconds_df, 'data/intrabar')   # once
+        >>> store = IntrabarStore('data/intrabar')
+        >>> stats = run_fast_backtest(bt_data, intrabar=store)
+        >>> print(store.counters)
+    """
+
+    def __init__(self, store_dir: Union[str, Path] = 'data/intrabar') -> None:
+        """
+        Args:
+            store_dir: Directory written by IntrabarStore.write()
+
+        Raises:
+            FileNotFoundError: If the directory has no manifest.json
+        """
+        self.store_dir = Path(store_dir)
+        manifest_path = self.store_dir / 'manifest.json'
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No intrabar store at {self.store_dir} (missing manifest.json)")
+        self.manifest = json.loads(manifest_path.read_text())
+        if self.manifest.get('format') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Intrabar store {self.store_dir} has format {self.manifest.get('format')}, "
+                             f"expected {STORE_FORMAT_VERSION}; rebuild it")
+        self._days: Dict[str, Optional[Dict[str, np.ndarray]]] = {}
+        self.counters = {'ambiguous': 0, 'tp_first': 0, 'sl_first': 0, 'unresolved': 0}
+
+    @classmethod
+    def write(cls, data: pd.DataFrame, store_dir: Union[str, Path] = 'data/intrabar') -> 'IntrabarStore':
+        """
+        Add sub-minute data to a store (days already present are replaced).
+
+        Args:
+            data: Datetime-indexed frame with high/low columns (sub-minute bars)
+                or a price column (ticks); column names are case-insensitive
+            store_dir: Store directory (created if needed)
+
+        Returns:
+            IntrabarStore opened on store_dir
+        """
+        store_dir = Path(store_dir)
+        columns = {column.lower(): column for column in data.columns}
+        if 'high' in columns and 'low' in columns:
+            high = data[columns['high']].to_numpy(dtype=float)
+            low = data[columns['low']].to_numpy(dtype=float)
+        elif 'price' in columns:
+            high = low = data[columns['price']].to_numpy(dtype=float)
+        else:
+            raise ValueError("Intrabar data needs high/low columns or a price column")
+
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        times = index.as_unit('ns').asi8
+        order = np.argsort(times, kind='stable')
+        times, high, low = times[order], high[order], low[order]
+
+        manifest_path = store_dir / 'manifest.json'
+        manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() \
+            else {'format': STORE_FORMAT_VERSION, 'days': {}}
+
+        days = times // _NS_PER_DAY
+        bounds = np.r_[0, np.flatnonzero(np.diff(days)) + 1, len(days)]
+        for begin, end in zip(bounds[:-1], bounds[1:]):
+            if begin == end:
+                continue
+            day = str(pd.Timestamp(int(days[begin]) * _NS_PER_DAY).date())
+            day_dir = store_dir / day
+            day_dir.mkdir(parents=True, exist_ok=True)
+            np.save(day_dir / 'times.npy', times[begin:end])
+            np.save(day_dir / 'high.npy', high[begin:end])
+            np.save(day_dir / 'low.npy', low[begin:end])
+            manifest['days'][day] = {'rows': int(end - begin), 'first': int(times[begin]),
+                                     'last': int(times[end - 1])}
+
+        manifest['days'] = dict(sorted(manifest['days'].items()))
+        store_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest, indent=1))
+        return cls(store_dir)
+
+    def fingerprint(self) -> str:
+        """Hash of the manifest (changes whenever data is added or replaced)."""
+        return hashlib.sha256(json.dumps(self.manifest, sort_keys=True).encode()).hexdigest()
+
+    def _day(self, day: str) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-mapped arrays of one day (None if the store has no data for it)."""
+        if day not in self._days:
+            if day in self.manifest['days']:
+                day_dir = self.store_dir / day
+                self._days[day] = {name: np.load(day_dir / f'{name}.npy', mmap_mode='r')
+                                   for name in ('times', 'high', 'low')}
+            else:
+                self._days[day] = None
+        return self._days[day]
+
+    def bars(self, start_ns: int, end_ns: int) -> Dict[str, np.ndarray]:
+        """Sub-minute rows with start_ns <= time < end_ns (UTC ns)."""
+        parts = []
+        for day_number in range(start_ns // _NS_PER_DAY, (end_ns - 1) // _NS_PER_DAY + 1):
+            day = self._day(str(pd.Timestamp(day_number * _NS_PER_DAY).date()))
+            if day is None:
+                continue
+            begin, end = np.searchsorted(day['times'], [start_ns, end_ns])
+            parts.append({name: np.asarray(values[begin:end]) for name, values in day.items()})
+        if not parts:
+            return {'times': np.empty(0, dtype=np.int64), 'high': np.empty(0), 'low': np.empty(0)}
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def first_touch(self, start_ns: int, end_ns: int, side: int, sl: float, tp: float,
+                    scale: float = 1.0) -> Optional[bool]:
+        """
+        Which bracket level the price reached first within [start_ns, end_ns).
+
+        Args:
+            side: 1 for a long position, -1 for a short one
+            sl, tp: Stop-loss and take-profit prices
+            scale: Multiplier applied to the stored prices before comparing
+                (the fast engine's fractional-unit price scale)
+
+        Returns:
+            True if TP was reached first, False if SL was, None if the store
+            cannot tell (no data, or both levels inside the same sub-bar)
+        """
+        self.counters['ambiguous'] += 1
+        rows = self.bars(start_ns, end_ns)
+        # Same arithmetic as the bar arrays the levels were compared with
+        high, low = rows['high'] * scale, rows['low'] * scale
+        if side > 0:
+            hit_sl, hit_tp = low <= sl, high >= tp
+        else:
+            hit_sl, hit_tp = high >= sl, low <= tp
+        first_sl = np.argmax(hit_sl) if hit_sl.any() else len(hit_sl)
+        first_tp = np.argmax(hit_tp) if hit_tp.any() else len(hit_tp)
+        if first_sl == first_tp:
+            self.counters['unresolved'] += 1
+            return None
+        tp_first = bool(first_tp < first_sl)
+        self.counters['tp_first' if tp_first else 'sl_first'] += 1
+        return tp_first
+
+    def resolver(self, index: pd.DatetimeIndex,
+                 scale: float = 1.0) -> Callable[[int, int, float, float], Optional[bool]]:
+        """
+        Bar-number based resolver for fast_engine.simulate_bars().
+
+        Args:
+            index: The backtest frame's index (bar start times)
+            scale: Price scale of the simulation (fractional unit)
+        """
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        starts = index.as_unit('ns').asi8
+        period = int(np.median(np.diff(starts[-100:]))) if len(starts) > 1 else 60_000_000_000
+
+        def _resolve(bar: int, side: int, sl: float, tp: float) -> Optional[bool]:
+            end = starts[bar + 1] if bar + 1 < len(starts) else starts[bar] + period
+            return self.first_touch(int(starts[bar]), int(end), side, sl, tp, scale)
+
+        return _resolve
+
+
+def main():
+    """Build or extend an intrabar store from a CSV of sub-minute bars or ticks."""
+    parser = argparse.ArgumentParser(description='Build the intrabar SL/TP resolution store')
+    parser.add_argument('input', nargs='+', help='CSV files: datetime/timestamp column + high/low or price')
+    parser.add_argument('--store', default='data/intrabar', help='Store directory')
+    args = parser.parse_args()
+
+    for path in args.input:
+        df = pd.read_csv(path)
+        time_column = next((c for c in df.columns if c.lower() in ('datetime', 'timestamp', 'time')), None)
+        if time_column is None:
+            print(f"{path}: no datetime/timestamp/time column")
+            sys.exit(1)
+        times = df.pop(time_column)
+        unit = 'ms' if pd.api.types.is_integer_dtype(times) else None
+        df.index = pd.to_datetime(times, unit=unit, utc=True)
+        store = IntrabarStore.write(df, args.store)
+        print(f"{path}: {len(df):,} rows -> {args.store} ({len(store.manifest['days'])} days)")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,7 +11,7 @@ import yaml
 from sklearn.preprocessing import MinMaxScaler
 import pickle
 from pathlib import Path
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 
 class DataPreprocessor:
@@ -138,7 +138,7 @@ class DataPreprocessor:
 
         return df
 
-    def create_sequences(self, df: pd.DataFrame, lookback: int = 60, target_col: str = 'close', predict_change: bool = True) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    def create_sequences(self, df: pd.DataFrame, lookback: int = 60, target_col: str = 'close', predict_change: bool = True, horizons: Optional[List[int]] = None) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
         """
         Create 3D sequences for LSTM input from time series data.
         
@@ -152,11 +152,14 @@ class DataPreprocessor:
             lookback: Number of past timesteps in each sequence (window size)
             target_col: Feature to predict (typically 'close' price)
             predict_change: PHASE 3.1: If True, predict % price change (not absolute price)
+            horizons: Prediction horizons in bars (default: config model.prediction_horizons,
+                or [1]). Horizon h targets the cumulative change over the next h bars.
 
         Returns:
             Tuple containing:
                 - X: Input sequences, shape (num_sequences, lookback, num_features)
-                - y: Target values, shape (num_sequences,) - price changes if predict_change=True
+                - y: Target values, shape (num_sequences,) for a single horizon or
+                  (num_sequences, n_horizons) - price changes if predict_change=True
                 - indices: Original DataFrame indices for alignment
 
         Example:
@@ -179,6 +182,10 @@ class DataPreprocessor:
 
         self.feature_columns = available_features
 
+        if horizons is None:
+            horizons = self.config['model'].get('prediction_horizons', [1])
+        max_horizon = max(horizons)
+
         # Drop NaN values (from indicators)
         df = df.dropna()
         
@@ -199,7 +206,9 @@ class DataPreprocessor:
         
         target_idx = self.feature_columns.index(target_col)
 
-        for i in range(lookback, len(features_scaled)):
+        # The longest horizon needs max_horizon - 1 bars after the target bar
+        n_sequences = len(features_scaled) - max_horizon + 1
+        for i in range(lookback, n_sequences):
             # Sequence: features from [i-lookback] to [i-1] (lookback timesteps)
             # Example: lookback=60, i=100 -> features[40:100]
             X.append(features_scaled[i - lookback:i])
@@ -215,9 +224,30 @@ class DataPreprocessor:
         X = np.array(X)
         y = np.array(y)
 
+        if horizons != [1]:
+            y = self._horizon_targets(df, features_scaled, target_idx, horizons, lookback, n_sequences, predict_change)
+
         print(f"Created {len(X)} sequences with shape {X.shape}")
 
-        return X, y, df.index[lookback:]
+        return X, y, df.index[lookback:n_sequences]
+
+    def _horizon_targets(self, df: pd.DataFrame, features_scaled: np.ndarray, target_idx: int, horizons: List[int],
+                         lookback: int, n_sequences: int, predict_change: bool) -> np.ndarray:
+        """
+        Build multi-horizon targets, shape (n_sequences - lookback, n_horizons).
+
+        With predict_change, horizon h at row i is the compounded change over
+        price_change[i..i+h-1] (h=1 equals the single-step target). Otherwise
+        it is the scaled target_col value at row i+h-1.
+        """
+        columns = []
+        for h in horizons:
+            if predict_change:
+                growth = np.lib.stride_tricks.sliding_window_view(1 + df['price_change'].values, h)
+                columns.append(growth.prod(axis=1)[lookback:n_sequences] - 1)
+            else:
+                columns.append(features_scaled[lookback + h - 1:n_sequences + h - 1, target_idx])
+        return np.column_stack(columns)
 
     def inverse_transform_predictions(self, predictions: np.ndarray, feature_idx: int = 0) -> np.ndarray:
         """
@@ -275,28 +305,21 @@ class DataPreprocessor:
         print(f"Scaler loaded from {filepath}")
 
 
-def main() -> None:
-    """
-    Test preprocessing pipeline on most recent OHLCV data file.
-
-    Loads latest CSV, adds indicators, creates sequences, saves scaler and processed data.
+def latest_raw_file(data_dir: str = 'data') -> Optional[Path]:
     """
-    import sys
-    from pathlib import Path
+    Most recently written raw OHLCV CSV in data_dir.
 
-    # Load the most recent raw OHLCV data file
-    data_dir = Path('data')
-    csv_files = list(data_dir.glob('*.csv'))
-
-    if not csv_files:
-        print("No data files found. Run fetch_data.py first.")
-        sys.exit(1)
+    Processed outputs (processed_data.csv, predictions.csv) and any CSV
+    without open/high/low/close/volume columns are ignored.
 
+    Returns:
+        Path of the newest raw data file, or None if there is none
+    """
     # Filter for raw OHLCV data files (exclude processed outputs)
     exclude_files = {'predictions.csv', 'processed_data.csv'}
     raw_data_files = []
 
-    for csv_file in csv_files:
+    for csv_file in Path(data_dir).glob('*.csv'):
         if csv_file.name in exclude_files:
             continue
         
@@ -310,12 +333,30 @@ def main() -> None:
             continue
 
     if not raw_data_files:
+        return None
+    return max(raw_data_files, key=lambda p: p.stat().st_mtime)
+
+
+def main() -> None:
+    """
+    Test preprocessing pipeline on most recent OHLCV data file.
+
+    Loads latest CSV, adds indicators, creates sequences, saves scaler and processed data.
+    """
+    import sys
+
+    # Load the most recent raw OHLCV data file
+    data_dir = Path('data')
+    if not list(data_dir.glob('*.csv')):
+        print("No data files found. Run fetch_data.py first.")
+        sys.exit(1)
+
+    latest_file = latest_raw_file(data_dir)
+    if latest_file is None:
         print("No raw OHLCV data files found. Run fetch_data.py first.")
         print("Expected columns: open, high, low, close, volume, datetime")
         sys.exit(1)
 
-    # Get the most recent raw data file
-    latest_file = max(raw_data_files, key=lambda p: p.stat().st_mtime)
     print(f"Loading data from {latest_file}")
 
     df = pd.read_csv(latest_file)
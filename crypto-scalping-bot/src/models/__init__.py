@@ -1,5 +1,16 @@
 """Machine learning models for price prediction."""
 
-from .lstm_model import LSTMPricePredictor
+from .bundle import read_bundle_metadata
 
-__all__ = ['LSTMPricePredictor']
+__all__ = ['LSTMPricePredictor', 'LSTMEnsemble', 'read_bundle_metadata']
+
+
+def __getattr__(name):
+    # Import the LSTM lazily so bundle metadata can be read without TensorFlow
+    if name == 'LSTMPricePredictor':
+        from .lstm_model import LSTMPricePredictor
+        return LSTMPricePredictor
+    if name == 'LSTMEnsemble':
+        from .ensemble import LSTMEnsemble
+        return LSTMEnsemble
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
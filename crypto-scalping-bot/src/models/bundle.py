@@ -0,0 +1,93 @@
+"""
+Self-contained model artifact bundles.
+
+A bundle is a single zip file holding everything needed to reproduce
+LSTMPricePredictor.predict() without retraining:
+
+    metadata.json   Format version, feature schema, lookback, bias correction, config
+    model.keras     Keras model (architecture + weights)
+    scaler.pkl      Fitted MinMaxScaler used to build the input sequences
+
+This module does not import TensorFlow, so tooling can inspect bundles cheaply
+with read_bundle_metadata(). Loading the Keras model itself is done by
+LSTMPricePredictor.load_bundle().
+"""
+
+import json
+import pickle
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BUNDLE_FORMAT_VERSION = 1
+
+METADATA_FILE = 'metadata.json'
+MODEL_FILE = 'model.keras'
+SCALER_FILE = 'scaler.pkl'
+
+
+def write_bundle(filepath: str, model_path: str, metadata: Dict[str, Any], scaler: Optional[Any] = None) -> None:
+    """
+    Write a bundle zip from a saved Keras model file, metadata and scaler.
+
+    Args:
+        filepath: Output bundle path (e.g., 'models/lstm_bundle.zip')
+        model_path: Path to an already saved .keras model file
+        metadata: JSON-serializable metadata (format_version/created_at are added)
+        scaler: Fitted scaler to pickle into the bundle (optional)
+    """
+    metadata = dict(metadata)
+    metadata['format_version'] = BUNDLE_FORMAT_VERSION
+    metadata['created_at'] = datetime.now().isoformat(timespec='seconds')
+    metadata['has_scaler'] = scaler is not None
+
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(filepath, 'w') as zf:
+        # metadata first so it is cheap to locate; model.keras is already compressed
+        zf.writestr(METADATA_FILE, json.dumps(metadata, indent=2, default=str), compress_type=zipfile.ZIP_DEFLATED)
+        zf.write(model_path, MODEL_FILE, compress_type=zipfile.ZIP_STORED)
+        if scaler is not None:
+            zf.writestr(SCALER_FILE, pickle.dumps(scaler), compress_type=zipfile.ZIP_DEFLATED)
+
+
+def read_bundle_metadata(filepath: str) -> Dict[str, Any]:
+    """
+    Read bundle metadata without loading the model (no TensorFlow import).
+
+    Args:
+        filepath: Path to bundle zip
+
+    Returns:
+        Metadata dictionary (feature_columns, lookback, bias_correction, ...)
+
+    Raises:
+        ValueError: If the bundle was written by a newer, unsupported format version
+
+    Example:
+        >>> meta = read_bundle_metadata('models/lstm_bundle.zip')
+        >>> print(meta['feature_columns'], meta['lookback'])
+    """
+    with zipfile.ZipFile(filepath, 'r') as zf:
+        metadata = json.loads(zf.read(METADATA_FILE))
+
+    version = metadata.get('format_version')
+    if version is None or version > BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format version {version} in {filepath} "
+                         f"(supported: <= {BUNDLE_FORMAT_VERSION})")
+
+    return metadata
+
+
+def read_bundle_scaler(filepath: str) -> Optional[Any]:
+    """Load the pickled scaler from a bundle (None if the bundle has no scaler)."""
+    with zipfile.ZipFile(filepath, 'r') as zf:
+        if SCALER_FILE not in zf.namelist():
+            return None
+        return pickle.loads(zf.read(SCALER_FILE))
+
+
+def extract_bundle_model(filepath: str, target_dir: str) -> Path:
+    """Extract model.keras from a bundle into target_dir and return its path."""
+    with zipfile.ZipFile(filepath, 'r') as zf:
+        return Path(zf.extract(MODEL_FILE, target_dir))
@@ -0,0 +1,324 @@
+"""
+Opt-in multi-process data-parallel LSTM training on a single host.
+
+Launches N local TensorFlow workers under tf.distribute.MultiWorkerMirroredStrategy.
+Each worker memory-maps the sequence arrays, trains on its own contiguous shard,
+and gradients are all-reduced every step. The chief (worker 0) saves the trained
+model; the parent process then loads it and fits bias correction as usual.
+
+Usage (from the project root):
+    model, report = train_distributed(X_train, y_train, X_val, y_val, num_workers=8)
+    print(report['scaling_efficiency'])
+
+Or set `model.distributed_workers` in config.yaml and run lstm_model.py.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _free_ports(count: int) -> List[int]:
+    """Reserve `count` free localhost TCP ports for the worker cluster."""
+    sockets, ports = [], []
+    for _ in range(count):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.bind(('localhost', 0))
+        sockets.append(s)
+        ports.append(s.getsockname()[1])
+    for s in sockets:
+        s.close()
+    return ports
+
+
+def _shard(array: np.ndarray, worker_index: int, num_workers: int) -> np.ndarray:
+    """Contiguous, equally sized shard (all workers must run the same number of steps)."""
+    shard_size = len(array) // num_workers
+    start = worker_index * shard_size
+    return array[start:start + shard_size]
+
+
+def _epoch_throughput(log_paths: List[Path]) -> Dict[int, float]:
+    """Sum per-worker samples/sec by epoch from TrainingInstrumentation JSONL logs."""
+    throughput: Dict[int, float] = {}
+    for log_path in log_paths:
+        if not log_path.exists():
+            continue
+        with open(log_path) as f:
+            for line in f:
+                record = json.loads(line)
+                throughput[record['epoch']] = throughput.get(record['epoch'], 0.0) + record['samples_per_sec']
+    return throughput
+
+
+def _steady_state(throughput: Dict[int, float]) -> float:
+    """Median throughput excluding the first epoch (graph tracing/warm-up)."""
+    values = [v for epoch, v in sorted(throughput.items()) if epoch > 1] or list(throughput.values())
+    return float(np.median(values)) if values else 0.0
+
+
+def _run_cluster(data_dir: Path, num_workers: int, config_path: str, epochs: Optional[int], threads_per_worker: int) -> Tuple[float, Dict[int, float]]:
+    """Launch workers, wait for completion, and return (wall time, per-epoch global throughput)."""
+    ports = _free_ports(num_workers)
+    cluster = {'worker': [f'localhost:{port}' for port in ports]}
+    src_dir = str(Path(__file__).parent.parent)
+
+    start = time.perf_counter()
+    processes = []
+    for index in range(num_workers):
+        env = dict(os.environ)
+        env['TF_CONFIG'] = json.dumps({'cluster': cluster, 'task': {'type': 'worker', 'index': index}})
+        env['PYTHONPATH'] = src_dir + os.pathsep + env.get('PYTHONPATH', '')
+        env.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+        cmd = [
+            sys.executable, '-m', 'models.distributed',
+            '--data-dir', str(data_dir),
+            '--config', config_path,
+            '--threads', str(threads_per_worker),
+        ]
+        if epochs is not None:
+            cmd += ['--epochs', str(epochs)]
+        # Only the chief's Keras progress output goes to the console
+        stdout = None if index == 0 else subprocess.DEVNULL
+        processes.append(subprocess.Popen(cmd, env=env, stdout=stdout))
+
+    return_codes = [p.wait() for p in processes]
+    wall_time = time.perf_counter() - start
+
+    if any(return_codes):
+        raise RuntimeError(f"Distributed training failed (worker exit codes: {return_codes})")
+
+    logs = [data_dir / f'worker_{i}_metrics.jsonl' for i in range(num_workers)]
+    return wall_time, _epoch_throughput(logs)
+
+
+def train_distributed(X_train: np.ndarray, y_train: np.ndarray, X_val: Optional[np.ndarray] = None, y_val: Optional[np.ndarray] = None,
+                      num_workers: int = 2, config_path: str = 'config/config.yaml',
+                      baseline_epochs: Optional[int] = 2) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Train an LSTMPricePredictor with N local data-parallel workers.
+
+    Args:
+        X_train: Training sequences, shape (n_samples, timesteps, features)
+        y_train: Training targets, shape (n_samples,)
+        X_val: Validation sequences (optional, sharded across workers)
+        y_val: Validation targets (optional)
+        num_workers: Number of local worker processes
+        config_path: Config with model architecture and training params
+        baseline_epochs: Epochs for a short single-process baseline used to report
+            scaling efficiency (None to skip the baseline)
+
+    Returns:
+        Tuple of (trained LSTMPricePredictor with bias correction fitted, report dict):
+            - num_workers, wall_time_s
+            - throughput: Steady-state global samples/sec
+            - baseline_throughput: Single-process samples/sec (if measured)
+            - speedup, scaling_efficiency: speedup / num_workers
+    """
+    from .lstm_model import LSTMPricePredictor
+
+    cpu_count = os.cpu_count() or 1
+    report: Dict[str, Any] = {'num_workers': num_workers}
+
+    with tempfile.TemporaryDirectory(prefix='lstm_dist_') as tmp:
+        data_dir = Path(tmp)
+        # Plain .npy files so each worker can memory-map only its shard
+        np.save(data_dir / 'X_train.npy', X_train)
+        np.save(data_dir / 'y_train.npy', y_train)
+        if X_val is not None and y_val is not None:
+            np.save(data_dir / 'X_val.npy', X_val)
+            np.save(data_dir / 'y_val.npy', y_val)
+
+        if baseline_epochs:
+            print(f"\nMeasuring single-process baseline ({baseline_epochs} epochs)...")
+            baseline_dir = data_dir / 'baseline'
+            baseline_dir.mkdir()
+            for name in ('X_train', 'y_train', 'X_val', 'y_val'):
+                if (data_dir / f'{name}.npy').exists():
+                    (baseline_dir / f'{name}.npy').symlink_to(data_dir / f'{name}.npy')
+            _, baseline = _run_cluster(baseline_dir, 1, config_path, baseline_epochs, cpu_count)
+            report['baseline_throughput'] = _steady_state(baseline)
+
+        print(f"\nLaunching {num_workers} training workers...")
+        wall_time, throughput = _run_cluster(data_dir, num_workers, config_path, None, max(1, cpu_count // num_workers))
+        report['wall_time_s'] = wall_time
+        report['throughput'] = _steady_state(throughput)
+
+        model = LSTMPricePredictor(config_path)
+        model.load_model(str(data_dir / 'model.keras'))
+
+    if report.get('baseline_throughput'):
+        report['speedup'] = report['throughput'] / report['baseline_throughput']
+        report['scaling_efficiency'] = report['speedup'] / num_workers
+
+    if X_val is not None and y_val is not None:
+        print("\nFitting bias correction on validation set...")
+        val_predictions = model.model.predict(X_val, verbose=0)
+        model.bias_corrector.fit(model._squeeze_horizons(val_predictions), y_val)
+
+    print(f"\n{'='*60}")
+    print("DISTRIBUTED TRAINING REPORT")
+    print(f"{'='*60}")
+    print(f"Workers:             {num_workers}")
+    print(f"Wall time:           {report['wall_time_s']:.1f}s")
+    print(f"Throughput:          {report['throughput']:.0f} samples/s")
+    if 'scaling_efficiency' in report:
+        print(f"Baseline (1 proc):   {report['baseline_throughput']:.0f} samples/s")
+        print(f"Speedup:             {report['speedup']:.2f}x")
+        print(f"Scaling efficiency:  {report['scaling_efficiency']*100:.1f}%")
+    print(f"{'='*60}")
+
+    return model, report
+
+
+def _worker_main() -> None:
+    """
+    Worker process entry point (TF_CONFIG identifies the cluster and this worker).
+
+    Uses a custom training loop with strategy.run(): Keras 3 Model.fit() cannot
+    build a model under a MultiWorkerMirroredStrategy with more than one worker.
+    EarlyStopping and ReduceLROnPlateau are reproduced with the same settings
+    as LSTMPricePredictor.train().
+    """
+    parser = argparse.ArgumentParser(description='LSTM data-parallel training worker')
+    parser.add_argument('--data-dir', required=True)
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--epochs', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(args.threads)
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+
+    from models.lstm_model import LSTMPricePredictor, TrainingInstrumentation
+
+    tf_config = json.loads(os.environ['TF_CONFIG'])
+    worker_index = tf_config['task']['index']
+    num_workers = len(tf_config['cluster']['worker'])
+    data_dir = Path(args.data_dir)
+
+    strategy = tf.distribute.MultiWorkerMirroredStrategy()
+
+    predictor = LSTMPricePredictor(args.config)
+    epochs = args.epochs or predictor.config['model']['epochs']
+    batch_size = predictor.config['model']['batch_size']
+
+    options = tf.data.Options()
+    # Data is already sharded per worker; don't let tf.distribute re-shard it
+    options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.OFF
+
+    def make_dataset(x_name: str, y_name: str, shuffle: bool) -> Tuple[Any, int]:
+        X = _shard(np.load(data_dir / f'{x_name}.npy', mmap_mode='r'), worker_index, num_workers)
+        y = _shard(np.load(data_dir / f'{y_name}.npy', mmap_mode='r'), worker_index, num_workers)
+        ds = tf.data.Dataset.from_tensor_slices((np.ascontiguousarray(X, dtype=np.float32), np.ascontiguousarray(y, dtype=np.float32)))
+        if shuffle:
+            ds = ds.shuffle(len(X), seed=worker_index, reshuffle_each_iteration=True)
+        # tf.distribute treats the batch as global and splits it across the
+        # workers' replicas, so batch_size * num_workers gives batch_size per worker
+        ds = ds.batch(batch_size * num_workers).prefetch(tf.data.AUTOTUNE).with_options(options)
+        return strategy.experimental_distribute_dataset(ds), len(X)
+
+    train_ds, shard_size = make_dataset('X_train', 'y_train', shuffle=True)
+    has_val = (data_dir / 'X_val.npy').exists()
+    val_ds = make_dataset('X_val', 'y_val', shuffle=False)[0] if has_val else None
+
+    input_shape = np.load(data_dir / 'X_train.npy', mmap_mode='r').shape[1:]
+    with strategy.scope():
+        model = predictor.build_model(input_shape)
+        optimizer = model.optimizer
+        optimizer.build(model.trainable_variables)
+
+    @tf.function
+    def train_step(batch):
+        def replica_step(x, y):
+            with tf.GradientTape() as tape:
+                predictions = model(x, training=True)
+                # y is (batch,) or (batch, n_horizons); MSE averaged over horizons
+                y = tf.reshape(y, tf.shape(predictions))
+                loss = tf.nn.compute_average_loss(tf.reduce_mean(tf.square(y - predictions), axis=-1))
+            gradients = tape.gradient(loss, model.trainable_variables)
+            optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return loss
+        return strategy.reduce('SUM', strategy.run(replica_step, args=batch), axis=None)
+
+    @tf.function
+    def eval_step(batch):
+        def replica_step(x, y):
+            predictions = model(x, training=False)
+            errors = tf.square(tf.reshape(y, tf.shape(predictions)) - predictions)
+            return tf.reduce_sum(errors), tf.cast(tf.size(errors), tf.float32)
+        sq_sum, count = strategy.run(replica_step, args=batch)
+        return strategy.reduce('SUM', sq_sum, axis=None), strategy.reduce('SUM', count, axis=None)
+
+    instrumentation = TrainingInstrumentation(
+        log_path=str(data_dir / f'worker_{worker_index}_metrics.jsonl'),
+        num_samples=shard_size
+    )
+
+    # EarlyStopping(patience=10, restore_best_weights) + ReduceLROnPlateau(0.5, patience=5)
+    best_loss, best_weights = np.inf, None
+    epochs_since_best = epochs_since_lr_drop = 0
+
+    for epoch in range(epochs):
+        instrumentation.on_epoch_begin(epoch)
+        losses = []
+        for step, batch in enumerate(train_ds):
+            instrumentation.on_train_batch_begin(step)
+            losses.append(float(train_step(batch)))
+            instrumentation.on_train_batch_end(step)
+
+        logs = {'loss': float(np.mean(losses))}
+        if val_ds is not None:
+            instrumentation.on_test_begin()
+            sq_sum, count = 0.0, 0.0
+            for batch in val_ds:
+                batch_sq_sum, batch_count = eval_step(batch)
+                sq_sum += float(batch_sq_sum)
+                count += float(batch_count)
+            instrumentation.on_test_end()
+            logs['val_loss'] = sq_sum / max(count, 1.0)
+        logs['learning_rate'] = float(optimizer.learning_rate.numpy())
+        instrumentation.on_epoch_end(epoch, logs)
+
+        if worker_index == 0:
+            print(f"Epoch {epoch + 1}/{epochs} - " + ' - '.join(f"{k}: {v:.6g}" for k, v in logs.items()), flush=True)
+
+        # Losses are all-reduced, so every worker takes the same decisions
+        monitored = logs.get('val_loss', logs['loss'])
+        if monitored < best_loss:
+            best_loss, best_weights = monitored, model.get_weights()
+            epochs_since_best = epochs_since_lr_drop = 0
+        else:
+            epochs_since_best += 1
+            epochs_since_lr_drop += 1
+            if epochs_since_lr_drop >= 5:
+                optimizer.learning_rate.assign(max(logs['learning_rate'] * 0.5, 1e-7))
+                epochs_since_lr_drop = 0
+            if epochs_since_best >= 10:
+                if worker_index == 0:
+                    print(f"Early stopping after epoch {epoch + 1}", flush=True)
+                break
+
+    if best_weights is not None:
+        model.set_weights(best_weights)
+
+    # Every worker must take part in saving; only the chief writes the real model
+    if worker_index == 0:
+        model.save(data_dir / 'model.keras')
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            model.save(Path(tmp) / 'model.keras')
+
+
+if __name__ == '__main__':
+    _worker_main()
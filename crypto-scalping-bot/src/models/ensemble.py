@@ -0,0 +1,130 @@
+"""
+Ensemble of LSTM predictors served from a single computation graph.
+"""
+
+import numpy as np
+from tensorflow import keras
+from tensorflow.keras import layers
+from typing import Dict, List, Optional
+
+from .lstm_model import LSTMPricePredictor
+
+
+class LSTMEnsemble:
+    """
+    Merge several trained LSTMPricePredictor instances into one Keras graph.
+
+    Members may use different lookbacks: the merged model takes a single input
+    of the longest lookback and each member reads only its last `lookback`
+    timesteps (Cropping1D). One forward pass returns every member's raw output
+    for all prediction horizons; per-member bias correction and the aggregate
+    are applied as vectorized NumPy operations afterwards.
+
+    Members must be trained on the same feature set and scaling.
+
+    Example:
+        >>> members = [LSTMPricePredictor.load_bundle(p) for p in bundle_paths]
+        >>> ensemble = LSTMEnsemble(members)
+        >>> out = ensemble.predict(X)  # X shape (n, ensemble.lookback, n_features)
+        >>> out['members'].shape, out['ensemble'].shape
+        ((n, 3), (n,))          # (n, 3, n_horizons), (n, n_horizons) for multi-horizon members
+    """
+
+    def __init__(self, members: List[LSTMPricePredictor], weights: Optional[List[float]] = None) -> None:
+        """
+        Args:
+            members: Trained predictors (model must be built/loaded)
+            weights: Optional aggregation weights (default: equal-weighted mean)
+        """
+        if not members:
+            raise ValueError("Ensemble needs at least one member.")
+        if any(m.model is None for m in members):
+            raise ValueError("All ensemble members must be trained or loaded.")
+
+        n_features = {m.model.input_shape[2] for m in members}
+        if len(n_features) > 1:
+            raise ValueError(f"Members use different feature counts: {sorted(n_features)}")
+        feature_sets = {tuple(m.feature_columns) for m in members if m.feature_columns}
+        if len(feature_sets) > 1:
+            raise ValueError("Members were trained on different feature columns.")
+        horizon_sets = {tuple(m.horizons) for m in members}
+        if len(horizon_sets) > 1:
+            raise ValueError(f"Members predict different horizons: {sorted(horizon_sets)}")
+
+        self.members = members
+        self.lookbacks = [m.model.input_shape[1] for m in members]
+        self.lookback = max(self.lookbacks)
+        self.n_features = n_features.pop()
+        self.horizons = list(horizon_sets.pop())
+
+        weights = np.ones(len(members)) if weights is None else np.asarray(weights, dtype=float)
+        if len(weights) != len(members):
+            raise ValueError("weights must have one entry per member.")
+        self.weights = weights / weights.sum()
+
+        # Shape (n_members, n_horizons) so correction broadcasts over the merged output
+        n_horizons = len(self.horizons)
+        self.bias = np.array([np.broadcast_to(m.bias_corrector.bias, n_horizons) for m in members], dtype=float)
+        self.scale = np.array([np.broadcast_to(m.bias_corrector.scale, n_horizons) for m in members], dtype=float)
+
+        self.model = self._build_merged_model()
+
+    def _build_merged_model(self) -> keras.Model:
+        """Build one functional model over a shared input, output shape (batch, n_members, n_horizons)."""
+        shared_input = keras.Input(shape=(self.lookback, self.n_features), name='shared_sequence')
+
+        outputs = []
+        for i, (member, lookback) in enumerate(zip(self.members, self.lookbacks)):
+            x = shared_input
+            if lookback < self.lookback:
+                # Keep only the most recent `lookback` timesteps for this member
+                x = layers.Cropping1D(cropping=(self.lookback - lookback, 0), name=f'member_{i}_window')(x)
+            # Wrap each member so graphs that share a name (e.g. two loaded
+            # 'sequential' models) stay unique inside the merged model
+            member_input = keras.Input(shape=(lookback, self.n_features))
+            wrapped = keras.Model(member_input, member.model(member_input, training=False), name=f'member_{i}')
+            y = wrapped(x)
+            outputs.append(layers.Reshape((1, len(self.horizons)), name=f'member_{i}_output')(y))
+
+        merged = outputs[0] if len(outputs) == 1 else layers.Concatenate(axis=1, name='members')(outputs)
+
+        return keras.Model(inputs=shared_input, outputs=merged, name='lstm_ensemble')
+
+    def predict(self, X: np.ndarray, batch_size: int = 1024) -> Dict[str, np.ndarray]:
+        """
+        Run every member in a single forward pass.
+
+        Args:
+            X: Input sequences, shape (n_samples, lookback, n_features) with the
+               ensemble's (longest) lookback
+            batch_size: Inference batch size
+
+        Returns:
+            Dictionary with:
+                - members: Bias-corrected predictions, shape (n_samples, n_members)
+                  or (n_samples, n_members, n_horizons) for multi-horizon members
+                - ensemble: Weighted aggregate, shape (n_samples,) or (n_samples, n_horizons)
+        """
+        if X.shape[1] != self.lookback:
+            raise ValueError(f"Expected sequences with lookback {self.lookback}, got {X.shape[1]}")
+
+        raw = self.model.predict(X, batch_size=batch_size, verbose=0).reshape(len(X), len(self.members), len(self.horizons))
+        corrected = (raw - self.bias) * self.scale
+
+        return self._aggregate(corrected)
+
+    def _aggregate(self, corrected: np.ndarray) -> Dict[str, np.ndarray]:
+        """Weighted mean over members; single-horizon outputs drop the horizon axis."""
+        corrected = corrected.reshape(len(corrected), len(self.members), len(self.horizons))
+        ensemble = np.tensordot(corrected, self.weights, axes=([1], [0]))
+        if len(self.horizons) == 1:
+            return {'members': corrected[:, :, 0], 'ensemble': ensemble[:, 0]}
+        return {'members': corrected, 'ensemble': ensemble}
+
+    def predict_sequential(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Reference implementation: call each member's predict() separately (for benchmarks)."""
+        corrected = np.stack([
+            member.predict(X[:, self.lookback - lookback:, :])
+            for member, lookback in zip(self.members, self.lookbacks)
+        ], axis=1)
+        return self._aggregate(corrected)
@@ -9,9 +9,19 @@ from tensorflow import keras
 from tensorflow.keras import layers, callbacks
 import yaml
 import pickle
+import json
+import sys
+import time
+from datetime import datetime
 from pathlib import Path
-import matplotlib.pyplot as plt
-from typing import Optional, Tuple, Dict, Any
+import tempfile
+from typing import Optional, Tuple, Dict, Any, List, Union
+
+try:
+    from .bundle import write_bundle, read_bundle_metadata, read_bundle_scaler, extract_bundle_model
+except ImportError:
+    # Running as a script from src/models (train_lstm.py)
+    from bundle import write_bundle, read_bundle_metadata, read_bundle_scaler, extract_bundle_model
 
 
 class BiasCorrection:
@@ -19,6 +29,8 @@ class BiasCorrection:
     PHASE 3.1: Correct systematic prediction bias.
     
     Learns bias and scale from validation set, applies correction to predictions.
+    For multi-horizon predictions (n_samples, n_horizons), bias and scale are
+    learned per horizon column.
     """
     
     def __init__(self):
@@ -28,22 +40,124 @@ class BiasCorrection:
     def fit(self, predictions: np.ndarray, actuals: np.ndarray) -> None:
         """Calculate bias and scale from validation set."""
         error = predictions - actuals
-        self.bias = np.mean(error)
+        self.bias = np.mean(error, axis=0)
         
         # Scale correction: match prediction std to actual std
-        pred_std = np.std(predictions)
-        actual_std = np.std(actuals)
-        self.scale = actual_std / pred_std if pred_std > 0 else 1.0
+        pred_std = np.std(predictions, axis=0)
+        actual_std = np.std(actuals, axis=0)
+        self.scale = np.where(pred_std > 0, actual_std / np.where(pred_std > 0, pred_std, 1.0), 1.0)
+        if np.ndim(self.scale) == 0:
+            self.scale = float(self.scale)
         
         print(f"\nBias correction fitted:")
-        print(f"  Mean bias: {self.bias:.6f}")
-        print(f"  Scale factor: {self.scale:.6f}")
+        print(f"  Mean bias: {np.array2string(np.asarray(self.bias), precision=6)}")
+        print(f"  Scale factor: {np.array2string(np.asarray(self.scale), precision=6)}")
         
     def correct(self, predictions: np.ndarray) -> np.ndarray:
         """Apply bias correction to predictions."""
         return (predictions - self.bias) * self.scale
 
 
+def _peak_rss_mb() -> Optional[float]:
+    """Return peak resident set size of this process in MB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return peak / divisor
+
+
+class TrainingInstrumentation(callbacks.Callback):
+    """
+    Record training throughput and resource usage for every epoch.
+
+    Appends one JSON line per epoch to a JSONL log so training speed can be
+    compared across runs (each run gets its own run_id).
+
+    Recorded per epoch:
+        - samples_per_sec: Training samples processed per second of train time
+        - step_time_ms_p50/p90/p99: Step (batch) compute time percentiles
+        - input_wait_s: Time between batches (input pipeline + callbacks)
+        - compute_s: Time spent inside train steps
+        - validation_s: Time spent on the validation pass
+        - epoch_time_s: Wall time of the full epoch
+        - peak_rss_mb: Peak resident memory of the process so far
+        - loss/mae/val_loss/val_mae and learning_rate from Keras logs
+    """
+
+    def __init__(self, log_path: str = 'models/training_metrics.jsonl', num_samples: Optional[int] = None) -> None:
+        """
+        Args:
+            log_path: JSONL file to append epoch records to
+            num_samples: Number of training samples per epoch (for samples/sec)
+        """
+        super().__init__()
+        self.log_path = Path(log_path)
+        self.num_samples = num_samples
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.records: List[Dict[str, Any]] = []
+
+    def on_epoch_begin(self, epoch: int, logs: Optional[Dict[str, Any]] = None) -> None:
+        self._epoch_start = time.perf_counter()
+        self._step_times: List[float] = []
+        self._input_wait = 0.0
+        self._last_batch_end = self._epoch_start
+        self._validation_time = 0.0
+
+    def on_train_batch_begin(self, batch: int, logs: Optional[Dict[str, Any]] = None) -> None:
+        self._batch_start = time.perf_counter()
+        # Gap since the previous step finished = waiting on input (and callbacks)
+        self._input_wait += self._batch_start - self._last_batch_end
+
+    def on_train_batch_end(self, batch: int, logs: Optional[Dict[str, Any]] = None) -> None:
+        self._last_batch_end = time.perf_counter()
+        self._step_times.append(self._last_batch_end - self._batch_start)
+
+    def on_test_begin(self, logs: Optional[Dict[str, Any]] = None) -> None:
+        self._validation_start = time.perf_counter()
+
+    def on_test_end(self, logs: Optional[Dict[str, Any]] = None) -> None:
+        if hasattr(self, '_validation_start'):
+            self._validation_time += time.perf_counter() - self._validation_start
+
+    def on_epoch_end(self, epoch: int, logs: Optional[Dict[str, Any]] = None) -> None:
+        epoch_time = time.perf_counter() - self._epoch_start
+        step_times_ms = np.array(self._step_times) * 1000
+        compute_time = float(np.sum(self._step_times))
+        train_time = compute_time + self._input_wait
+
+        num_samples = self.num_samples
+        if num_samples is None:
+            num_samples = len(self._step_times) * self.params.get('batch_size', 1)
+
+        record = {
+            'run_id': self.run_id,
+            'epoch': epoch + 1,
+            'steps': len(self._step_times),
+            'samples_per_sec': num_samples / train_time if train_time > 0 else 0.0,
+            'step_time_ms_p50': float(np.percentile(step_times_ms, 50)) if len(step_times_ms) else 0.0,
+            'step_time_ms_p90': float(np.percentile(step_times_ms, 90)) if len(step_times_ms) else 0.0,
+            'step_time_ms_p99': float(np.percentile(step_times_ms, 99)) if len(step_times_ms) else 0.0,
+            'input_wait_s': self._input_wait,
+            'compute_s': compute_time,
+            'validation_s': self._validation_time,
+            'epoch_time_s': epoch_time,
+            'peak_rss_mb': _peak_rss_mb(),
+        }
+        for key, value in (logs or {}).items():
+            record[key] = float(value)
+
+        self.records.append(record)
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
 class LSTMPricePredictor:
     """
     LSTM neural network for predicting cryptocurrency prices.
@@ -55,7 +169,7 @@ class LSTMPricePredictor:
         - Input: (timesteps, features) sequences
         - LSTM layers with configurable units (e.g., [64, 32])
         - Dropout layers for regularization
-        - Dense output layer (single price prediction)
+        - Dense output layer (one unit per prediction horizon)
         - Optimizer: Adam with configurable learning rate
         - Loss: MSE (Mean Squared Error)
 
@@ -79,6 +193,10 @@ class LSTMPricePredictor:
             model: Keras Sequential model (None until build_model called)
             history: Training history (None until train called)
             bias_corrector: PHASE 3.1: Bias correction for predictions
+            scaler: Fitted feature scaler (set by load_bundle, used by predict_from_features)
+            feature_columns: Feature order the model was trained on (set by load_bundle)
+            horizons: Prediction horizons in bars (config model.prediction_horizons, default [1])
+            artifact_dir: Where train() writes checkpoints and training metrics (default models/)
         """
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
@@ -86,6 +204,10 @@ class LSTMPricePredictor:
         self.model = None
         self.history = None
         self.bias_corrector = BiasCorrection()  # PHASE 3.1
+        self.scaler = None
+        self.feature_columns: List[str] = []
+        self.horizons: List[int] = list(self.config['model'].get('prediction_horizons', [1]))
+        self.artifact_dir = Path('models')
 
     def build_model(self, input_shape: Tuple[int, int]) -> keras.Model:
         """
@@ -141,7 +263,8 @@ class LSTMPricePredictor:
         model.add(layers.Dropout(0.2))
 
         # Output layer - PHASE 3.1: tanh activation for centered output
-        model.add(layers.Dense(1, activation='tanh'))
+        # One unit per horizon: all horizons are trained jointly and served in one pass
+        model.add(layers.Dense(len(self.horizons), activation='tanh'))
 
         # Compile model
         optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
@@ -166,10 +289,13 @@ class LSTMPricePredictor:
             - EarlyStopping: Stops training if validation loss doesn't improve (patience=10)
             - ReduceLROnPlateau: Reduces learning rate by 0.5 if loss plateaus (patience=5)
             - ModelCheckpoint: Saves best model based on validation/training loss
+            - TrainingInstrumentation: Logs throughput, step time percentiles,
+              input wait vs compute and peak RSS per epoch to
+              {artifact_dir}/training_metrics.jsonl (next to training_history.png)
 
         Args:
             X_train: Training sequences, shape (n_samples, timesteps, features)
-            y_train: Training targets, shape (n_samples,)
+            y_train: Training targets, shape (n_samples,) or (n_samples, n_horizons)
             X_val: Validation sequences (optional). If None, monitors training loss
             y_val: Validation targets (optional)
 
@@ -183,7 +309,7 @@ class LSTMPricePredictor:
 
         Note:
             Best model weights are automatically restored after training.
-            Checkpoints saved to models/checkpoints/best_model.keras
+            Checkpoints saved to {artifact_dir}/checkpoints/best_model.keras
         """
         if self.model is None:
             input_shape = (X_train.shape[1], X_train.shape[2])
@@ -208,7 +334,7 @@ class LSTMPricePredictor:
             verbose=1
         )
 
-        checkpoint_dir = Path('models/checkpoints')
+        checkpoint_dir = Path(self.artifact_dir) / 'checkpoints'
         checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
         model_checkpoint = callbacks.ModelCheckpoint(
@@ -218,7 +344,12 @@ class LSTMPricePredictor:
             verbose=1
         )
 
-        callback_list = [early_stopping, reduce_lr, model_checkpoint]
+        instrumentation = TrainingInstrumentation(
+            log_path=str(Path(self.artifact_dir) / 'training_metrics.jsonl'),
+            num_samples=len(X_train)
+        )
+
+        callback_list = [early_stopping, reduce_lr, model_checkpoint, instrumentation]
 
         # Train model
         validation_data = (X_val, y_val) if X_val is not None else None
@@ -232,17 +363,28 @@ class LSTMPricePredictor:
             callbacks=callback_list,
             verbose=1
         )
+
+        if instrumentation.records:
+            last = instrumentation.records[-1]
+            print(f"\nTraining throughput (last epoch): {last['samples_per_sec']:.0f} samples/s, "
+                  f"step p50 {last['step_time_ms_p50']:.1f}ms, peak RSS {last['peak_rss_mb'] or 0:.0f}MB")
+            print(f"Training metrics logged to {instrumentation.log_path}")
         
         # PHASE 3.1: Fit bias corrector on validation set
         if X_val is not None and y_val is not None:
             print("\nFitting bias correction on validation set...")
             val_predictions = self.model.predict(X_val, verbose=0)
-            self.bias_corrector.fit(val_predictions.flatten(), y_val)
+            self.bias_corrector.fit(self._squeeze_horizons(val_predictions), y_val)
         else:
             print("\nNo validation set - skipping bias correction")
 
         return self.history
 
+    def _squeeze_horizons(self, raw_predictions: np.ndarray) -> np.ndarray:
+        """Model output as (n_samples,) for one horizon, (n_samples, n_horizons) otherwise."""
+        raw_predictions = raw_predictions.reshape(len(raw_predictions), -1)
+        return raw_predictions[:, 0] if raw_predictions.shape[1] == 1 else raw_predictions
+
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
         Make predictions with the trained model.
@@ -253,14 +395,15 @@ class LSTMPricePredictor:
             X (np.array): Input sequences
 
         Returns:
-            np.array: Bias-corrected predictions
+            np.array: Bias-corrected predictions, shape (n_samples,) for a single
+                horizon or (n_samples, n_horizons) with one column per horizon
         """
         if self.model is None:
             raise ValueError("Model not trained. Call train() first.")
 
         raw_predictions = self.model.predict(X, verbose=0)
         # PHASE 3.1: Apply bias correction
-        corrected_predictions = self.bias_corrector.correct(raw_predictions.flatten())
+        corrected_predictions = self.bias_corrector.correct(self._squeeze_horizons(raw_predictions))
         return corrected_predictions
 
     def evaluate(self, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, float]:
@@ -289,9 +432,19 @@ class LSTMPricePredictor:
         Note:
             Direction accuracy measures if predicted price changes match actual
             changes (ignoring magnitude). Critical for trading strategies.
+            For multi-horizon models the headline metrics use the first horizon;
+            per-horizon MAE and direction accuracy are added as mae_h{n} / direction_accuracy_h{n}.
         """
         predictions = self.predict(X_test)
 
+        horizon_metrics = {}
+        if predictions.ndim == 2:
+            for col, horizon in enumerate(self.horizons):
+                horizon_metrics[f'mae_h{horizon}'] = np.mean(np.abs(predictions[:, col] - y_test[:, col]))
+                horizon_metrics[f'direction_accuracy_h{horizon}'] = np.mean(np.sign(predictions[:, col]) == np.sign(y_test[:, col]))
+            predictions = predictions[:, 0]
+            y_test = y_test[:, 0]
+
         mse = np.mean((predictions.flatten() - y_test) ** 2)
         mae = np.mean(np.abs(predictions.flatten() - y_test))
         rmse = np.sqrt(mse)
@@ -308,7 +461,8 @@ class LSTMPricePredictor:
             'mse': mse,
             'mae': mae,
             'rmse': rmse,
-            'direction_accuracy': direction_accuracy
+            'direction_accuracy': direction_accuracy,
+            **horizon_metrics
         }
 
         print("\nEvaluation Metrics:")
@@ -319,6 +473,8 @@ class LSTMPricePredictor:
 
     def plot_training_history(self, save_path: str = 'models/training_history.png') -> None:
         """Plot training and validation loss."""
+        import matplotlib.pyplot as plt
+
         if self.history is None:
             print("No training history available.")
             return
@@ -361,13 +517,129 @@ class LSTMPricePredictor:
         self.model = keras.models.load_model(filepath)
         print(f"Model loaded from {filepath}")
 
+    def save_bundle(self, filepath: str = 'models/lstm_bundle.zip', scaler: Optional[Any] = None, feature_columns: Optional[List[str]] = None) -> None:
+        """
+        Save a self-contained, versioned model artifact.
+
+        The bundle holds the Keras model, bias correction, fitted scaler and
+        feature schema, so load_bundle() can reproduce predict() without retraining.
+
+        Args:
+            filepath: Output bundle path
+            scaler: Fitted feature scaler (e.g., DataPreprocessor.scaler)
+            feature_columns: Feature order used to build sequences
+                (e.g., DataPreprocessor.feature_columns)
+        """
+        if self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
+
+        scaler = scaler if scaler is not None else self.scaler
+        feature_columns = list(feature_columns) if feature_columns is not None else self.feature_columns
+
+        _, lookback, n_features = self.model.input_shape
+        if feature_columns and len(feature_columns) != n_features:
+            raise ValueError(f"Model expects {n_features} features, got {len(feature_columns)} feature columns")
+
+        metadata = {
+            'model_type': 'lstm',
+            'lookback': lookback,
+            'n_features': n_features,
+            'feature_columns': feature_columns,
+            'horizons': self.horizons,
+            'bias_correction': {
+                'bias': np.atleast_1d(self.bias_corrector.bias).astype(float).tolist(),
+                'scale': np.atleast_1d(self.bias_corrector.scale).astype(float).tolist(),
+            },
+            'model_config': self.config['model'],
+            'tensorflow_version': tf.__version__,
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = Path(tmp_dir) / 'model.keras'
+            self.model.save(model_path)
+            write_bundle(filepath, str(model_path), metadata, scaler)
+
+        print(f"Model bundle saved to {filepath}")
+
+    @classmethod
+    def load_bundle(cls, filepath: str = 'models/lstm_bundle.zip', config_path: str = 'config/config.yaml') -> 'LSTMPricePredictor':
+        """
+        Load a predictor (model, bias correction, scaler, feature schema) from a bundle.
+
+        Args:
+            filepath: Bundle path written by save_bundle()
+            config_path: Config for the new instance (the bundle's model config wins)
+
+        Returns:
+            LSTMPricePredictor ready for predict() / predict_from_features()
+
+        Example:
+            >>> model = LSTMPricePredictor.load_bundle('models/lstm_bundle.zip')
+            >>> predictions = model.predict_from_features(df_processed)
+        """
+        metadata = read_bundle_metadata(filepath)
+
+        predictor = cls(config_path)
+        predictor.config['model'] = metadata.get('model_config', predictor.config['model'])
+        bias = np.asarray(metadata['bias_correction']['bias'], dtype=float)
+        scale = np.asarray(metadata['bias_correction']['scale'], dtype=float)
+        predictor.bias_corrector.bias = float(bias[0]) if bias.size == 1 else bias
+        predictor.bias_corrector.scale = float(scale[0]) if scale.size == 1 else scale
+        predictor.feature_columns = metadata['feature_columns']
+        predictor.horizons = metadata.get('horizons', [1])
+        predictor.scaler = read_bundle_scaler(filepath)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            predictor.model = keras.models.load_model(extract_bundle_model(filepath, tmp_dir))
+
+        print(f"Model bundle loaded from {filepath} (format v{metadata['format_version']}, "
+              f"lookback={metadata['lookback']}, {len(predictor.feature_columns)} features)")
 
-def main() -> None:
+        return predictor
+
+    def predict_from_features(self, df: pd.DataFrame) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Predict from a feature DataFrame using the bundled scaler and feature schema.
+
+        Mirrors DataPreprocessor.create_sequences(): rows with NaN are dropped,
+        features are scaled, and each prediction uses the previous `lookback` rows.
+
+        Args:
+            df: DataFrame containing at least the bundle's feature_columns
+
+        Returns:
+            Series of bias-corrected predictions indexed like df (first lookback rows
+            excluded), or a DataFrame with one column per horizon ('h1', 'h3', ...)
+            for multi-horizon models
+        """
+        if self.scaler is None or not self.feature_columns:
+            raise ValueError("No scaler/feature schema. Load a model with load_bundle() first.")
+
+        lookback = self.model.input_shape[1]
+        df = df.dropna(subset=self.feature_columns)
+        features_scaled = self.scaler.transform(df[self.feature_columns].values)
+
+        # windows[i] = features_scaled[i:i+lookback] -> predicts row i+lookback
+        windows = np.lib.stride_tricks.sliding_window_view(features_scaled, lookback, axis=0)
+        X = windows.transpose(0, 2, 1)[:-1]
+
+        predictions = self.predict(X)
+        if predictions.ndim == 2:
+            return pd.DataFrame(predictions, index=df.index[lookback:], columns=[f'h{h}' for h in self.horizons])
+        return pd.Series(predictions, index=df.index[lookback:])
+
+
+def main(data_path: Optional[str] = None, save_scaler: bool = True) -> None:
     """
     Complete LSTM training pipeline: load data, preprocess, train, evaluate, save.
 
     Performs 70/15/15 train/val/test split, trains model, evaluates performance,
     plots training history, and saves model + predictions.
+
+    Args:
+        data_path: OHLCV CSV to train on (default: the newest CSV in data/)
+        save_scaler: Also write data/scaler.pkl; run_pipeline turns this off
+                     because the preprocess stage owns that file
     """
     import sys
     from pathlib import Path
@@ -379,13 +651,16 @@ def main() -> None:
 
     # Load processed data
     data_dir = Path('data')
-    csv_files = list(data_dir.glob('*.csv'))
+    if data_path is not None:
+        latest_file = Path(data_path)
+    else:
+        csv_files = list(data_dir.glob('*.csv'))
 
-    if not csv_files:
-        print("No data files found. Run fetch_data.py first.")
-        sys.exit(1)
+        if not csv_files:
+            print("No data files found. Run fetch_data.py first.")
+            sys.exit(1)
 
-    latest_file = max(csv_files, key=lambda p: p.stat().st_mtime)
+        latest_file = max(csv_files, key=lambda p: p.stat().st_mtime)
     df = pd.read_csv(latest_file)
     df['datetime'] = pd.to_datetime(df['datetime'])
 
@@ -393,7 +668,8 @@ def main() -> None:
     preprocessor = DataPreprocessor()
     df_processed = preprocessor.add_technical_indicators(df)
     X, y, indices = preprocessor.create_sequences(df_processed, lookback=60)
-    preprocessor.save_scaler()
+    if save_scaler:
+        preprocessor.save_scaler()
 
     # DATE-BASED SPLIT TO PREVENT DATA LEAKAGE (Phase 1.1)
     # Train: Jan 1 - Feb 28, 2024
@@ -433,9 +709,14 @@ def main() -> None:
     print("⚠️  IMPORTANT: Test set is completely unseen and will be used for backtesting")
     print(f"{'='*70}\n")
 
-    # Train model
-    model = LSTMPricePredictor()
-    model.train(X_train, y_train, X_val, y_val)
+    # Train model (optionally data-parallel across local worker processes)
+    num_workers = preprocessor.config['model'].get('distributed_workers', 1) or 1
+    if num_workers > 1:
+        from models.distributed import train_distributed
+        model, _ = train_distributed(X_train, y_train, X_val, y_val, num_workers=num_workers)
+    else:
+        model = LSTMPricePredictor()
+        model.train(X_train, y_train, X_val, y_val)
 
     # Evaluate on test set
     print("\n=== Test Set Performance ===")
@@ -446,16 +727,29 @@ def main() -> None:
 
     # Save model
     model.save_model()
+    model.save_bundle(scaler=preprocessor.scaler, feature_columns=preprocessor.feature_columns)
 
     # Save predictions for analysis (only test set for backtesting)
     test_predictions = model.predict(X_test)
     test_datetimes = datetime_array[test_mask]
     
-    results_df = pd.DataFrame({
-        'actual': y_test,
-        'predicted': test_predictions.flatten(),
-        'datetime': test_datetimes
-    })
+    if test_predictions.ndim == 2:
+        # Multi-horizon: 'actual'/'predicted' keep the first horizon for the backtest,
+        # every horizon is also saved as predicted_h{n} / actual_h{n}
+        results_df = pd.DataFrame({
+            'actual': y_test[:, 0],
+            'predicted': test_predictions[:, 0],
+            'datetime': test_datetimes
+        })
+        for col, horizon in enumerate(model.horizons):
+            results_df[f'actual_h{horizon}'] = y_test[:, col]
+            results_df[f'predicted_h{horizon}'] = test_predictions[:, col]
+    else:
+        results_df = pd.DataFrame({
+            'actual': y_test,
+            'predicted': test_predictions.flatten(),
+            'datetime': test_datetimes
+        })
 
     results_path = data_dir / 'predictions.csv'
     results_df.to_csv(results_path, index=False)
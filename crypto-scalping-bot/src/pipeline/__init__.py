@@ -0,0 +1,14 @@
+"""Stage-aware, cached execution of the end-to-end pipeline."""
+
+from .dag import Stage, PipelineState, run_dag
+
+__all__ = ['Stage', 'PipelineState', 'run_dag', 'STAGES']
+
+
+def __getattr__(name):
+    # The stage table pulls in nothing heavy, but keep it off the import path
+    # of code that only wants the executor
+    if name == 'STAGES':
+        from .stages import STAGES
+        return STAGES
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
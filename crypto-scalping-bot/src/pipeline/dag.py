@@ -0,0 +1,323 @@
+"""
+Cached DAG executor for the pipeline stages.
+
+Each Stage declares what it reads and writes:
+
+    inputs       files/globs whose contents the stage depends on (data files
+                 and the source files of the code it runs)
+    config_keys  dotted config.yaml keys it reads ('trading', 'model.features')
+    outputs      files/globs it writes
+    deps         stages that must finish first
+
+A stage's key is a hash of its input file contents, its config values and
+its target. run_dag() skips a stage whose key matches the last successful run
+recorded in the state file (results/pipeline_state.json) as long as the
+outputs recorded then are still on disk unchanged; otherwise it runs the
+stage. Because keys are computed from contents once the upstream stages have
+finished, a stage that reruns but writes identical files does not invalidate
+what comes after it.
+
+Stages whose dependencies are done run concurrently in spawned processes
+(workers > 1), or one after another in this process (workers = 1).
+
+File digests are cached in the state file by (size, mtime), so an unchanged
+multi-megabyte CSV is not re-read on every run.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import importlib
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Bump when the key or state layout changes (invalidates every stage)
+STATE_VERSION = 1
+
+SRC_DIR = str(Path(__file__).parent.parent)
+
+
+class Stage:
+    """
+    One pipeline step and the files and settings its result depends on.
+
+    Args:
+        name: Stage name (used for deps, --force and the state file)
+        target: 'module:function' to call, importable with src/ on sys.path
+        deps: Names of stages that must complete first
+        inputs: Files, directories or glob patterns read by the stage
+        config_keys: Dotted config keys read by the stage
+        outputs: Files, directories or glob patterns written by the stage
+        kwargs: Keyword arguments for the target
+        description: Banner title
+
+    Example:
+        >>> Stage('backtest', 'backtest.backtest_runner:main', deps=('train',),
+        ...       inputs=('data/predictions.csv', 'src/strategies/*.py'),
+        ...       config_keys=('backtesting', 'trading'),
+        ...       outputs=('results/backtest_results.csv',))
+    """
+
+    def __init__(self, name: str, target: str, deps: Sequence[str] = (), inputs: Sequence[str] = (),
+                 config_keys: Sequence[str] = (), outputs: Sequence[str] = (),
+                 kwargs: Optional[Dict[str, Any]] = None, description: str = '') -> None:
+        if ':' not in target:
+            raise ValueError(f"Stage {name!r}: target must be 'module:function', got {target!r}")
+        self.name = name
+        self.target = target
+        self.deps = tuple(deps)
+        self.inputs = tuple(inputs)
+        self.config_keys = tuple(config_keys)
+        self.outputs = tuple(outputs)
+        self.kwargs = dict(kwargs or {})
+        self.description = description or name
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, {self.target!r}, deps={self.deps})"
+
+
+def resolve(patterns: Iterable[str], root: Path = Path('.')) -> List[Path]:
+    """Existing paths matching the given files/glob patterns, sorted and de-duplicated."""
+    paths = set()
+    for pattern in patterns:
+        if any(ch in pattern for ch in '*?['):
+            paths.update(root.glob(pattern))
+        elif (root / pattern).exists():
+            paths.add(root / pattern)
+    return sorted(paths)
+
+
+def config_value(config: Dict[str, Any], key: str) -> Any:
+    """Value at a dotted key ('model.features'), None if any part is missing."""
+    value: Any = config
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+class PipelineState:
+    """
+    Stage keys and output digests of the last successful run of each stage.
+
+    Args:
+        path: JSON state file
+    """
+
+    def __init__(self, path: str = 'results/pipeline_state.json') -> None:
+        self.path = Path(path)
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[str, List[Any]] = {}
+        if self.path.exists():
+            try:
+                state = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                state = {}
+            if state.get('version') == STATE_VERSION:
+                self.stages = state.get('stages', {})
+                self.files = state.get('files', {})
+
+    def digest(self, path: Path) -> str:
+        """Content hash of a file, or of every file under a directory."""
+        if path.is_dir():
+            h = hashlib.sha256()
+            for file in sorted(p for p in path.rglob('*') if p.is_file()):
+                h.update(str(file.relative_to(path)).encode())
+                h.update(self.digest(file).encode())
+            return h.hexdigest()
+
+        stat = path.stat()
+        cached = self.files.get(str(path))
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        self.files[str(path)] = [stat.st_size, stat.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def stage_key(self, stage: Stage, config: Dict[str, Any]) -> str:
+        """Hash of the stage's target, kwargs, input contents and config values."""
+        payload = {
+            'target': stage.target,
+            'kwargs': stage.kwargs,
+            'inputs': {str(p): self.digest(p) for p in resolve(stage.inputs)},
+            'config': {key: config_value(config, key) for key in stage.config_keys},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def is_current(self, stage: Stage, key: str) -> bool:
+        """True if the last successful run had this key and its outputs are untouched."""
+        entry = self.stages.get(stage.name)
+        if entry is None or entry.get('key') != key:
+            return False
+        if any(not resolve([pattern]) for pattern in stage.outputs):
+            return False
+        for path, digest in entry.get('outputs', {}).items():
+            if not Path(path).exists() or self.digest(Path(path)) != digest:
+                return False
+        return True
+
+    def record(self, stage: Stage, key: str) -> None:
+        """Remember a successful run of the stage and save the state file."""
+        self.stages[stage.name] = {
+            'key': key,
+            'outputs': {str(p): self.digest(p) for p in resolve(stage.outputs)},
+            'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.save()
+
+    def save(self) -> None:
+        # Drop digests of files that no longer exist, then write atomically
+        self.files = {path: entry for path, entry in self.files.items() if Path(path).exists()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f'.{self.path.name}.{os.getpid()}')
+        tmp.write_text(json.dumps({'version': STATE_VERSION, 'stages': self.stages, 'files': self.files},
+                                  indent=2))
+        os.replace(tmp, self.path)
+
+
+def run_stage(target: str, kwargs: Dict[str, Any]) -> None:
+    """Import and call a stage target; a non-zero sys.exit() becomes an error."""
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    module_name, function = target.split(':')
+    func = getattr(importlib.import_module(module_name), function)
+    try:
+        func(**kwargs)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise RuntimeError(f"{target} exited with status {e.code}") from None
+
+
+def topological_order(stages: Sequence[Stage]) -> List[Stage]:
+    """Stages ordered so every stage follows its deps; raises ValueError on unknown deps or cycles."""
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Stage names must be unique")
+    for stage in stages:
+        unknown = set(stage.deps) - set(by_name)
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown stages: {sorted(unknown)}")
+
+    order: List[Stage] = []
+    done = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if set(stage.deps) <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle among stages: {[stage.name for stage in remaining]}")
+        for stage in ready:
+            order.append(stage)
+            done.add(stage.name)
+            remaining.remove(stage)
+    return order
+
+
+def _banner(title: str) -> None:
+    print("\n" + "=" * 70)
+    print(title)
+    print("=" * 70)
+
+
+def run_dag(stages: Sequence[Stage], config: Dict[str, Any], state: Optional[PipelineState] = None,
+            workers: int = 1, force: Iterable[str] = (), skip: Iterable[str] = (),
+            dry_run: bool = False) -> Dict[str, str]:
+    """
+    Run the stages whose inputs, config or outputs changed since their last run.
+
+    Args:
+        stages: Pipeline stages (any order)
+        config: Parsed config.yaml
+        state: Cache state (default: results/pipeline_state.json)
+        workers: Processes for stages that can run at the same time (1 = in this process)
+        force: Stage names to run even if they are up to date
+        skip: Stage names not to run; their existing outputs are used as they are
+        dry_run: Only report what would run
+
+    Returns:
+        Dict of stage name -> 'ran', 'cached', 'skipped', 'failed', 'blocked'
+        (a dependency failed) or, for dry runs, 'would run'
+
+    Example:
+        >>> status = run_dag(STAGES, config, workers=2)
+        >>> all(s in ('ran', 'cached', 'skipped') for s in status.values())
+    """
+    order = topological_order(stages)
+    state = state or PipelineState()
+    force, skip = set(force), set(skip)
+    status: Dict[str, str] = {}
+    pending = list(order)
+    running: Dict[Any, tuple] = {}
+
+    def finish(stage: Stage, key: str, started: float, error: Optional[BaseException]) -> None:
+        elapsed = time.perf_counter() - started
+        missing = [pattern for pattern in stage.outputs if not resolve([pattern])]
+        if error is None and missing:
+            error = RuntimeError(f"expected outputs were not written: {missing}")
+        if error is not None:
+            print(f"Error in {stage.name} stage: {error}")
+            status[stage.name] = 'failed'
+        else:
+            state.record(stage, key)
+            print(f"{stage.name} finished in {elapsed:.1f}s")
+            status[stage.name] = 'ran'
+
+    executor = None
+    if workers > 1 and not dry_run:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        while pending or running:
+            for stage in list(pending):
+                deps = [status.get(dep) for dep in stage.deps]
+                if any(dep is None for dep in deps):
+                    continue
+                pending.remove(stage)
+
+                if any(dep in ('failed', 'blocked') for dep in deps):
+                    print(f"\nNot running {stage.name}: a stage it depends on failed")
+                    status[stage.name] = 'blocked'
+                    continue
+                if stage.name in skip:
+                    print(f"\nSkipping {stage.name} (using existing outputs)")
+                    status[stage.name] = 'skipped'
+                    continue
+
+                key = state.stage_key(stage, config)
+                stale_upstream = any(dep == 'would run' for dep in deps)
+                if stage.name not in force and not stale_upstream and state.is_current(stage, key):
+                    print(f"\n{stage.name}: up to date (inputs unchanged)")
+                    status[stage.name] = 'cached'
+                elif dry_run:
+                    print(f"\n{stage.name}: would run")
+                    status[stage.name] = 'would run'
+                elif executor is None:
+                    _banner(f"STAGE: {stage.description.upper()}")
+                    started = time.perf_counter()
+                    try:
+                        run_stage(stage.target, stage.kwargs)
+                        error = None
+                    except Exception as e:
+                        error = e
+                    finish(stage, key, started, error)
+                else:
+                    print(f"\nStarting {stage.name}: {stage.description}")
+                    future = executor.submit(run_stage, stage.target, stage.kwargs)
+                    running[future] = (stage, key, time.perf_counter())
+
+            if running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key, started = running.pop(future)
+                    finish(stage, key, started, future.exception())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return status
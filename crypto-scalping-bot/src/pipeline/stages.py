@@ -0,0 +1,78 @@
+"""
+The bot's pipeline as a DAG of cached stages.
+
+    fetch ──┬── preprocess ──┬── backtest ── report
+            └── train ───────┘
+
+train reads the raw OHLCV file and computes its own indicators, so it does
+not wait for preprocess; the two run side by side when run_dag() has more
+than one worker. Each stage lists the source files it executes among its
+inputs, so e.g. editing a strategy parameter under src/strategies/ or
+under the backtesting: config section reruns only backtest (and report, if
+the trades changed).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pipeline.dag import Stage
+
+# Raw OHLCV files written by fetch_data.py ({SYMBOL}_{TF}_{start}_to_{end}.csv)
+RAW_DATA = 'data/*_to_*.csv'
+
+
+def train() -> None:
+    """Train on the newest raw OHLCV file, leaving data/scaler.pkl to the preprocess stage."""
+    from data.preprocess import latest_raw_file
+    from models.lstm_model import main as train_main
+
+    raw_file = latest_raw_file('data')
+    if raw_file is None:
+        print("No raw OHLCV data files found. Run fetch_data.py first.")
+        sys.exit(1)
+    train_main(data_path=str(raw_file), save_scaler=False)
+
+
+STAGES = [
+    Stage(
+        'fetch', 'data.fetch_data:main',
+        inputs=('src/data/fetch_data.py',),
+        config_keys=('exchange', 'trading.symbol', 'trading.timeframe',
+                     'backtesting.start_date', 'backtesting.end_date'),
+        outputs=(RAW_DATA,),
+        description='Fetching historical data',
+    ),
+    Stage(
+        'preprocess', 'data.preprocess:main', deps=('fetch',),
+        inputs=(RAW_DATA, 'src/data/preprocess.py'),
+        config_keys=('indicators', 'model.features', 'model.prediction_horizons'),
+        outputs=('data/processed_data.csv', 'data/scaler.pkl'),
+        description='Preprocessing data and adding indicators',
+    ),
+    Stage(
+        'train', 'pipeline.stages:train', deps=('fetch',),
+        inputs=(RAW_DATA, 'src/data/preprocess.py', 'src/models/lstm_model.py',
+                'src/models/bundle.py', 'src/models/distributed.py'),
+        config_keys=('indicators', 'model'),
+        outputs=('models/lstm_model.keras', 'models/lstm_bundle.zip', 'data/predictions.csv'),
+        description='Training LSTM model',
+    ),
+    Stage(
+        'backtest', 'backtest.backtest_runner:main', deps=('preprocess', 'train'),
+        inputs=('data/processed_data.csv', 'data/predictions.csv',
+                'src/backtest/*.py', 'src/strategies/*.py', 'src/data/intrabar_store.py'),
+        config_keys=('backtesting', 'trading'),
+        outputs=('results/backtest_results.csv', 'results/strategy_comparison.csv', 'results/trade_log'),
+        description='Running backtest',
+    ),
+    Stage(
+        'report', 'backtest.performance_analyzer:main', deps=('backtest',),
+        inputs=('results/trade_log', 'src/backtest/performance_analyzer.py',
+                'src/backtest/report_builder.py', 'src/backtest/trade_log.py'),
+        outputs=('results/performance_report.json',),
+        kwargs={'argv': ['--workers', '1']},
+        description='Generating performance report',
+    ),
+]
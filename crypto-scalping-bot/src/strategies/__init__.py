@@ -1,5 +1,12 @@
 """Trading strategies for the bot."""
 
-from .lstm_strategy import LSTMScalpingStrategy
-
 __all__ = ['LSTMScalpingStrategy']
+
+
+def __getattr__(name):
+    # Import lazily so code that only needs strategies.signals (the fast
+    # engine, optimizer, portfolio) does not load Backtesting.py and bokeh
+    if name == 'LSTMScalpingStrategy':
+        from .lstm_strategy import LSTMScalpingStrategy
+        return LSTMScalpingStrategy
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
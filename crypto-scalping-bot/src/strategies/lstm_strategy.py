@@ -2,12 +2,16 @@
 LSTM-based scalping strategy for crypto perpetual futures.
 """
 
+import sys
 import numpy as np
-import pandas as pd
 from backtesting import Strategy
-from backtesting.lib import crossover
-import yaml
-from typing import Optional
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Re-exported: the rules and defaults live in signals.py so the fast engine
+# can use them without importing Backtesting.py
+from strategies.signals import DEFAULT_PARAMS, STRATEGY_PARAMS, compute_signal_masks
 
 
 class LSTMScalpingStrategy(Strategy):
@@ -31,6 +35,8 @@ class LSTMScalpingStrategy(Strategy):
         - stop_loss_pct: Stop loss percentage (0.5%)
         - take_profit_pct: Take profit percentage (1%)
         - position_size: Fraction of equity per trade (95%)
+        - exit_horizon: Multi-horizon models only - bars-ahead prediction used to
+          decide whether to hold an open position (None = next-bar prediction)
 
     Example:
         >>> from backtesting import Backtest
@@ -39,31 +45,32 @@ class LSTMScalpingStrategy(Strategy):
         >>> print(stats)
     """
 
-    # Strategy parameters (can be optimized)
-    prediction_threshold = 0.0005  # Minimum predicted price change (0.05% - lowered for more trades)
-    rsi_oversold = 30
-    rsi_overbought = 70
-    stop_loss_pct = 0.005        # 0.5% stop loss
-    take_profit_pct = 0.01       # 1% take profit
-    position_size = 0.95         # Use 95% of available equity
+    # Strategy parameters (can be optimized); defaults in signals.DEFAULT_PARAMS
+    prediction_threshold = DEFAULT_PARAMS['prediction_threshold']
+    rsi_oversold = DEFAULT_PARAMS['rsi_oversold']
+    rsi_overbought = DEFAULT_PARAMS['rsi_overbought']
+    stop_loss_pct = DEFAULT_PARAMS['stop_loss_pct']
+    take_profit_pct = DEFAULT_PARAMS['take_profit_pct']
+    position_size = DEFAULT_PARAMS['position_size']
+    exit_horizon = DEFAULT_PARAMS['exit_horizon']
 
     def init(self) -> None:
         """
-        Initialize strategy: load predictions and calculate signal strength.
+        Initialize strategy: load predictions and precompute trading signals.
 
         Expects DataFrame with columns:
-            - Predicted_Norm: LSTM predictions (normalized)
-            - Actual_Norm: Actual prices (normalized)
+            - Predicted_Change: LSTM predicted % change
             - Close: Real prices for position sizing
             - RSI, MACD, MACD_Signal: Technical indicators
 
-        Calculates:
-            - price_change_predicted: % change from previous actual to current prediction
+        Calculates (once, vectorized over all bars):
+            - entry_signal: +1 long entry, -1 short entry, 0 no entry
+            - exit_signal: -1 prediction bearish (exit longs), +1 bullish (exit shorts)
             - Prints diagnostic info about prediction distribution
         """
         # PHASE 3.1: Get price change predictions directly from model
-        self.price_change_predicted = self.data.Predicted_Change  # LSTM now predicts % changes
-        self.current_price = self.data.Close  # Real prices for position sizing
+        # init() sees the full data, so every column is available up front
+        self.price_change_predicted = np.asarray(self.data.Predicted_Change)  # LSTM now predicts % changes
         
         # No need to calculate predicted changes - model does this now!
         
@@ -87,86 +94,51 @@ class LSTMScalpingStrategy(Strategy):
         print(f"Potential bearish signals: {bearish_signals} ({bearish_signals/len(pred_changes)*100:.2f}%)")
         print(f"{'='*60}\n")
 
-        # Technical indicators from data
-        self.rsi = self.data.RSI
-        self.macd = self.data.MACD
-        self.macd_signal = self.data.MACD_Signal
+        # Prediction used by _manage_position: a longer horizon (if the model
+        # produced one) gives a better view of whether the move will persist
+        if self.exit_horizon is None:
+            exit_prediction = self.price_change_predicted
+        else:
+            column = f'Predicted_Change_H{self.exit_horizon}'
+            if column not in self.data.df.columns:
+                raise ValueError(f"exit_horizon={self.exit_horizon} needs a '{column}' column "
+                                 f"(add {self.exit_horizon} to model.prediction_horizons)")
+            exit_prediction = np.asarray(self.data.df[column])
+
+        # Entry/exit rules only depend on known columns: evaluate them for all
+        # bars here so next() is a single array lookup per bar
+        masks = compute_signal_masks(
+            self.price_change_predicted, self.data.RSI, self.data.MACD, self.data.MACD_Signal,
+            exit_prediction, self.prediction_threshold, self.rsi_oversold, self.rsi_overbought,
+        )
+        self.entry_signal = masks['long'].astype(np.int8) - masks['short'].astype(np.int8)
+        self.exit_signal = masks['exit_short'].astype(np.int8) - masks['exit_long'].astype(np.int8)
 
     def next(self) -> None:
         """
         Execute strategy logic for each new candle.
 
         Flow:
-            1. If in position: check exit conditions (stop/target/reversal)
-            2. If flat: evaluate long/short entry conditions
+            1. If in position: exit if the precomputed exit signal opposes it
+            2. If flat: open long/short on the precomputed entry signal
             3. Execute trades with risk management
         """
         # Skip if not enough data
-        if len(self.data) < 2:
+        bar = len(self.data) - 1
+        if bar < 1:
             return
 
-        current_prediction = self.price_change_predicted[-1]
-        current_rsi = self.rsi[-1]
-        current_macd = self.macd[-1]
-        current_macd_signal = self.macd_signal[-1]
-
-        # If we have a position, check stop-loss and take-profit
+        # If we have a position, check for a reversal exit
         if self.position:
             self._manage_position()
             return
 
-        # Generate long signal
-        if self._should_go_long(current_prediction, current_rsi, current_macd, current_macd_signal):
+        signal = self.entry_signal[bar]
+        if signal > 0:
             self._open_long()
-
-        # Generate short signal
-        elif self._should_go_short(current_prediction, current_rsi, current_macd, current_macd_signal):
+        elif signal < 0:
             self._open_short()
 
-    def _should_go_long(self, prediction: float, rsi: float, macd: float, macd_signal: float) -> bool:
-        """
-        Evaluate long entry conditions.
-
-        Args:
-            prediction: Predicted price change (%)
-            rsi: Current RSI value (0-100)
-            macd: MACD line value
-            macd_signal: MACD signal line value
-
-        Returns:
-            True if all conditions met:
-                - Prediction > prediction_threshold (bullish LSTM)
-                - RSI < rsi_overbought (room to move up)
-                - MACD > MACD_signal (trend confirmation)
-        """
-        prediction_bullish = prediction > self.prediction_threshold
-        rsi_ok = rsi < self.rsi_overbought
-        macd_bullish = macd > macd_signal
-
-        return prediction_bullish and rsi_ok and macd_bullish
-
-    def _should_go_short(self, prediction: float, rsi: float, macd: float, macd_signal: float) -> bool:
-        """
-        Evaluate short entry conditions.
-
-        Args:
-            prediction: Predicted price change (%)
-            rsi: Current RSI value (0-100)
-            macd: MACD line value
-            macd_signal: MACD signal line value
-
-        Returns:
-            True if all conditions met:
-                - Prediction < -prediction_threshold (bearish LSTM)
-                - RSI > rsi_oversold (room to move down)
-                - MACD < MACD_signal (downtrend confirmation)
-        """
-        prediction_bearish = prediction < -self.prediction_threshold
-        rsi_ok = rsi > self.rsi_oversold
-        macd_bearish = macd < macd_signal
-
-        return prediction_bearish and rsi_ok and macd_bearish
-
     def _open_long(self) -> None:
         """Open a long position with risk management."""
         # Use position_size as a fraction of equity (0-1)
@@ -196,15 +168,12 @@ class LSTMScalpingStrategy(Strategy):
     def _manage_position(self) -> None:
         """
         Manage existing position with trailing stop and exit conditions.
-        """
-        current_prediction = self.price_change_predicted[-1]
-
-        # Exit long if prediction turns bearish
-        if self.position.is_long and current_prediction < -self.prediction_threshold:
-            self.position.close()
 
-        # Exit short if prediction turns bullish
-        elif self.position.is_short and current_prediction > self.prediction_threshold:
+        Uses the exit_horizon prediction when configured, so the hold/exit
+        decision looks further ahead than the next bar.
+        """
+        # Exit long if prediction turns bearish (-1), short if it turns bullish (+1)
+        if self.exit_signal[len(self.data) - 1] == (-1 if self.position.is_long else 1):
             self.position.close()
 
 
@@ -0,0 +1,68 @@
+"""
+Signal rules and default parameters of LSTMScalpingStrategy, without Backtesting.py.
+
+The fast engine, optimizer and portfolio backtest only need the entry/exit
+rules and the parameter defaults. Keeping them here (instead of in
+lstm_strategy.py, which imports Backtesting.py and through it bokeh) lets
+those modules import in a fraction of the time.
+"""
+
+from typing import Any, Dict, Optional, Type
+
+import numpy as np
+
+# LSTMScalpingStrategy's optimizable parameters and their defaults
+DEFAULT_PARAMS: Dict[str, Any] = {
+    'prediction_threshold': 0.0005,  # Minimum predicted price change (0.05% - lowered for more trades)
+    'rsi_oversold': 30,
+    'rsi_overbought': 70,
+    'stop_loss_pct': 0.005,          # 0.5% stop loss
+    'take_profit_pct': 0.01,         # 1% take profit
+    'position_size': 0.95,           # Use 95% of available equity
+    'exit_horizon': None,            # e.g. 5 = hold/exit on Predicted_Change_H5
+}
+
+STRATEGY_PARAMS = tuple(DEFAULT_PARAMS)
+
+
+def compute_signal_masks(prediction: np.ndarray, rsi: np.ndarray, macd: np.ndarray,
+                         macd_signal: np.ndarray, exit_prediction: np.ndarray,
+                         prediction_threshold: float, rsi_oversold: float,
+                         rsi_overbought: float) -> Dict[str, np.ndarray]:
+    """
+    Evaluate LSTMScalpingStrategy's entry/exit rules for every bar at once.
+
+    Long entries need a bullish prediction, room below RSI overbought and
+    MACD above its signal line; shorts mirror this. Open positions exit when
+    the (exit_horizon) prediction turns against them.
+
+    Returns:
+        Dictionary of boolean arrays aligned with the input columns:
+            - long: Long entry conditions met
+            - short: Short entry conditions met (only where long is not)
+            - exit_long: Exit prediction turned bearish
+            - exit_short: Exit prediction turned bullish
+    """
+    prediction = np.asarray(prediction, dtype=float)
+    exit_prediction = np.asarray(exit_prediction, dtype=float)
+    rsi = np.asarray(rsi, dtype=float)
+    macd = np.asarray(macd, dtype=float)
+    macd_signal = np.asarray(macd_signal, dtype=float)
+
+    long = (prediction > prediction_threshold) & (rsi < rsi_overbought) & (macd > macd_signal)
+    short = (prediction < -prediction_threshold) & (rsi > rsi_oversold) & (macd < macd_signal)
+
+    return {
+        'long': long,
+        'short': short & ~long,  # next() checks long first
+        'exit_long': exit_prediction < -prediction_threshold,
+        'exit_short': exit_prediction > prediction_threshold,
+    }
+
+
+def resolve_strategy(strategy_class: Optional[Type] = None) -> Type:
+    """strategy_class, or LSTMScalpingStrategy for None (this imports Backtesting.py)."""
+    if strategy_class is not None:
+        return strategy_class
+    from strategies.lstm_strategy import LSTMScalpingStrategy
+    return LSTMScalpingStrategy
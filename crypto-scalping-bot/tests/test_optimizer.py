@@ -0,0 +1,23 @@
+"""Regression tests for ParallelOptimizer search methods."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from backtest.optimizer import ParallelOptimizer
+from synthetic_data import synthetic_backtest_data
+
+
+def test_halving_keeps_integer_params_across_rungs():
+    data = synthetic_backtest_data(4000, horizons=(3, 5))
+    optimizer = ParallelOptimizer(data, workers=1)
+    ranked = optimizer.optimize({'exit_horizon': [3, 5], 'stop_loss_pct': [0.004, 0.006],
+                                 'take_profit_pct': [0.008, 0.01, 0.012]},
+                                method='halving', eta=2, min_bars=500, keep_trades=1)
+
+    assert len(ranked) >= 1
+    assert set(ranked['exit_horizon']) <= {3, 5}
+    assert len(optimizer.top_trades) == 1
@@ -0,0 +1,21 @@
+"""Regression tests for ResultCache keys."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from backtest.result_cache import ResultCache, hash_frame
+from synthetic_data import synthetic_backtest_data
+
+
+def test_data_digest_follows_in_place_edits(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    data = synthetic_backtest_data(1000)
+    before = cache.data_digest(data)
+
+    data['Predicted_Change'] = -data['Predicted_Change']
+    assert cache.data_digest(data) != before
+    assert cache.data_digest(data) == hash_frame(data)
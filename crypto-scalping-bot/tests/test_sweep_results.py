@@ -0,0 +1,54 @@
+"""Regression tests for SweepResults column typing."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from backtest.fast_engine import run_fast_backtest
+from backtest.sweep_results import SweepResults
+from synthetic_data import synthetic_backtest_data
+
+
+def test_zero_trade_run_then_run_with_trades():
+    data = synthetic_backtest_data(3000)
+    no_trades = run_fast_backtest(data, prediction_threshold=10.0)
+    with_trades = run_fast_backtest(data, prediction_threshold=0.0)
+    assert no_trades['# Trades'] == 0 and with_trades['# Trades'] > 0
+
+    results = SweepResults()
+    results.append(no_trades, {'prediction_threshold': 10.0})
+    results.append(with_trades, {'prediction_threshold': 0.0})
+
+    frame = results.to_frame()
+    duration = frame['Max. Drawdown Duration']
+    assert duration.dtype == 'timedelta64[ns]'
+    assert pd.isna(duration[0])
+    assert duration[1] == with_trades['Max. Drawdown Duration']
+    assert frame['Sharpe Ratio'][1] == with_trades['Sharpe Ratio']
+
+
+def test_missing_values_do_not_fix_the_column_kind():
+    results = SweepResults()
+    results.append({'Sharpe Ratio': np.nan, 'Duration': pd.NaT, 'Start': None})
+    results.append({'Sharpe Ratio': 1.5, 'Duration': pd.Timedelta('1h'), 'Start': pd.Timestamp('2024-03-16')})
+    results.append({'Sharpe Ratio': 2.0, 'Duration': pd.NaT, 'Start': pd.NaT})
+
+    frame = results.to_frame()
+    assert frame['Duration'].dtype == 'timedelta64[ns]'
+    assert frame['Start'].dtype == 'datetime64[ns]'
+    assert frame['Duration'].isna().tolist() == [True, False, True]
+    assert frame['Start'][1] == pd.Timestamp('2024-03-16')
+
+
+def test_conflicting_value_turns_numeric_column_into_objects():
+    results = SweepResults()
+    results.append({'Value': 1.0})
+    results.append({'Value': pd.Timedelta('1s')})
+
+    assert results.column('Value').tolist() == [1.0, pd.Timedelta('1s')]